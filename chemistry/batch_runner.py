@@ -0,0 +1,164 @@
+#!/usr/bin/env python
+
+"""batch_runner.py: Run a function over many output files on a process
+pool, for scripts that take any number of files on the command line.
+
+    from batch_runner import Batch, add_batch_arguments
+
+    add_batch_arguments(parser)
+    args = parser.parse_args()
+    batch = Batch(get_energy, args.outputfilename, args.jobs, args.unordered)
+    for outputfilename, energy in batch:
+        print(outputfilename, energy)
+    sys.exit(batch.report_failures())
+
+The function is called as func(filename) in a worker process, so it (and
+what it returns) must be picklable: a module-level function, or a
+functools.partial of one. It shouldn't print anything, since workers'
+output would be interleaved; return what's needed and print it in the
+main process instead.
+
+An exception raised for one file doesn't stop the others. It's recorded
+instead, and report_failures() lists every file that failed at the end.
+A worker process dying outright is recorded the same way, against the
+file it was running.
+"""
+
+import os
+import sys
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+
+def add_batch_arguments(parser):
+    """Add the -j/--jobs and --unordered options to the parser."""
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="""Number of files to process at once (default: number of cores).""",
+    )
+    parser.add_argument(
+        "--unordered",
+        action="store_true",
+        help="""Give results as soon as they're done, rather than in the order the files were given.""",
+    )
+
+
+def call_isolated(func, filename):
+    """Return (True, func(filename)), or (False, a description of the
+    exception it raised).
+    """
+    try:
+        return True, func(filename)
+    except Exception as e:
+        return False, "".join(traceback.format_exception_only(type(e), e)).strip()
+
+
+class Batch:
+    """Iterating gives (filename, result) for every file that func
+    succeeded on; the others are collected in `failures` as (filename,
+    message).
+    """
+
+    def __init__(self, func, filenames, jobs=None, unordered=False):
+        self.func = func
+        self.filenames = list(filenames)
+        self.jobs = jobs if jobs is not None else (os.cpu_count() or 1)
+        self.unordered = unordered
+        self.failures = []
+
+    def __iter__(self):
+        for filename, (ok, value) in self._results():
+            if ok:
+                yield filename, value
+            else:
+                self.failures.append((filename, value))
+
+    def _results(self):
+        if self.jobs <= 1 or len(self.filenames) <= 1:
+            # No pool, which keeps tracebacks and debuggers simple.
+            for filename in self.filenames:
+                yield filename, call_isolated(self.func, filename)
+            return
+        if self.unordered:
+            for index, result in self._pool_results():
+                yield self.filenames[index], result
+            return
+        # Results that come in early wait for all those before them.
+        done = dict()
+        next_index = 0
+        for index, result in self._pool_results():
+            done[index] = result
+            while next_index in done:
+                yield self.filenames[next_index], done.pop(next_index)
+                next_index += 1
+
+    def _pool_results(self):
+        """Yield (index, result) for every file as they finish, starting a
+        new pool whenever a worker dies (killed for running out of memory,
+        or crashed in a C extension), so that only the files it could
+        have been running are blamed.
+        """
+        remaining = list(range(len(self.filenames)))
+        while remaining:
+            workers = min(self.jobs, len(remaining))
+            broken = []
+            yield from self._run_pool(remaining, workers, broken)
+            if not broken:
+                return
+            # Files are handed to the workers in the order they were
+            # submitted, and at most one more than there are workers is
+            # handed out ahead, so only the first of those left unfinished
+            # can have been running. Each of them is retried on its own,
+            # and the rest go to a new pool.
+            broken.sort()
+            suspects = broken[: workers + 1]
+            remaining = [index for index, _ in broken[workers + 1 :]]
+            for index, _ in suspects:
+                crashed = []
+                yield from self._run_pool([index], 1, crashed)
+                if crashed:
+                    yield index, (False, crashed[0][1])
+
+    def _run_pool(self, indexes, workers, broken):
+        """Yield (index, result) for the files as they finish on a new
+        pool, and add (index, message) to broken for those left
+        unfinished when a worker died.
+        """
+        executor = ProcessPoolExecutor(max_workers=workers)
+        futures = dict()
+        try:
+            futures = {
+                executor.submit(call_isolated, self.func, self.filenames[index]): index
+                for index in indexes
+            }
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                except BrokenProcessPool as e:
+                    broken.append((futures[future], "{}: {}".format(type(e).__name__, e)))
+                    continue
+                except Exception as e:
+                    # The result couldn't be pickled.
+                    result = False, "{}: {}".format(type(e).__name__, e)
+                yield futures[future], result
+        finally:
+            # If iteration stopped early, don't start the files still
+            # waiting. (shutdown's cancel_futures needs Python 3.9.)
+            for future in futures:
+                future.cancel()
+            executor.shutdown()
+
+    def report_failures(self, file=sys.stderr):
+        """Print a summary of the files that failed, and return an exit
+        status: 1 if any did, otherwise 0.
+        """
+        if not self.failures:
+            return 0
+        print("{} of {} files failed:".format(len(self.failures), len(self.filenames)), file=file)
+        for filename, message in self.failures:
+            print("  {}: {}".format(filename, message), file=file)
+        return 1
@@ -0,0 +1,244 @@
+#!/usr/bin/env python
+
+"""cclib_cache.py: Cache the results of parsing output files with cclib,
+so that rerunning a script on the same outputs doesn't parse them again.
+
+    from cclib_cache import cached_ccread
+
+    data = cached_ccread(filename)
+
+The parsed attributes are stored as (compressed, pickled) blobs in a
+sqlite database, keyed on a hash of the file's contents and the installed
+cclib version, so an edited output or a cclib upgrade is parsed again.
+The file hashes are themselves remembered by device, inode, size, and
+mtime, so an unchanged file isn't even read. When the blobs take up more
+than the size cap, the least recently used ones are evicted.
+
+The database is at $CCLIB_CACHE_DIR/cache.sqlite (by default under
+$XDG_CACHE_HOME or ~/.cache), and the size cap is $CCLIB_CACHE_MAX_BYTES
+(by default 2 GiB).
+"""
+
+import hashlib
+import os
+import pickle
+import sqlite3
+import time
+import zlib
+
+CHUNK_SIZE = 1 << 20
+DEFAULT_MAX_BYTES = 2 << 30
+
+# Files modified this recently might still be changing within the
+# resolution of their mtime, so their hashes aren't remembered.
+RACY_NS = 2_000_000_000
+
+
+def default_cache_dir():
+    if "CCLIB_CACHE_DIR" in os.environ:
+        return os.environ["CCLIB_CACHE_DIR"]
+    cache_home = os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache"))
+    return os.path.join(cache_home, "cclib_cache")
+
+
+def hash_file(filename):
+    m = hashlib.blake2b(digest_size=20)
+    with open(filename, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            m.update(chunk)
+    return m.hexdigest()
+
+
+class ParseCache:
+    """An on-disk (sqlite) cache of cclib parse results.
+
+    The same database can be used by several processes at once.
+    """
+
+    def __init__(self, cache_dir=None, max_bytes=None):
+        import cclib
+
+        if cache_dir is None:
+            cache_dir = default_cache_dir()
+        if max_bytes is None:
+            max_bytes = int(os.environ.get("CCLIB_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES))
+        os.makedirs(cache_dir, exist_ok=True)
+        self.filename = os.path.join(cache_dir, "cache.sqlite")
+        self.max_bytes = max_bytes
+        self.cclib_version = cclib.__version__
+        self._conn = sqlite3.connect(self.filename, timeout=60)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS files (
+                device INTEGER, inode INTEGER, size INTEGER, mtime_ns INTEGER, digest TEXT,
+                PRIMARY KEY (device, inode)
+            )"""
+        )
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS entries (
+                digest TEXT, cclib_version TEXT, nbytes INTEGER, last_used REAL, data BLOB,
+                PRIMARY KEY (digest, cclib_version)
+            )"""
+        )
+        self._conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self._conn.close()
+
+    def digest(self, filename):
+        """Return the hash of the file's contents, only reading it if it's
+        changed since it was last hashed.
+        """
+        st = os.stat(filename)
+        key = (st.st_dev, st.st_ino)
+        row = self._conn.execute(
+            "SELECT size, mtime_ns, digest FROM files WHERE device = ? AND inode = ?", key
+        ).fetchone()
+        if row is not None and row[:2] == (st.st_size, st.st_mtime_ns):
+            return row[2]
+        digest = hash_file(filename)
+        if st.st_mtime_ns < time.time_ns() - RACY_NS:
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)",
+                    key + (st.st_size, st.st_mtime_ns, digest),
+                )
+        return digest
+
+    @staticmethod
+    def _key(digest, only):
+        # Partial parses (see cclib_partial) are stored separately from
+        # full ones, under the attributes they were restricted to.
+        if only is None:
+            return digest
+        return "{}:{}".format(digest, ",".join(sorted(only)))
+
+    def get(self, digest, only=None):
+        """Return the cached attributes for the digest, or None. With only,
+        look for a parse restricted to those attributes instead.
+        """
+        key = (self._key(digest, only), self.cclib_version)
+        row = self._conn.execute(
+            "SELECT data FROM entries WHERE digest = ? AND cclib_version = ?", key
+        ).fetchone()
+        if row is None:
+            return None
+        with self._conn:
+            self._conn.execute(
+                "UPDATE entries SET last_used = ? WHERE digest = ? AND cclib_version = ?",
+                (time.time(),) + key,
+            )
+        return pickle.loads(zlib.decompress(row[0]))
+
+    def put(self, digest, attributes, only=None):
+        """Store the attributes for the digest (from a parse restricted to
+        the attributes in only, if given), then evict the least recently
+        used entries until everything fits under the size cap.
+        """
+        blob = zlib.compress(pickle.dumps(attributes, pickle.HIGHEST_PROTOCOL), 1)
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+                (self._key(digest, only), self.cclib_version, len(blob), time.time(), blob),
+            )
+        self.evict()
+
+    def evict(self, max_bytes=None):
+        if max_bytes is None:
+            max_bytes = self.max_bytes
+        with self._conn:
+            rows = self._conn.execute(
+                "SELECT rowid, nbytes FROM entries ORDER BY last_used DESC"
+            ).fetchall()
+            total = 0
+            stale = []
+            for rowid, nbytes in rows:
+                total += nbytes
+                if total > max_bytes:
+                    stale.append((rowid,))
+            self._conn.executemany("DELETE FROM entries WHERE rowid = ?", stale)
+        return len(stale)
+
+    def stats(self):
+        """Return the number of entries and their total size in bytes."""
+        count, nbytes = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(nbytes), 0) FROM entries"
+        ).fetchone()
+        return {"entries": count, "bytes": nbytes}
+
+    def clear(self):
+        with self._conn:
+            self._conn.execute("DELETE FROM entries")
+            self._conn.execute("DELETE FROM files")
+        self._conn.execute("VACUUM")
+
+    def ccread(self, filename):
+        """Return the parsed ccData for the file, from the cache if possible.
+        Files that cclib can't identify give None, and aren't cached.
+        """
+        from cclib.io import ccread
+        from cclib.parser.data import ccData
+
+        digest = self.digest(filename)
+        attributes = self.get(digest)
+        if attributes is not None:
+            return ccData(attributes)
+        data = ccread(filename)
+        if data is None:
+            return None
+        self.put(digest, data.getattributes())
+        return data
+
+
+_default_cache = None
+
+
+def get_default_cache():
+    """Return the cache described in the module docstring, opening it the
+    first time.
+    """
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ParseCache()
+    return _default_cache
+
+
+def cached_ccread(filename, cache=None):
+    """Parse the file with cclib, reusing the result of any earlier parse of
+    the same contents with the same version of cclib.
+
+    Without a cache, a default one (see the module docstring) is used.
+    """
+    if cache is None:
+        cache = get_default_cache()
+    return cache.ccread(filename)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("outputfilename", nargs="*", help="""Files to parse into the cache.""")
+    parser.add_argument("--cache-dir", help="""Where the cache is.""")
+    parser.add_argument("--max-bytes", type=int, help="""The size cap for the cache, in bytes.""")
+    parser.add_argument("--clear", action="store_true", help="""Empty the cache first.""")
+    args = parser.parse_args()
+
+    with ParseCache(args.cache_dir, args.max_bytes) as cache:
+        if args.clear:
+            cache.clear()
+        for outputfilename in args.outputfilename:
+            start = time.perf_counter()
+            data = cache.ccread(outputfilename)
+            status = "unrecognized" if data is None else "ok"
+            print("{} {} {:.3f} s".format(outputfilename, status, time.perf_counter() - start))
+        if args.max_bytes is not None:
+            cache.evict()
+        stats = cache.stats()
+        print("{} entries, {} bytes in {}".format(stats["entries"], stats["bytes"], cache.filename))
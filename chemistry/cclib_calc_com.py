@@ -5,6 +5,9 @@ nuclear charge for the final geometry of one or more quantum chemical
 output files (using cclib).
 """
 
+from batch_runner import Batch, add_batch_arguments
+from cclib_cache import cached_ccread
+
 
 def centerofmass(coords, masses):
     """Calculate the center of mass for the given coordinates and
@@ -34,38 +37,49 @@ def centerofnuccharge(coords, charges):
     return (com_x, com_y, com_z)
 
 
+def calc_com(filename):
+    """Return the atomic numbers, masses, and final geometry of the output
+    file, along with the center of mass and center of nuclear charge.
+    """
+    from cclib.parser.utils import PeriodicTable
+
+    pt = PeriodicTable()
+    data = cached_ccread(filename)
+
+    # pylint: disable=E1101
+    elementnums = data.atomnos
+    # FIXME averaged mass
+    elementmasses = [pt.Mass[pt.element[i]] for i in elementnums]
+    coords = data.atomcoords[-1]
+
+    return (
+        elementnums,
+        elementmasses,
+        coords,
+        centerofmass(coords, elementmasses),
+        centerofnuccharge(coords, elementnums),
+    )
+
+
 def main():
     """Parse a series of output files and print out the center of mass and
     canter of nuclear charge for the final geometry.
     """
     import argparse
 
-    from cclib.io import ccopen
-    from cclib.parser.utils import PeriodicTable
-
     parser = argparse.ArgumentParser()
     parser.add_argument("filename", nargs="+")
+    add_batch_arguments(parser)
     args = parser.parse_args()
 
-    pt = PeriodicTable()
-    for filename in args.filename:
-
-        job = ccopen(filename)
-        data = job.parse()
-
-        # pylint: disable=E1101
-        elementnums = data.atomnos
-        # FIXME averaged mass
-        elementmasses = [pt.Mass[pt.element[i]] for i in elementnums]
-        coords = data.atomcoords[-1]
-
-        print(elementnums)
-        print(elementmasses)
-        print(coords)
-        print(centerofmass(coords, elementmasses))
-        print(centerofnuccharge(coords, elementnums))
+    batch = Batch(calc_com, args.filename, args.jobs, args.unordered)
+    for filename, results in batch:
+        for result in results:
+            print(result)
+    return batch.report_failures()
 
 
 if __name__ == "__main__":
+    import sys
 
-    main()
+    sys.exit(main())
@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 
 import cclib
+from batch_runner import Batch, add_batch_arguments
 from cclib.io import ccopen
 from cclib.parser.utils import convertor
 
@@ -27,6 +28,21 @@ def get_energy_nocclib(outputfilename, string_to_search, fieldnum):
     return float(energy)
 
 
+def get_scf_energy(outputfilename):
+    """Return the name of the program that wrote the output file and its
+    first SCF energy (in hartree).
+    """
+    if "cfour" in outputfilename.lower():
+        program = "CFOUR"
+        scfenergy = get_energy_nocclib(outputfilename, "E(SCF)=", 1)
+    else:
+        job = ccopen(outputfilename)
+        program = program_names[type(job)]
+        data = job.parse()
+        scfenergy = convertor(data.scfenergies[0], "eV", "hartree")
+    return program, scfenergy
+
+
 def getargs():
 
     import argparse
@@ -34,6 +50,7 @@ def getargs():
     parser = argparse.ArgumentParser()
 
     parser.add_argument("outputfilename", nargs="+")
+    add_batch_arguments(parser)
 
     args = parser.parse_args()
 
@@ -42,22 +59,19 @@ def getargs():
 
 if __name__ == "__main__":
 
+    import sys
+
     args = getargs()
 
     scfenergies = []
 
-    for outputfilename in args.outputfilename:
-        if "cfour" in outputfilename.lower():
-            program = "CFOUR"
-            scfenergy = get_energy_nocclib(outputfilename, "E(SCF)=", 1)
-        else:
-            job = ccopen(outputfilename)
-            program = program_names[type(job)]
-            data = job.parse()
-            scfenergy = convertor(data.scfenergies[0], "eV", "hartree")
+    batch = Batch(get_scf_energy, args.outputfilename, args.jobs, args.unordered)
+    for outputfilename, (program, scfenergy) in batch:
         scfenergies.append((program, outputfilename, scfenergy))
 
     scfenergies = sorted(scfenergies, key=lambda x: x[2])
 
     for (program, outputfilename, scfenergy) in scfenergies:
         print(scfenergy, program, outputfilename)
+
+    sys.exit(batch.report_failures())
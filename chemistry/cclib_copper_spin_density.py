@@ -3,14 +3,12 @@
 """"""
 
 
-from cclib.io import ccopen
+from cclib_partial import cached_parse_only
 
 
 def get_job_data(filename):
     """"""
-    job = ccopen(filename)
-    data = job.parse()
-    return data
+    return cached_parse_only(filename, ["atomnos", "atomspins"])
 
 
 def get_copper_idx(data):
@@ -9,6 +9,10 @@ cclib. Name is the same stub, with the file extension replaced by
 
 import os.path
 
+import cclib
+from batch_runner import Batch, add_batch_arguments
+from cclib.io import ccopen
+from cclib.parser.utils import PeriodicTable
 from qchem_make_opt_input_from_opt import (
     form_molecule_section,
     form_molecule_section_from_fragments,
@@ -16,10 +20,6 @@ from qchem_make_opt_input_from_opt import (
     parse_user_input,
 )
 
-import cclib
-from cclib.io import ccopen
-from cclib.parser.utils import PeriodicTable
-
 
 def getargs():
     """Get command-line arguments."""
@@ -34,68 +34,84 @@ def getargs():
     parser.add_argument("--trajectory", action="store_true")
     parser.add_argument("--suffix")
 
+    add_batch_arguments(parser)
+
     args = parser.parse_args()
 
     return args
 
 
+def extract_last_geom(outputfilename, fragment=False, trajectory=False, suffix=None):
+    """Write the last geometry (or all of them) from the output file, and
+    return the names of the XYZ files written.
+    """
+    pt = PeriodicTable()
+
+    job = ccopen(outputfilename)
+    data = job.parse()
+
+    element_list = [pt.element[Z] for Z in data.atomnos]
+    last_geometry = data.atomcoords[-1]
+
+    stub = os.path.splitext(outputfilename)[0]
+    if suffix:
+        xyzfilename = "".join([stub, ".", suffix, ".xyz"])
+    else:
+        xyzfilename = "".join([stub, ".xyz"])
+
+    if trajectory:
+        cclib.io.ccwrite(data, outputdest=xyzfilename, allgeom=True)
+        return []
+
+    written = []
+    with open(xyzfilename, "w") as fh:
+        fh.write(str(len(last_geometry)) + "\n")
+        fh.write("\n")
+        molecule_section = form_molecule_section(
+            element_list, last_geometry, data.charge, data.mult
+        )
+        fh.write("\n".join(molecule_section[1:]))
+        fh.write("\n")
+        written.append(xyzfilename)
+
+    if fragment:
+        # If this is from a Q-Chem fragment calculation, write a single
+        # fragment "XYZ" file as well.
+        if isinstance(job, cclib.parser.qchemparser.QChem):
+            user_input = parse_user_input(outputfilename)
+            charges, multiplicities, start_indices = parse_fragments_from_molecule(
+                user_input["molecule"]
+            )
+            charges.insert(0, data.charge)
+            multiplicities.insert(0, data.mult)
+            molecule_section = form_molecule_section_from_fragments(
+                element_list, last_geometry, charges, multiplicities, start_indices
+            )
+
+            if suffix:
+                fragxyzfilename = "".join([stub, ".", suffix, ".xyz_frag"])
+            else:
+                fragxyzfilename = "".join([stub, ".xyz_frag"])
+
+            with open(fragxyzfilename, "w") as fh:
+                fh.write("\n".join(molecule_section))
+                fh.write("\n")
+                written.append(fragxyzfilename)
+
+    return written
+
+
 if __name__ == "__main__":
+    import sys
+    from functools import partial
 
     args = getargs()
 
-    pt = PeriodicTable()
-
-    for outputfilename in args.outputfilename:
-
-        job = ccopen(outputfilename)
-        try:
-            data = job.parse()
-        except Exception as e:
-            print("no output made: {} in {}".format(e, outputfilename))
-            continue
-
-        element_list = [pt.element[Z] for Z in data.atomnos]
-        last_geometry = data.atomcoords[-1]
-
-        stub = os.path.splitext(outputfilename)[0]
-        if args.suffix:
-            xyzfilename = "".join([stub, ".", args.suffix, ".xyz"])
-        else:
-            xyzfilename = "".join([stub, ".xyz"])
-
-        if args.trajectory:
-            cclib.io.ccwrite(data, outputdest=xyzfilename, allgeom=True)
-        else:
-            with open(xyzfilename, "w") as fh:
-                fh.write(str(len(last_geometry)) + "\n")
-                fh.write("\n")
-                molecule_section = form_molecule_section(
-                    element_list, last_geometry, data.charge, data.mult
-                )
-                fh.write("\n".join(molecule_section[1:]))
-                fh.write("\n")
-                print(xyzfilename)
-
-            if args.fragment:
-                # If this is from a Q-Chem fragment calculation, print a single
-                # fragment "XYZ" file as well.
-                if isinstance(job, cclib.parser.qchemparser.QChem):
-                    user_input = parse_user_input(outputfilename)
-                    charges, multiplicities, start_indices = parse_fragments_from_molecule(
-                        user_input["molecule"]
-                    )
-                    charges.insert(0, data.charge)
-                    multiplicities.insert(0, data.mult)
-                    molecule_section = form_molecule_section_from_fragments(
-                        element_list, last_geometry, charges, multiplicities, start_indices
-                    )
-
-                    if args.suffix:
-                        fragxyzfilename = "".join([stub, ".", args.suffix, ".xyz_frag"])
-                    else:
-                        fragxyzfilename = "".join([stub, ".xyz_frag"])
-
-                    with open(fragxyzfilename, "w") as fh:
-                        fh.write("\n".join(molecule_section))
-                        fh.write("\n")
-                        print(fragxyzfilename)
+    func = partial(
+        extract_last_geom, fragment=args.fragment, trajectory=args.trajectory, suffix=args.suffix
+    )
+    batch = Batch(func, args.outputfilename, args.jobs, args.unordered)
+    for outputfilename, written in batch:
+        for xyzfilename in written:
+            print(xyzfilename)
+    sys.exit(batch.report_failures())
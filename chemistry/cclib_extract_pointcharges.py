@@ -9,33 +9,38 @@ The format of the output is two columns, the first being the atomic
 symbol, the second being the magnitude of the charge.
 """
 
-import argparse
 import os.path
 
-from cclib.io import ccopen
+from batch_runner import Batch, add_batch_arguments
 from cclib.parser.utils import PeriodicTable
+from cclib_partial import cached_parse_only
 
-parser = argparse.ArgumentParser()
 
-parser.add_argument("qmoutfiles", nargs="+")
-parser.add_argument(
-    "--ptchrgtype", choices=("mulliken", "lowdin", "chelpg", "hirshfeld"), default="mulliken"
-)
+def getargs():
+    import argparse
 
-args = parser.parse_args()
-qmoutfiles = args.qmoutfiles
+    parser = argparse.ArgumentParser()
 
-pt = PeriodicTable()
+    parser.add_argument("qmoutfiles", nargs="+")
+    parser.add_argument(
+        "--ptchrgtype", choices=("mulliken", "lowdin", "chelpg", "hirshfeld"), default="mulliken"
+    )
+    add_batch_arguments(parser)
 
-s = "{:3s} {:15.10f}"
+    return parser.parse_args()
 
-for qmoutfile in qmoutfiles:
 
-    job = ccopen(qmoutfile)
-    data = job.parse()
+def extract_pointcharges(qmoutfile, ptchrgtype="mulliken"):
+    """Write the point charges from the output file, and return the name of
+    the file written.
+    """
+    pt = PeriodicTable()
+    s = "{:3s} {:15.10f}"
+
+    data = cached_parse_only(qmoutfile, ["atomnos", "atomcharges"])
 
     element_list = [pt.element[Z] for Z in data.atomnos]
-    pointcharges = data.atomcharges[args.ptchrgtype]
+    pointcharges = data.atomcharges[ptchrgtype]
 
     ptchrgfilename = "".join([os.path.splitext(qmoutfile)[0], ".txt"])
 
@@ -43,4 +48,17 @@ for qmoutfile in qmoutfiles:
         for element, pointcharge in zip(element_list, pointcharges):
             ptchrgfile.write(s.format(element, pointcharge) + "\n")
 
-    print(ptchrgfilename)
+    return ptchrgfilename
+
+
+if __name__ == "__main__":
+    import sys
+    from functools import partial
+
+    args = getargs()
+
+    func = partial(extract_pointcharges, ptchrgtype=args.ptchrgtype)
+    batch = Batch(func, args.qmoutfiles, args.jobs, args.unordered)
+    for qmoutfile, ptchrgfilename in batch:
+        print(ptchrgfilename)
+    sys.exit(batch.report_failures())
@@ -3,10 +3,7 @@
 import re
 
 import numpy as np
-from cclib.io import ccread
-
-re_time_scf = re.compile("^ SCF time:\s*CPU (\d*\.\d*)s\s*wall\s(\d*\.\d*)s")
-re_time_grad = re.compile("^ Gradient time:\s*CPU (\d*\.\d*) s\s*wall\s(\d*\.\d*) s")
+from qchem_scan import NatomHandler, scan, step_times
 
 if __name__ == "__main__":
 
@@ -19,36 +16,25 @@ if __name__ == "__main__":
 
     for outputfilename in outputfiles:
 
-        times_scf_cpu = []
-        times_scf_wall = []
-        times_grad_cpu = []
-        times_grad_wall = []
-
-        with open(outputfilename) as outputfile:
-            for line in outputfile:
-                matches_scf = re_time_scf.findall(line)
-                if matches_scf:
-                    time_scf_cpu, time_scf_wall = [float(time) for time in matches_scf[0]]
-                    times_scf_cpu.append(time_scf_cpu)
-                    times_scf_wall.append(time_scf_wall)
-                matches_grad = re_time_grad.findall(line)
-                if matches_grad:
-                    time_grad_cpu, time_grad_wall = [float(time) for time in matches_grad[0]]
-                    times_grad_cpu.append(time_grad_cpu)
-                    times_grad_wall.append(time_grad_wall)
-
-        times_scf = np.array([times_scf_cpu, times_scf_wall])
-        times_grad = np.array([times_grad_cpu, times_grad_wall])
-
-        couldnt_parse = False
-        try:
-            data = ccread(outputfilename)
-            natom = data.natom
+        results = scan(
+            outputfilename,
+            [
+                step_times("scf_time", re.compile("^ SCF time:")),
+                step_times("gradient_time", re.compile("^ Gradient time:")),
+                NatomHandler(),
+            ],
+        )
+        # [[cpu, ...], [wall, ...]]
+        times_scf = np.array(results["scf_time"], dtype=float).reshape(-1, 2).T
+        times_grad = np.array(results["gradient_time"], dtype=float).reshape(-1, 2).T
+
+        natom = results["natom"]
+        couldnt_parse = natom is None
+        if not couldnt_parse:
             nsteps = (6 * natom) + 1
             nsteps_current = times_grad.shape[1]
             pct = 100 * (nsteps_current / nsteps)
-        except StopIteration:
-            couldnt_parse = True
+        else:
             nsteps = -1
             nsteps_current = -1
             pct = -1
@@ -58,7 +44,7 @@ if __name__ == "__main__":
         print(outputfilename)
         print("-" * 78)
         if couldnt_parse:
-            print(" couldn't parse with cclib due to StopIteration")
+            print(" couldn't find the number of atoms")
         else:
             print(" progress: {:d}/{:d} -> {:.2f}%".format(nsteps_current, nsteps, pct))
 
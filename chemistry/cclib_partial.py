@@ -0,0 +1,222 @@
+#!/usr/bin/env python
+
+"""cclib_partial.py: Parse only some of the attributes from an output
+file with cclib, skipping the sections that don't feed them.
+
+    from cclib_partial import parse_only
+
+    data = parse_only(filename, ["moenergies", "homos", "nmo"])
+
+cclib calls the parser's extract() on every line of the file, and each
+section it recognizes (most expensively, MO coefficient blocks) is parsed
+whether it's wanted or not. Here extract() is only called on lines that
+start one of the sections needed for the requested attributes, or one of
+the few sections that set up state the others depend on; everything else
+is skipped after a single regex search.
+
+Only programs and attributes listed in SECTIONS can be parsed this way;
+anything else raises PartialParseError. Scripts should normally call
+cached_parse_only, which goes through cclib_cache and falls back to a
+full parse when a partial one isn't possible.
+"""
+
+import re
+import types
+
+# The lines that start the sections parsed for each attribute, by parser
+# class name. Attributes with no lines of their own come from the
+# sections in ALWAYS.
+SECTIONS = {
+    "QChem": {
+        "atomcoords": (),
+        "atomelements": (),
+        "atomnos": (),
+        "natom": (),
+        "nalpha": (),
+        "nbeta": (),
+        "mult": (),
+        "charge": (),
+        "nbasis": (),
+        "moenergies": ("Orbital Energies (a.u.)",),
+        "homos": ("Orbital Energies (a.u.)",),
+        "mosyms": ("Orbital Energies (a.u.)",),
+        "nmo": ("Orbital Energies (a.u.)",),
+        "atomcharges": (
+            "Ground-State Mulliken Net Atomic Charges",
+            "Hirshfeld Atomic Charges",
+            "Charge Model 5",
+            "Ground-State ChElPG Net Atomic Charges",
+            "Merz-Kollman ESP Net Atomic Charges",
+            "Merz-Kollman RESP Net Atomic Charges",
+        ),
+        "atomspins": (
+            "Ground-State Mulliken Net Atomic Charges",
+            "Hirshfeld Atomic Charges",
+            "Charge Model 5",
+        ),
+        "scfenergies": ("Total energy in the final basis set",),
+        "polarizabilities": (
+            "Polarizability (a.u.)",
+            "Static polarizability tensor [a.u.]",
+            "Polarizability tensor      [a.u.]",
+            "Polarizability Matrix (a.u.)",
+        ),
+    },
+}
+
+# Sections that are always parsed: the program version, the fragment
+# section markers (Q-Chem only parses the supersystem), the echoed input,
+# the geometry, the electron and basis function counts, and whether the
+# calculation is unrestricted.
+ALWAYS = {
+    "QChem": (
+        "Q-Chem",
+        "Unrecognized platform",
+        "Version",
+        "SVN revision",
+        "Guess MOs from converged MOs on fragments",
+        "CP correction for fragment",
+        "Done with SCF on isolated fragments",
+        "Done with counterpoise correction on fragments",
+        "User input:",
+        "Standard Nuclear Orientation",
+        "Nuclear Repulsion Energy",
+        "basis functions",
+        "calculation will be",
+        "Total job time:",
+    ),
+}
+
+
+# Attributes that several sections add to, so they aren't final as soon
+# as they've been set.
+ACCUMULATED = {
+    "QChem": {"atomcharges", "atomspins", "polarizabilities"},
+}
+
+
+class PartialParseError(ValueError):
+    """The requested attributes can't be parsed on their own."""
+
+
+def _is_final(parser, program, attributes):
+    """Can the attributes parsed so far no longer change? Only in a single
+    point calculation, where each section is printed once, and for
+    attributes that come from a single section.
+    """
+    if ACCUMULATED[program].intersection(attributes):
+        return False
+    rem = getattr(parser, "user_input", dict()).get("rem", dict())
+    return rem.get("jobtype", "sp") == "sp"
+
+
+def parse_only(filename, attributes, stop_early=None):
+    """Parse the file with cclib, extracting only what's needed for the
+    attributes, and return the ccData.
+
+    By default (stop_early=None), reading stops once every attribute has
+    been set and can't change any more (see _is_final). With stop_early
+    True, it stops once they've been set regardless, which gives the
+    first values rather than the last if they're printed again; with
+    False, the whole file is always read. A single point job followed
+    by more jobs in the same output should use False.
+    """
+    from cclib.io import ccopen
+    from cclib.parser.logfileparser import StopParsing
+
+    attributes = list(attributes)
+    parser = ccopen(filename)
+    if parser is None:
+        raise PartialParseError("{}: cclib can't tell which program wrote it".format(filename))
+    program = type(parser).__name__
+    if program not in SECTIONS:
+        raise PartialParseError(
+            "{}: partial parsing isn't supported for {} outputs".format(filename, program)
+        )
+    unsupported = [attribute for attribute in attributes if attribute not in SECTIONS[program]]
+    if unsupported:
+        raise PartialParseError(
+            "{}: can't parse only {} from {} outputs; parse the whole file instead".format(
+                filename, ", ".join(unsupported), program
+            )
+        )
+
+    triggers = set(ALWAYS[program])
+    for attribute in attributes:
+        triggers.update(SECTIONS[program][attribute])
+    prefilter = re.compile("|".join(re.escape(trigger) for trigger in sorted(triggers)))
+    extract = parser.extract
+
+    # Bound, since cclib checks that extract() takes (self, inputfile, line).
+    def extract_only(self, inputfile, line):
+        if prefilter.search(line):
+            extract(inputfile, line)
+            if stop_early is False:
+                return
+            if all(hasattr(self, attribute) for attribute in attributes):
+                if stop_early or _is_final(self, program, attributes):
+                    raise StopParsing()
+
+    parser.extract = types.MethodType(extract_only, parser)
+    data = parser.parse()
+
+    missing = [attribute for attribute in attributes if not hasattr(data, attribute)]
+    if missing:
+        raise PartialParseError("{}: no {} found".format(filename, ", ".join(missing)))
+    return data
+
+
+def cached_parse_only(filename, attributes, stop_early=None, cache=None):
+    """Return the ccData for the file, with at least the attributes.
+
+    An earlier full or partial parse in the cache (see cclib_cache) is
+    used if there is one. Otherwise the file is parsed with parse_only
+    and the result cached, or, if that isn't possible (for example,
+    it's not a Q-Chem output), parsed in full with cached_ccread. A
+    parse with stop_early True isn't cached.
+    """
+    from cclib.parser.data import ccData
+    from cclib_cache import get_default_cache
+
+    if cache is None:
+        cache = get_default_cache()
+    attributes = list(attributes)
+    digest = cache.digest(filename)
+    for only in (None, attributes):
+        cached = cache.get(digest, only)
+        if cached is not None:
+            return ccData(cached)
+    try:
+        data = parse_only(filename, attributes, stop_early)
+    except PartialParseError:
+        return cache.ccread(filename)
+    if not stop_early:
+        # With stop_early True the values may be the first rather than the
+        # last, which later callers wouldn't expect.
+        cache.put(digest, data.getattributes(), only=attributes)
+    return data
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("outputfilename", nargs="+")
+    parser.add_argument(
+        "--attributes", nargs="+", required=True, help="""cclib attributes to parse."""
+    )
+    parser.add_argument(
+        "--stop-early",
+        action="store_true",
+        default=None,
+        help="""Stop reading once every attribute has been found, even if it might be printed again.""",
+    )
+    args = parser.parse_args()
+
+    for outputfilename in args.outputfilename:
+        start = time.perf_counter()
+        data = parse_only(outputfilename, args.attributes, args.stop_early)
+        print("{} {:.3f} s".format(outputfilename, time.perf_counter() - start))
+        for attribute in args.attributes:
+            print(" {}: {}".format(attribute, getattr(data, attribute)))
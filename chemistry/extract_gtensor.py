@@ -9,7 +9,10 @@ if __name__ == "__main__":
     import argparse
     import mmap
 
+    from utils import MarkerIndex
+
     import numpy as np
+    from orca_extract import GTENSOR_MARKER
 
     parser = argparse.ArgumentParser(description="")
     parser.add_argument(
@@ -28,9 +31,7 @@ if __name__ == "__main__":
 
         orcafile = open(name, "r")
         s = mmap.mmap(orcafile.fileno(), 0, access=mmap.ACCESS_READ)
-        searchstr = "ELECTRONIC G-MATRIX"
-        startidx = s.find(searchstr)
-        s.seek(startidx)
+        s.seek(MarkerIndex(name, [GTENSOR_MARKER]).find(GTENSOR_MARKER)[1])
 
         # Here is a sample of what we would like to parse:
         # -------------------
@@ -25,6 +25,13 @@ if __name__ == "__main__":
     import mmap
 
     import numpy as np
+    from orca_extract import (
+        COORDS_MARKER,
+        GTENSOR_MARKER,
+        HFC_MARKER,
+        NUCLEUS_REGEX,
+        index_output,
+    )
 
     parser = argparse.ArgumentParser(description="")
     parser.add_argument(
@@ -49,13 +56,11 @@ if __name__ == "__main__":
 
         orcafile = open(name, "r+b")
         s = mmap.mmap(orcafile.fileno(), 0, access=mmap.ACCESS_READ)
+        index = index_output(name)
 
         ######################################################################
 
-        s.seek(0)
-        searchstr = "ELECTRONIC G-MATRIX"
-        startidx = s.find(searchstr)
-        s.seek(startidx)
+        s.seek(index.find(GTENSOR_MARKER)[1])
 
         # Here is a sample of what we would like to parse:
         # -------------------
@@ -123,10 +128,7 @@ if __name__ == "__main__":
 
         ######################################################################
 
-        s.seek(0)
-        searchstr = "CARTESIAN COORDINATES (ANGSTROEM)"
-        startidx = s.find(searchstr)
-        s.seek(startidx)
+        s.seek(index.find(COORDS_MARKER)[1])
 
         # while True:
         #     line = s.readline()
@@ -138,7 +140,7 @@ if __name__ == "__main__":
         nitrogens = []
         atomidx = 0
         while True:
-            atom = s.readline().split()
+            atom = s.readline().decode().split()
             if len(atom) == 0:
                 break
             if atom[0] == "Cu":
@@ -158,13 +160,12 @@ if __name__ == "__main__":
                 dist = tmpdist
                 nitrogenidx = atom[0]
 
-        searchstr = str(int(nitrogenidx)) + "N : A"
-        s.seek(0)
-        startidx = s.find(searchstr)
-        s.seek(startidx)
-        searchstr = "Raw HFC matrix (all values in MHz):"
-        startidx = s.find(searchstr)
-        s.seek(startidx)
+        searchstr = (str(int(nitrogenidx)) + "N : A").encode()
+        for lineno, offset in zip(index.linenos[NUCLEUS_REGEX], index.offsets[NUCLEUS_REGEX]):
+            s.seek(offset)
+            if searchstr in s.readline():
+                break
+        s.seek(index.find(HFC_MARKER, lineno)[1])
         s.readline()
 
         # next three lines are the raw HFC matrix
@@ -202,6 +203,6 @@ if __name__ == "__main__":
 
         print(
             "{:>28s} {:>10.7f} {:>28s} {:>10.6f} {:>10.7f} {:>4d} {:<s}".format(
-                gtensor, giso, atensor, aiso, dist, int(nitrogenidx), name
+                str(gtensor), giso, str(atensor), aiso, dist, int(nitrogenidx), name
             )
         )
@@ -19,19 +19,12 @@ Attempt to fix these malformed inputs, knowing what possible section
 headers/keys are and what the 'official' Molden output looks like.
 """
 
+from utils import make_file_iterator
 
 bfs = ("[5D]", "[5D10F]", "[7F]", "[5D7F]", "[9G]")
 section_headers_no_newline = bfs + tuple("[Molden Format]")
 
 
-def make_file_iterator(filename):
-    """Return an iterator over the contents of the given file name."""
-    # pylint: disable=C0103
-    with open(filename) as f:
-        contents = f.read()
-    return iter(contents.splitlines())
-
-
 def getargs():
 
     import argparse
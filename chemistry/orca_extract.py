@@ -1,5 +1,18 @@
 #!/usr/bin/env python
 
+from utils import MarkerIndex
+
+GTENSOR_MARKER = "ELECTRONIC G-MATRIX"
+COORDS_MARKER = "CARTESIAN COORDINATES (ANGSTROEM)"
+HFC_MARKER = "Raw HFC matrix (all values in MHz):"
+# The start of the hyperfine block for each nucleus, such as '5N : A'.
+NUCLEUS_REGEX = r"\d+N : A"
+
+
+def index_output(orcaname):
+    """Find every marker needed here in a single pass over the output."""
+    return MarkerIndex(orcaname, [GTENSOR_MARKER, COORDS_MARKER, HFC_MARKER], [NUCLEUS_REGEX])
+
 
 def get_coords(orcamap):
     """
@@ -8,14 +21,12 @@ def get_coords(orcamap):
     pass
 
 
-def get_gtensor(orcamap):
+def get_gtensor(orcamap, index):
 
-    orcamap.seek(0)
-    searchstr = "ELECTRONIC G-MATRIX"
-    startidx = orcamap.find(searchstr)
-    if startidx == -1:
+    found = index.find(GTENSOR_MARKER)
+    if found is None:
         return "[]", 0.0
-    orcamap.seek(startidx)
+    orcamap.seek(found[1])
 
     # Here is a sample of what we would like to parse:
     # -------------------
@@ -84,14 +95,12 @@ def get_gtensor(orcamap):
     return gtensor, giso
 
 
-def get_atensor(orcamap):
+def get_atensor(orcamap, index):
 
-    orcamap.seek(0)
-    searchstr = "CARTESIAN COORDINATES (ANGSTROEM)"
-    startidx = orcamap.find(searchstr)
-    if startidx == -1:
+    found = index.find(COORDS_MARKER)
+    if found is None:
         return "[]", 0.0, 0.0, 0, 0
-    orcamap.seek(startidx)
+    orcamap.seek(found[1])
 
     # skip over 'CARTESIAN COORDINATES (ANGSTROEM)\n---------------------------------\n'
     orcamap.read(68)
@@ -99,7 +108,7 @@ def get_atensor(orcamap):
     atomidx = 0
     # from the coordinate block, gather the copper and all the nitrogen atoms
     while True:
-        atom = orcamap.readline().split()
+        atom = orcamap.readline().decode().split()
         if len(atom) == 0:
             break
         if atom[0] == "Cu":
@@ -121,17 +130,17 @@ def get_atensor(orcamap):
             dist = tmpdist
             nitrogenidx = atom[0]
 
-    searchstr = str(int(nitrogenidx)) + "N : A"
-    orcamap.seek(0)
-    startidx = orcamap.find(searchstr)
-    if startidx == -1:
+    searchstr = (str(int(nitrogenidx)) + "N : A").encode()
+    for lineno, offset in zip(index.linenos[NUCLEUS_REGEX], index.offsets[NUCLEUS_REGEX]):
+        orcamap.seek(offset)
+        if searchstr in orcamap.readline():
+            break
+    else:
         return "[]", 0.0, 0.0, 0, 0
-    orcamap.seek(startidx)
-    searchstr = "Raw HFC matrix (all values in MHz):"
-    startidx = orcamap.find(searchstr)
-    if startidx == -1:
+    found = index.find(HFC_MARKER, lineno)
+    if found is None:
         return "[]", 0.0, 0.0, 0, 0
-    orcamap.seek(startidx)
+    orcamap.seek(found[1])
     orcamap.readline()
 
     # next three lines are the raw HFC matrix
@@ -204,11 +213,12 @@ if __name__ == "__main__":
         orcafile = open(name, "r+b")
         orcamap = mmap.mmap(orcafile.fileno(), 0, access=mmap.ACCESS_READ)
 
-        gtensor, giso = get_gtensor(orcamap)
-        atensor, aiso, dist, nitrogenidx, natoms = get_atensor(orcamap)
+        index = index_output(name)
+        gtensor, giso = get_gtensor(orcamap, index)
+        atensor, aiso, dist, nitrogenidx, natoms = get_atensor(orcamap, index)
 
         print(
             "{:>28s} {:>10.7f} {:>28s} {:>10.6f} {:>10.7f} {:>4d} {:>6d} {:<s}".format(
-                gtensor, giso, atensor, aiso, dist, nitrogenidx, natoms, name
+                str(gtensor), giso, str(atensor), aiso, dist, nitrogenidx, natoms, name
             )
         )
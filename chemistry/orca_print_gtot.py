@@ -1,14 +1,46 @@
 #!/usr/bin/env python
 
+from batch_runner import Batch, add_batch_arguments
+
+
+def get_gtot(outputfilename):
+    """Return the principal components and isotropic value of the g-tensor
+    from an ORCA output file, or None if there isn't one.
+    """
+    with open(outputfilename) as outputfile:
+        for line in outputfile:
+            # single-reference calculations
+            if "g(tot)" in line:
+                sline = line.split()
+                return {
+                    "g1": float(sline[1]),
+                    "g2": float(sline[2]),
+                    "g3": float(sline[3]),
+                    "giso": float(sline[5]),
+                }
+            # multi-reference calculations
+            if "g-factors:" in line:
+                line = next(outputfile)
+                sline = line.split()
+                return {
+                    "g1": float(sline[0]),
+                    "g2": float(sline[1]),
+                    "g3": float(sline[2]),
+                    "giso": float(sline[-1]),
+                }
+    return None
+
 
 if __name__ == "__main__":
     import argparse
+    import sys
 
     parser = argparse.ArgumentParser()
     parser.add_argument("outputfilename", nargs="+")
     parser.add_argument("--pydict", action="store_true")
     parser.add_argument("--write", default="print", choices=("print", "pyfile", "txtfile"))
     parser.add_argument("--pyfilename", default="gtot.py")
+    add_batch_arguments(parser)
     args = parser.parse_args()
     outputfilenames = args.outputfilename
 
@@ -19,53 +51,22 @@ if __name__ == "__main__":
 
     results = dict()
 
-    for outputfilename in outputfilenames:
-        with open(outputfilename) as outputfile:
-            match = False
-            for line in outputfile:
-                # single-reference calculations
-                if "g(tot)" in line:
-                    print(outputfilename)
-                    sline = line.split()
-                    match = True
-                    g_1, g_2, g_3, g_iso = (
-                        float(sline[1]),
-                        float(sline[2]),
-                        float(sline[3]),
-                        float(sline[5]),
-                    )
-                    results[outputfilename] = dict()
-                    results[outputfilename]["g1"] = g_1
-                    results[outputfilename]["g2"] = g_2
-                    results[outputfilename]["g3"] = g_3
-                    results[outputfilename]["giso"] = g_iso
-                    break
-                # multi-reference calculations
-                if "g-factors:" in line:
-                    print(outputfilename)
-                    line = next(outputfile)
-                    sline = line.split()
-                    match = True
-                    g_1, g_2, g_3, g_iso = (
-                        float(sline[0]),
-                        float(sline[1]),
-                        float(sline[2]),
-                        float(sline[-1]),
-                    )
-                    results[outputfilename] = dict()
-                    results[outputfilename]["g1"] = g_1
-                    results[outputfilename]["g2"] = g_2
-                    results[outputfilename]["g3"] = g_3
-                    results[outputfilename]["giso"] = g_iso
-                    break
-            if match:
-                g_perp = (g_1 + g_2) / 2
-                g_para = g_3
-                if args.pydict:
-                    print(t_pydict.format(g_1, g_2, g_3, g_iso, g_para, g_perp))
-                else:
-                    print(t.format(g_1, g_2, g_3, g_para, g_perp, g_iso))
+    batch = Batch(get_gtot, outputfilenames, args.jobs, args.unordered)
+    for outputfilename, gtot in batch:
+        if gtot is None:
+            continue
+        print(outputfilename)
+        results[outputfilename] = gtot
+        g_1, g_2, g_3, g_iso = gtot["g1"], gtot["g2"], gtot["g3"], gtot["giso"]
+        g_perp = (g_1 + g_2) / 2
+        g_para = g_3
+        if args.pydict:
+            print(t_pydict.format(g_1, g_2, g_3, g_iso, g_para, g_perp))
+        else:
+            print(t.format(g_1, g_2, g_3, g_para, g_perp, g_iso))
 
     if args.write == "pyfile":
         with open(args.pyfilename, "w") as f:
             print("results =", results, file=f)
+
+    sys.exit(batch.report_failures())
@@ -2,6 +2,7 @@
 
 
 from cclib.parser.utils import convertor
+from qchem_scan import ExcitationEnergiesHandler, scan
 
 
 def orca_get_cis_ex_energies(inputfile):
@@ -16,97 +17,6 @@ def orca_get_cis_ex_energies(inputfile):
     return state_energies
 
 
-def qchem_get_cis_energies(inputfile, do_quartet=False):
-    multiplicity_map = {
-        "Singlet": 0.0,
-        "Doublet": 0.75,
-        "Triplet": 2.0,
-        "Quartet": 3.75,
-    }
-    state_energies = []
-    state_spins = []
-    state_strengths = []
-    line = ""
-    while "Excited state" not in line:
-        line = next(inputfile)
-    # RCIS: print all singlet/triplet in one block
-    # UCIS: print all in one block
-    # ROCIS: print doublet and quartet in separate blocks
-    while list(set(line.strip())) != ["-"]:
-        if "Total energy for state" in line:
-            state_energies.append(float(line.split()[-1]))
-        if "<S**2>" in line:
-            state_spins.append(float(line.split()[-1]))
-        if "Multiplicity" in line:
-            state_spins.append(multiplicity_map[line.split()[1]])
-        if "Strength" in line:
-            state_strengths.append(float(line.split()[-1]))
-        line = next(inputfile)
-    if do_quartet:
-        while "Excited state" not in line:
-            line = next(inputfile)
-        while list(set(line.strip())) != ["-"]:
-            if "Total energy for state" in line:
-                state_energies.append(float(line.split()[-1]))
-            if "Multiplicity" in line:
-                state_spins.append(multiplicity_map[line.split()[1]])
-            if "Strength" in line:
-                state_strengths.append(float(line.split()[-1]))
-            line = next(inputfile)
-    return state_energies
-
-
-def qchem_get_cisd_energies(inputfile, energy_gs):
-    state_energies = []
-    line = ""
-    while "CIS(D) excitation energy" not in line:
-        line = next(inputfile)
-    while list(set(line.strip())) != ["-"]:
-        if "CIS(D) excitation energy" in line:
-            # Stupid Q-Chem!
-            energy_es = energy_gs + convertor(float(line.split()[-2]), "eV", "hartree")
-            state_energies.append(energy_es)
-        line = next(inputfile)
-    return state_energies
-
-
-def qchem_get_ricisd_energies(inputfile):
-    state_energies = []
-    line = ""
-    while "Excited state" not in line:
-        line = next(inputfile)
-    while list(set(line.strip())) != ["-"]:
-        if "Total energy for state" in line:
-            state_energies.append(float(line.split()[-2]))
-        line = next(inputfile)
-    return state_energies
-
-
-def qchem_get_eom_energies_ccman1(inputfile):
-    state_energies = []
-    line = ""
-    while "Excitation energies, hartree" not in line:
-        line = next(inputfile)
-    while "Analysis of SCF Wavefunction" not in line:
-        if "hartree (Ex Ene" in line:
-            sline = line.split()
-            state_energies.append(float(sline[5][4:]))
-        line = next(inputfile)
-    return state_energies
-
-
-def qchem_get_eom_energies_ccman2(inputfile):
-    state_energies = []
-    line = ""
-    while "EOMEE-CCSD transition" not in line:
-        line = next(inputfile)
-    while "Analysis of SCF Wavefunction" not in line:
-        if "Total energy" in line:
-            state_energies.append(float(line.split()[3]))
-        line = next(inputfile)
-    return state_energies
-
-
 def on_off_bool(s):
     if s == "on":
         return True
@@ -146,22 +56,6 @@ def main(args):
         mpl.use("Agg")
         import matplotlib.pyplot as plt
 
-    matches_ccman1 = (
-        "DOING EOM-CCSD CALCULATIONS",
-        "GENUINE CIS CODE",
-        "GENUINE CISD CODE",
-        "GENUINE CISDT CODE",
-    )
-
-    matches_correlated_gs_energies_cdman = (
-        # Shows up in RI-CIS(D) calculations.
-        "RIMP2         total energy",
-        # Shows up in SOS-CIS(D) and SOS-CIS(D0) calculations.
-        "Total SOS-MP2 energy",
-        # Shows up in CIS(D) calculations (without RI).
-        "Total ground state energy",
-    )
-
     matches_orca_cis = ("CIS-EXCITED STATES", "CIS EXCITED STATES")
 
     if args.actually_plot:
@@ -176,49 +70,17 @@ def main(args):
         # trying to determine which program they came from for now.
         job = cclib.io.ccopen(inputfilename)
         stub = os.path.splitext(inputfilename)[0]
-        inputfile = make_file_iterator(inputfilename)
-        unrestricted = True
-        do_quartet = False
 
         if type(job) == cclib.parser.qchemparser.QChem:
             print("Q-Chem:", stub)
-            for line in inputfile:
-                # Are we using a ROHF reference?
-                if " restricted " in line:
-                    unrestricted = False
-                # This is the RHF/ROHF/UHF ground state energy.
-                if "Total energy in the final basis set" in line:
-                    energy_gs = float(line.split()[-1])
-                # Do we want a correlated ground state energy instead?
-                # (RI-MP2, MP2, CCSD, ...)
-                if args.correlated_gs_energy:
-                    # Runs that call cdman will match here.
-                    if any(match in line for match in matches_correlated_gs_energies_cdman):
-                        energy_gs = float(line.split()[-2])
-                    # Runs that call ccman/ccman2 will match here.
-                    if "ccsd total energy" in line.lower():
-                        energy_gs = float(line.split()[-1])
-                if "Doublet and Quartet excitation energies requested" in line:
-                    do_quartet = True
-                if "CIS Excitation Energies" in line:
-                    energies_es = qchem_get_cis_energies(inputfile, do_quartet)
-                if "TDDFT/TDA Excitation Energies" in line:
-                    energies_es = qchem_get_cis_energies(inputfile)
-                if line.strip() == "CIS(D) Excitation Energies":
-                    energies_es = qchem_get_cisd_energies(inputfile, energy_gs)
-                if line.strip() == "RI-CIS(D) Excitation Energies":
-                    energies_es = qchem_get_ricisd_energies(inputfile)
-                if line.strip() == "SOS-CIS(D) Excitation Energies":
-                    energies_es = qchem_get_ricisd_energies(inputfile)
-                if line.strip() == "SOS-CIS(D0) Excitation Energies":
-                    energies_es = qchem_get_cis_energies(inputfile, unrestricted)
-                if "Solving for EOM-CCSD" in line:
-                    energies_es = qchem_get_eom_energies_ccman2(inputfile)
-                if any(line.strip() == match for match in matches_ccman1):
-                    energies_es = qchem_get_eom_energies_ccman1(inputfile)
+            handler = ExcitationEnergiesHandler(args.correlated_gs_energy)
+            results = scan(inputfilename, [handler])[handler.name]
+            energy_gs = results["energy_gs"]
+            energies_es = results["energies_es"]
 
         elif type(job) == cclib.parser.orcaparser.ORCA:
             print("ORCA:", stub)
+            inputfile = make_file_iterator(inputfilename)
             for line in inputfile:
                 if "Total Energy" in line:
                     energy_gs = float(line.split()[3])
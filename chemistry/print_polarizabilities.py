@@ -2,7 +2,8 @@
 
 
 import numpy as np
-from cclib.io import ccopen
+from batch_runner import Batch, add_batch_arguments
+from cclib_cache import cached_ccread
 
 
 def getargs():
@@ -12,30 +13,39 @@ def getargs():
     arg = parser.add_argument
     arg("outputfile", nargs="*")
     arg("--only-iso", action="store_true")
+    add_batch_arguments(parser)
     args = parser.parse_args()
     return args
 
 
+def get_polarizabilities(outputfilename):
+    data = cached_ccread(outputfilename)
+    return getattr(data, "polarizabilities", None)
+
+
 def print_polarizability(data, only_iso=False):
     if hasattr(data, "polarizabilities"):
-        for polarizability in data.polarizabilities:
-            if not only_iso:
-                print(polarizability)
-            print("avg(trace)       :", np.trace(polarizability) / 3)
-            print("avg(sum(eigvals)):", np.sum(np.linalg.eigvals(polarizability)) / 3)
+        print_polarizabilities(data.polarizabilities, only_iso)
+    return
+
+
+def print_polarizabilities(polarizabilities, only_iso=False):
+    for polarizability in polarizabilities:
+        if not only_iso:
+            print(polarizability)
+        print("avg(trace)       :", np.trace(polarizability) / 3)
+        print("avg(sum(eigvals)):", np.sum(np.linalg.eigvals(polarizability)) / 3)
     return
 
 
 if __name__ == "__main__":
+    import sys
 
     args = getargs()
 
-    for outputfilename in args.outputfile:
-        job = ccopen(outputfilename)
-        try:
-            data = job.parse()
-            if hasattr(data, "polarizabilities"):
-                print(outputfilename)
-            print_polarizability(data, args.only_iso)
-        except:
-            pass
+    batch = Batch(get_polarizabilities, args.outputfile, args.jobs, args.unordered)
+    for outputfilename, polarizabilities in batch:
+        if polarizabilities is not None:
+            print(outputfilename)
+            print_polarizabilities(polarizabilities, args.only_iso)
+    sys.exit(batch.report_failures())
@@ -1,24 +1,27 @@
 #!/usr/bin/env python3
 
 
-from qchem_aimd_tools import get_qchem_aimd_data, make_file_iterator
+import re
 
+from utils import make_file_iterator
+
+from qchem_aimd_tools import get_qchem_aimd_data
+from qchem_scan import LineHandler, integral_threads, scan, step_times
 
-def qchem_get_time_step(filename, searchstr, idx_cpu, idx_wall):
-    """Get the CPU and wall times for each step."""
 
-    fi = make_file_iterator(filename)
+def split_times(times):
+    """Turn a list of (CPU, wall) pairs into a list of CPU times and a list
+    of wall times.
+    """
 
-    times_cpu = []
-    times_wall = []
+    return [t[0] for t in times], [t[1] for t in times]
 
-    for line in fi:
-        if searchstr in line:
-            sline = line.split()
-            times_cpu.append(float(sline[idx_cpu]))
-            times_wall.append(float(sline[idx_wall]))
 
-    return times_cpu, times_wall
+def qchem_get_time_step(filename, searchstr, idx_cpu, idx_wall):
+    """Get the CPU and wall times for each step."""
+
+    results = scan(filename, [step_times("times", searchstr, idx_cpu, idx_wall)])
+    return split_times(results["times"])
 
 
 if __name__ == "__main__":
@@ -35,12 +38,26 @@ if __name__ == "__main__":
     args = parser.parse_args()
 
     fi_cost = make_file_iterator(args.costfile)
-    fi_output = make_file_iterator(args.outputfile)
 
-    for line in fi_output:
-        if "threads for integral computing" in line:
-            nthreads = int(line.split()[1])
-            break
+    # Get everything from the output in one pass.
+    handlers = [
+        integral_threads(),
+        step_times("dynamics_step_time", "Time for this dynamics step:", 5, 8),
+        step_times("scf_time", "SCF time:", 3, 6),
+        step_times("gradient_time", "Gradient time:", 3, 6),
+    ]
+    if args.try_extrap_fock_analysis:
+        for name in ("fock_extrap_order", "fock_extrap_points"):
+            handlers.append(
+                LineHandler(
+                    name,
+                    re.compile(name, re.IGNORECASE),
+                    lambda line: int(line.split()[-1]),
+                    "last",
+                )
+            )
+    results = scan(args.outputfile, handlers)
+    nthreads = results["nthreads"]
 
     header_lines, costdata = get_qchem_aimd_data(
         fi_cost, num_header_lines=1, num_columns=3, col_types=[int, float, float]
@@ -55,16 +72,9 @@ if __name__ == "__main__":
         for ts, nscf, cts in zip(time_step, scf_cycles, cpu_time_sec):
             print(strtemplate(ts, nscf, cts))
 
-    searchstr = "Time for this dynamics step:"
-    times_cpu_dynamics_step, times_wall_dynamics_step = qchem_get_time_step(
-        args.outputfile, searchstr, 5, 8
-    )
-    searchstr = "SCF time:"
-    times_cpu_scf_step, times_wall_scf_step = qchem_get_time_step(args.outputfile, searchstr, 3, 6)
-    searchstr = "Gradient time:"
-    times_cpu_gradient_step, times_wall_gradient_step = qchem_get_time_step(
-        args.outputfile, searchstr, 3, 6
-    )
+    times_cpu_dynamics_step, times_wall_dynamics_step = split_times(results["dynamics_step_time"])
+    times_cpu_scf_step, times_wall_scf_step = split_times(results["scf_time"])
+    times_cpu_gradient_step, times_wall_gradient_step = split_times(results["gradient_time"])
 
     # print(len(times_cpu_dynamics_step))
     # print(len(times_cpu_scf_step))
@@ -93,9 +103,5 @@ if __name__ == "__main__":
 
     if args.try_extrap_fock_analysis:
 
-        fi_output = make_file_iterator(args.outputfile)
-        for line in fi_output:
-            if "fock_extrap_order" in line.lower():
-                fock_extrap_order = int(line.split()[-1])
-            if "fock_extrap_points" in line.lower():
-                fock_extrap_points = int(line.split()[-1])
+        fock_extrap_order = results["fock_extrap_order"]
+        fock_extrap_points = results["fock_extrap_points"]
@@ -27,68 +27,13 @@ try:
 except ImportError:
     pass
 
+from cclib_partial import cached_parse_only
+from qchem_scan import CovpHandler, scan
 from vmd_templates import pad_left_zeros, vmd_covp_write_files
 
-from cclib.io import ccopen
 from docopt import docopt
 
 
-def parse_fragment_block(outputfile, fragment_entries, fragment_idx):
-    """Parse a single fragment block."""
-    next(outputfile)
-    next(outputfile)
-    next(outputfile)
-    line = next(outputfile)
-    while "-----" not in line:
-        index = int(line[0:4])
-        de_alph = float(line[4:13])
-        de_alph_pct = float(line[14:19])
-        de_beta = float(line[21:30])
-        de_beta_pct = float(line[31:36])
-        dq_alph = float(line[38:46])
-        dq_alph_pct = float(line[47:52])
-        dq_beta = float(line[54:62])
-        dq_beta_pct = float(line[63:68])
-        entry = {
-            "index": index,
-            "de_alph": de_alph,
-            "de_alph_pct": de_alph_pct,
-            "de_beta": de_beta,
-            "de_beta_pct": de_beta_pct,
-            "dq_alph": dq_alph,
-            "dq_alph_pct": dq_alph_pct,
-            "dq_beta": dq_beta,
-            "dq_beta_pct": dq_beta_pct,
-        }
-        fragment_entries.append(entry)
-        line = next(outputfile)
-    # parse the 'total' line at the end of a block
-    if "-----" in line:
-        line = next(outputfile)
-        index = line[0:4].strip() + str(fragment_idx)
-        de_alph = float(line[4:13])
-        de_alph_pct = float(line[14:19])
-        de_beta = float(line[21:30])
-        de_beta_pct = float(line[31:36])
-        dq_alph = float(line[38:46])
-        dq_alph_pct = float(line[47:52])
-        dq_beta = float(line[54:62])
-        dq_beta_pct = float(line[63:68])
-        total = {
-            "index": index,
-            "de_alph": de_alph,
-            "de_alph_pct": de_alph_pct,
-            "de_beta": de_beta,
-            "de_beta_pct": de_beta_pct,
-            "dq_alph": dq_alph,
-            "dq_alph_pct": dq_alph_pct,
-            "dq_beta": dq_beta,
-            "dq_beta_pct": dq_beta_pct,
-        }
-
-    return total
-
-
 def determine_fragment_indices(fragment_1_to_2, fragment_2_to_1, covpenergies, n_mo, idx_homo):
     """
     Determine the actual orbital indices each COVP corresponds to.
@@ -265,26 +210,22 @@ def main(args):
     pct_cutoff = int(args["--pct_cutoff"])
 
     # pylint: disable=E1101
-    cclib_job = ccopen(outputfilename)
-    cclib_data = cclib_job.parse()
+    cclib_data = cached_parse_only(outputfilename, ["nmo", "homos", "moenergies"])
     n_mo = cclib_data.nmo
     idx_homo = cclib_data.homos[0]
     covpenergies = cclib_data.moenergies[-1]
 
-    fragment_1_to_2 = []
-    fragment_2_to_1 = []
     fragment_1_to_2_cutoff = []
     fragment_2_to_1_cutoff = []
     fragment_1_to_2_pairs = []
     fragment_2_to_1_pairs = []
 
     # Parse the COVP fragment print block for each fragment.
-    with open(outputfilename) as outputfile:
-        for line in outputfile:
-            if "From fragment 1 to fragment 2" in line:
-                fragment_1_to_2_tot = parse_fragment_block(outputfile, fragment_1_to_2, 1)
-            if "From fragment 2 to fragment 1" in line:
-                fragment_2_to_1_tot = parse_fragment_block(outputfile, fragment_2_to_1, 2)
+    covp = scan(outputfilename, [CovpHandler()])["covp"]
+    fragment_1_to_2 = covp["1_to_2"]
+    fragment_2_to_1 = covp["2_to_1"]
+    fragment_1_to_2_tot = covp["1_to_2_tot"]
+    fragment_2_to_1_tot = covp["2_to_1_tot"]
 
     # Determine the actual orbital indices each COVP corresponds to.
     fragment_indices = determine_fragment_indices(
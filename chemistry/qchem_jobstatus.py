@@ -0,0 +1,337 @@
+#!/usr/bin/env python
+
+"""qchem_jobstatus.py: Classify the Q-Chem outputs in a directory as
+completed, failed, scf-not-converged, max-opt-cycles, or running, and
+optionally move or delete the files belonging to the jobs with a given
+status.
+
+Each output is classified from its last few lines only (see
+`classify`), and the results are kept in a sqlite index along with the
+file's size and mtime, so later runs only read the outputs that have
+changed since. An unfinished job whose output hasn't been written to for
+--running-age seconds is considered failed rather than running.
+
+Paths are stored relative to the directory the index is in, so the
+same index can be used from anywhere, and moves along with the outputs.
+
+This replaces the qchem_*.bash scripts that ran grep over every output:
+
+    qchem_find_failed_calcs.bash       qchem_jobstatus.py -r --incomplete
+    qchem_move_completed_calcs.bash D  qchem_jobstatus.py --status completed --move D
+    qchem_move_failed_calcs.bash       qchem_jobstatus.py --incomplete --move incomplete
+    qchem_move_incomplete_geoms.bash D qchem_jobstatus.py --status max-opt-cycles --move D
+    qchem_remove_unfinished_geoms.bash qchem_jobstatus.py --incomplete --delete .xyz
+
+Rather than counting how many jobs in an output finished, the status is
+that of the last job in it. Unlike the old scripts, --incomplete leaves
+out running jobs, so they're never moved or deleted from under Q-Chem;
+give --status running explicitly to act on those.
+"""
+
+import glob
+import os
+import shutil
+import sqlite3
+import sys
+import time
+
+from utils import reverse_lines
+
+from batch_runner import Batch
+from qchem_scan import JOB_END_MARKER, JOB_START_MARKERS, TAIL_BYTES
+
+STATUSES = ("completed", "failed", "scf-not-converged", "max-opt-cycles", "running")
+
+# Lines that say why a job stopped, by the status they give. When several
+# are near the end of an output, the first status listed here wins, so an
+# error followed by the end banner is still a failure.
+STATUS_MARKERS = (
+    ("max-opt-cycles", ("MAXIMUM OPTIMIZATION CYCLES REACHED",)),
+    ("scf-not-converged", ("SCF failed to converge", "Convergence failure")),
+    ("failed", ("Q-Chem fatal error",)),
+    ("completed", (JOB_END_MARKER,)),
+)
+
+DEFAULT_RUNNING_AGE = 3600
+
+
+def getargs():
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    arg = parser.add_argument
+    arg("directory", nargs="?", default=".")
+    arg("-r", "--recursive", action="store_true", help="""Also look in subdirectories.""")
+    arg("--index", help="""The sqlite index (default: .qchem_jobstatus.sqlite in the directory).""")
+    arg("--status", nargs="+", choices=STATUSES, help="""Only act on jobs with these statuses.""")
+    arg(
+        "--incomplete",
+        action="store_true",
+        help="""Only act on jobs that stopped without completing (not running ones).""",
+    )
+    arg(
+        "--running-age",
+        type=float,
+        default=DEFAULT_RUNNING_AGE,
+        help="""Seconds since an unfinished output was last written before it's considered failed.""",
+    )
+    arg(
+        "--move",
+        metavar="DESTDIR",
+        help="""Move all the files for the jobs (stub.*) to this directory.""",
+    )
+    arg(
+        "--delete",
+        nargs="+",
+        metavar="EXT",
+        help="""Delete the files with these extensions (such as .xyz) for the jobs.""",
+    )
+    arg("--dry-run", action="store_true", help="""Only print what would be moved or deleted.""")
+    arg(
+        "-j",
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="""Number of outputs to read at once (default: number of cores).""",
+    )
+    return parser.parse_args()
+
+
+def classify(outputfilename, max_bytes=TAIL_BYTES):
+    """Return the (status, reason) of the last job in the output, from its
+    last max_bytes at most. The status is None if the job hasn't stopped,
+    and the reason is the line that gave the status.
+    """
+    found = dict()
+    for line in reverse_lines(outputfilename, max_bytes=max_bytes):
+        if any(marker in line for marker in JOB_START_MARKERS):
+            break
+        for status, markers in STATUS_MARKERS:
+            if status not in found and any(marker in line for marker in markers):
+                found[status] = line.strip()
+    for status, _ in STATUS_MARKERS:
+        if status in found:
+            return status, found[status]
+    return None, None
+
+
+def find_outputs(top, recursive=False):
+    """Yield (path, size, mtime_ns) for each Q-Chem output (*.out)."""
+    stack = [top]
+    while stack:
+        dirpath = stack.pop()
+        try:
+            with os.scandir(dirpath) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except OSError as e:
+            print(e, file=sys.stderr)
+            continue
+        subdirs = []
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                elif entry.name.endswith(".out") and entry.is_file():
+                    st = entry.stat()
+                    yield os.path.normpath(entry.path), st.st_size, st.st_mtime_ns
+            except OSError:
+                # Vanished since it was listed.
+                continue
+        if recursive:
+            stack.extend(reversed(subdirs))
+
+
+class JobIndex:
+    """The sqlite index of (path, size, mtime, status, reason), where
+    status is None for a job that hadn't stopped when it was last read.
+
+    Paths are given and returned as absolute paths, but stored relative
+    to the index's directory.
+    """
+
+    def __init__(self, filename):
+        self.base = os.path.dirname(os.path.abspath(filename))
+        self._conn = sqlite3.connect(filename, timeout=60)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS jobs (
+                path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, status TEXT, reason TEXT
+            )"""
+        )
+        self._conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self._conn.close()
+
+    def _key(self, path):
+        return os.path.relpath(os.path.abspath(path), self.base)
+
+    def jobs(self):
+        """Return {absolute path: (size, mtime_ns, status, reason)}."""
+        rows = self._conn.execute("SELECT path, size, mtime_ns, status, reason FROM jobs")
+        return {os.path.normpath(os.path.join(self.base, row[0])): row[1:] for row in rows}
+
+    def update(self, jobs, removed=()):
+        """Store the jobs, given as (path, size, mtime_ns, status,
+        reason), and forget the removed paths.
+        """
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO jobs VALUES (?, ?, ?, ?, ?)",
+                [(self._key(job[0]),) + tuple(job[1:]) for job in jobs],
+            )
+            self._conn.executemany(
+                "DELETE FROM jobs WHERE path = ?", [(self._key(path),) for path in removed]
+            )
+
+    def rename(self, old, new):
+        with self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET path = ? WHERE path = ?", (self._key(new), self._key(old))
+            )
+
+
+def in_sweep(path, top, recursive=False):
+    """Is the (absolute) path one that find_outputs(top, recursive) would
+    have found if it existed?
+    """
+    top = os.path.abspath(top)
+    if not recursive:
+        return os.path.dirname(path) == top
+    return os.path.commonpath([path, top]) == top
+
+
+def sweep(index, top, recursive=False, jobs=None):
+    """Bring the index up to date with the outputs under top, reading only
+    those that are new or whose size or mtime changed, and return
+    {path: (size, mtime_ns, status, reason)} for every output. Outputs
+    outside what was swept (in subdirectories when it isn't recursive, or
+    elsewhere when the index is shared) are left in the index.
+    """
+    known = index.jobs()
+    current = dict()
+    stale = []
+    for path, size, mtime_ns in find_outputs(top, recursive):
+        row = known.get(os.path.abspath(path))
+        if row is not None and row[:2] == (size, mtime_ns):
+            current[path] = row
+        else:
+            current[path] = (size, mtime_ns, None, None)
+            stale.append(path)
+
+    batch = Batch(classify, stale, jobs, unordered=True)
+    updated = []
+    for path, (status, reason) in batch:
+        current[path] = current[path][:2] + (status, reason)
+        updated.append((path,) + current[path])
+    for path, message in batch.failures:
+        # Leave it out of the index, so it's read again next time.
+        print("{}: {}".format(path, message), file=sys.stderr)
+        del current[path]
+    found = {os.path.abspath(path) for path in current}
+    removed = [path for path in known if path not in found and in_sweep(path, top, recursive)]
+    index.update(updated, removed=removed)
+    print(
+        "{} outputs, {} read".format(len(current), len(stale) - len(batch.failures)),
+        file=sys.stderr,
+    )
+    return current
+
+
+def job_status(status, reason, mtime_ns, running_age, now=None):
+    """Return the final (status, reason), deciding whether a job that
+    hasn't stopped is still running, from how long ago it was written.
+    """
+    if status is not None:
+        return status, reason
+    if now is None:
+        now = time.time()
+    idle = now - mtime_ns / 1e9
+    if idle < running_age:
+        return "running", None
+    return "failed", "no output for {:.1f} h".format(idle / 3600)
+
+
+def job_files(path):
+    """Return all the files for the job: those with the same stub, but not
+    those of another job whose stub starts with it (done.bar.out for
+    done.out).
+    """
+    stub = os.path.splitext(path)[0]
+    return sorted(
+        filename
+        for filename in glob.glob(glob.escape(stub) + ".*")
+        if os.path.splitext(filename)[0] == stub
+    )
+
+
+def move_job(index, path, destdir, dry_run=False):
+    for filename in job_files(path):
+        dest = os.path.join(destdir, os.path.basename(filename))
+        print("{} -> {}".format(filename, dest))
+        if dry_run:
+            continue
+        shutil.move(filename, dest)
+        if filename == path:
+            # The mtime doesn't change, so the move doesn't mean it has to
+            # be read again.
+            index.rename(path, dest)
+
+
+def delete_job_files(path, extensions, dry_run=False):
+    stub = os.path.splitext(path)[0]
+    for extension in extensions:
+        filename = stub + extension
+        if os.path.exists(filename):
+            print("removed {}".format(filename))
+            if not dry_run:
+                os.remove(filename)
+
+
+def main(args):
+    index_filename = args.index or os.path.join(args.directory, ".qchem_jobstatus.sqlite")
+    with JobIndex(index_filename) as index:
+        current = sweep(index, args.directory, args.recursive, args.jobs)
+
+        now = time.time()
+        counts = dict.fromkeys(STATUSES, 0)
+        selected = []
+        for path, (size, mtime_ns, status, reason) in sorted(current.items()):
+            status, reason = job_status(status, reason, mtime_ns, args.running_age, now)
+            counts[status] += 1
+            if args.status and status not in args.status:
+                continue
+            if args.incomplete and status in ("completed", "running"):
+                continue
+            selected.append((path, status, reason))
+
+        if args.move is None and args.delete is None:
+            for path, status, reason in selected:
+                if reason:
+                    print("{:17s} {} ({})".format(status, path, reason))
+                else:
+                    print("{:17s} {}".format(status, path))
+        if args.move is not None:
+            if not args.dry_run:
+                os.makedirs(args.move, exist_ok=True)
+            for path, _, _ in selected:
+                move_job(index, path, args.move, args.dry_run)
+        if args.delete is not None:
+            for path, _, _ in selected:
+                delete_job_files(path, args.delete, args.dry_run)
+
+    print(
+        ", ".join("{} {}".format(count, status) for status, count in counts.items()),
+        file=sys.stderr,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    args = getargs()
+    sys.exit(main(args))
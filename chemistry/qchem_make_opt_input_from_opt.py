@@ -16,18 +16,12 @@ import os.path
 import re
 from collections import OrderedDict
 
+from utils import make_file_iterator
+
 import cclib
 from cclib.parser.utils import PeriodicTable
 
 
-def make_file_iterator(filename):
-    """Return an iterator over the contents of the given file name."""
-    # pylint: disable=C0103
-    with open(filename) as f:
-        contents = f.read()
-    return iter(contents.splitlines())
-
-
 def getargs():
     """Get command-line arguments."""
 
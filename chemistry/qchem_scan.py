@@ -0,0 +1,613 @@
+#!/usr/bin/env python
+
+"""qchem_scan.py: Extract many things from a Q-Chem output file while
+reading it only once.
+
+Each handler registers the markers (substrings or compiled regexes) that
+start the section(s) it's interested in. A line that contains any marker
+is passed to its handler's `handle` method together with an iterator
+over the lines after it, so the handler can read the rest of its
+section. Lines a handler reads this way are then passed on to the other
+handlers as usual, so sections can be adjacent or overlap, and running
+out of lines only ends the section being read. Lines that don't contain
+any marker are skipped after a single combined regex search.
+
+    results = scan(outputfilename, [total_time(), step_times("scf_time", "SCF time:")])
+    time_wall, time_cpu = results["total_time"]
+
+Things that are printed at the very end of a job, such as the total time
+and whether it finished, can instead be found by reading the file
+backwards with `tail_total_time` and `job_finished`.
+"""
+
+import re
+from collections import deque
+
+from utils import find_last, make_file_iterator, reverse_lines
+
+# Matches the CPU and wall times in lines such as
+#  SCF time:   CPU 123.45s  wall 67.89s
+#  Gradient time:  CPU 12.34 s  wall 6.78 s
+re_cpu_wall = re.compile(r"CPU\s*(\d*\.\d*)\s*s\s*wall\s*(\d*\.\d*)\s*s")
+
+# Printed at the start, and at the normal end, of each job in an output
+# file. Later jobs in a multi-job output don't repeat the welcome banner,
+# but do announce themselves and echo their input.
+JOB_START_MARKERS = ("Welcome to Q-Chem", "Running Job", "User input:")
+JOB_END_MARKER = "Thank you very much for using Q-Chem"
+
+# A finished job only prints a few lines after JOB_END_MARKER, so it's
+# looked for within this many bytes of the end of the file.
+TAIL_BYTES = 1 << 16
+
+
+class Handler:
+    """Base class for extracting something from an output file.
+
+    The result is stored under `name` in the dictionary returned by
+    `scan`.
+    """
+
+    name = None
+    markers = ()
+
+    def handle(self, line, lines):
+        """Called for each line containing one of the markers."""
+        raise NotImplementedError
+
+    def result(self):
+        return None
+
+
+class LineHandler(Handler):
+    """Parse a value out of each line containing the marker, keeping all of
+    them (in a list), or only the first or last one. Lines for which parse
+    returns None are ignored.
+    """
+
+    def __init__(self, name, marker, parse, keep="all"):
+        if keep not in ("all", "first", "last"):
+            raise ValueError("keep must be 'all', 'first', or 'last': {}".format(keep))
+        self.name = name
+        self.markers = (marker,)
+        self.parse = parse
+        self.keep = keep
+        self.values = []
+
+    def handle(self, line, lines):
+        if self.keep == "first" and self.values:
+            return
+        value = self.parse(line)
+        if value is not None:
+            if self.keep == "last":
+                self.values = [value]
+            else:
+                self.values.append(value)
+
+    def result(self):
+        if self.keep == "all":
+            return self.values
+        return self.values[0] if self.values else None
+
+
+def parse_total_time(line):
+    """Return the (wall, CPU) seconds from the 'Total job time' line."""
+    tokens = line.split()
+    time_wall_str, time_cpu_str = tokens[3], tokens[4]
+    return float(time_wall_str[:-8]), float(time_cpu_str[:-6])
+
+
+def total_time():
+    """The (wall, CPU) total job time in seconds, or None for an
+    unfinished job.
+    """
+    return LineHandler("total_time", "Total job time", parse_total_time, keep="last")
+
+
+def step_times(name, marker, idx_cpu=None, idx_wall=None):
+    """A list of the (CPU, wall) times from every line containing the
+    marker, either at the given token indices, or else following 'CPU' and
+    'wall'.
+    """
+    if idx_cpu is None:
+
+        def parse(line):
+            match = re_cpu_wall.search(line)
+            if match:
+                return float(match.group(1)), float(match.group(2))
+
+    else:
+
+        def parse(line):
+            sline = line.split()
+            return float(sline[idx_cpu]), float(sline[idx_wall])
+
+    return LineHandler(name, marker, parse)
+
+
+def integral_threads():
+    """The number of threads used for integrals."""
+    return LineHandler(
+        "nthreads", "threads for integral computing", lambda line: int(line.split()[1]), "first"
+    )
+
+
+class NatomHandler(Handler):
+    """The number of atoms in the first 'Standard Nuclear Orientation'
+    block.
+    """
+
+    name = "natom"
+    markers = ("Standard Nuclear Orientation",)
+
+    def __init__(self):
+        self.natom = None
+
+    def handle(self, line, lines):
+        if self.natom is not None:
+            return
+        # column headers, then dashes
+        next(lines)
+        next(lines)
+        natom = 0
+        line = next(lines)
+        while "-----" not in line:
+            natom += 1
+            line = next(lines)
+        self.natom = natom
+
+    def result(self):
+        return self.natom
+
+
+class VibfreqsHandler(Handler):
+    """The harmonic frequencies (in cm^-1) from the last vibrational
+    analysis.
+    """
+
+    name = "vibfreqs"
+    markers = ("VIBRATIONAL ANALYSIS", " Frequency:")
+
+    def __init__(self):
+        self.vibfreqs = None
+
+    def handle(self, line, lines):
+        if "VIBRATIONAL ANALYSIS" in line:
+            self.vibfreqs = []
+        elif self.vibfreqs is not None:
+            self.vibfreqs.extend(float(x) for x in line.split()[1:])
+
+    def result(self):
+        return self.vibfreqs
+
+
+class AnharmonicHandler(Handler):
+    """The TOSH, VPT2, and VCI frequencies from a vibrational anharmonic
+    analysis, as a dictionary for each (one-based) mode whose keys are
+    'tosh', 'vpt2', and 'vci' followed by the number of quanta.
+    """
+
+    name = "anharmonic"
+    markers = ("VIBRATIONAL ANHARMONIC ANALYSIS",)
+
+    def __init__(self):
+        self.mode_dict = dict()
+
+    def handle(self, line, lines):
+        while "TOSH" not in line:
+            line = next(lines)
+
+        while line.strip().split() != []:
+            mode = int(line[6:8])
+            entry = self.mode_dict.setdefault(mode, dict())
+            entry["tosh"] = float(line[9:22])
+            entry["vpt2"] = float(line[30:])
+            line = next(lines)
+
+        line = next(lines)
+        while list(set(line.strip())) != ["="]:
+            if line.strip().split() != []:
+                quantum = line[5:7].strip()
+                key = "vci" + quantum
+                mode = int(line[13:15])
+                freq = float(line.split()[-1])
+                self.mode_dict.setdefault(mode, dict())[key] = freq
+            line = next(lines)
+
+    def result(self):
+        return self.mode_dict
+
+
+def parse_fragment_block(outputfile, fragment_entries, fragment_idx):
+    """Parse a single COVP fragment block, appending an entry for each COVP
+    and returning the 'total' line at the end of the block.
+    """
+    next(outputfile)
+    next(outputfile)
+    next(outputfile)
+    line = next(outputfile)
+    while "-----" not in line:
+        index = int(line[0:4])
+        de_alph = float(line[4:13])
+        de_alph_pct = float(line[14:19])
+        de_beta = float(line[21:30])
+        de_beta_pct = float(line[31:36])
+        dq_alph = float(line[38:46])
+        dq_alph_pct = float(line[47:52])
+        dq_beta = float(line[54:62])
+        dq_beta_pct = float(line[63:68])
+        entry = {
+            "index": index,
+            "de_alph": de_alph,
+            "de_alph_pct": de_alph_pct,
+            "de_beta": de_beta,
+            "de_beta_pct": de_beta_pct,
+            "dq_alph": dq_alph,
+            "dq_alph_pct": dq_alph_pct,
+            "dq_beta": dq_beta,
+            "dq_beta_pct": dq_beta_pct,
+        }
+        fragment_entries.append(entry)
+        line = next(outputfile)
+    # parse the 'total' line at the end of a block
+    if "-----" in line:
+        line = next(outputfile)
+        index = line[0:4].strip() + str(fragment_idx)
+        de_alph = float(line[4:13])
+        de_alph_pct = float(line[14:19])
+        de_beta = float(line[21:30])
+        de_beta_pct = float(line[31:36])
+        dq_alph = float(line[38:46])
+        dq_alph_pct = float(line[47:52])
+        dq_beta = float(line[54:62])
+        dq_beta_pct = float(line[63:68])
+        total = {
+            "index": index,
+            "de_alph": de_alph,
+            "de_alph_pct": de_alph_pct,
+            "de_beta": de_beta,
+            "de_beta_pct": de_beta_pct,
+            "dq_alph": dq_alph,
+            "dq_alph_pct": dq_alph_pct,
+            "dq_beta": dq_beta,
+            "dq_beta_pct": dq_beta_pct,
+        }
+
+    return total
+
+
+class CovpHandler(Handler):
+    """The COVP table for each direction of charge transfer, as
+    {'1_to_2': entries, '1_to_2_tot': total, '2_to_1': ..., '2_to_1_tot': ...}.
+    """
+
+    name = "covp"
+    markers = ("From fragment 1 to fragment 2", "From fragment 2 to fragment 1")
+
+    def __init__(self):
+        self.tables = dict()
+
+    def handle(self, line, lines):
+        if "From fragment 1 to fragment 2" in line:
+            key, fragment_idx = "1_to_2", 1
+        else:
+            key, fragment_idx = "2_to_1", 2
+        entries = []
+        self.tables[key + "_tot"] = parse_fragment_block(lines, entries, fragment_idx)
+        self.tables[key] = entries
+
+    def result(self):
+        return self.tables
+
+
+def qchem_get_cis_energies(inputfile, do_quartet=False):
+    multiplicity_map = {
+        "Singlet": 0.0,
+        "Doublet": 0.75,
+        "Triplet": 2.0,
+        "Quartet": 3.75,
+    }
+    state_energies = []
+    state_spins = []
+    state_strengths = []
+    line = ""
+    while "Excited state" not in line:
+        line = next(inputfile)
+    # RCIS: print all singlet/triplet in one block
+    # UCIS: print all in one block
+    # ROCIS: print doublet and quartet in separate blocks
+    while list(set(line.strip())) != ["-"]:
+        if "Total energy for state" in line:
+            state_energies.append(float(line.split()[-1]))
+        if "<S**2>" in line:
+            state_spins.append(float(line.split()[-1]))
+        if "Multiplicity" in line:
+            state_spins.append(multiplicity_map[line.split()[1]])
+        if "Strength" in line:
+            state_strengths.append(float(line.split()[-1]))
+        line = next(inputfile)
+    if do_quartet:
+        while "Excited state" not in line:
+            line = next(inputfile)
+        while list(set(line.strip())) != ["-"]:
+            if "Total energy for state" in line:
+                state_energies.append(float(line.split()[-1]))
+            if "Multiplicity" in line:
+                state_spins.append(multiplicity_map[line.split()[1]])
+            if "Strength" in line:
+                state_strengths.append(float(line.split()[-1]))
+            line = next(inputfile)
+    return state_energies
+
+
+def qchem_get_cisd_energies(inputfile, energy_gs):
+    from cclib.parser.utils import convertor
+
+    state_energies = []
+    line = ""
+    while "CIS(D) excitation energy" not in line:
+        line = next(inputfile)
+    while list(set(line.strip())) != ["-"]:
+        if "CIS(D) excitation energy" in line:
+            # Stupid Q-Chem!
+            energy_es = energy_gs + convertor(float(line.split()[-2]), "eV", "hartree")
+            state_energies.append(energy_es)
+        line = next(inputfile)
+    return state_energies
+
+
+def qchem_get_ricisd_energies(inputfile):
+    state_energies = []
+    line = ""
+    while "Excited state" not in line:
+        line = next(inputfile)
+    while list(set(line.strip())) != ["-"]:
+        if "Total energy for state" in line:
+            state_energies.append(float(line.split()[-2]))
+        line = next(inputfile)
+    return state_energies
+
+
+def qchem_get_eom_energies_ccman1(inputfile):
+    state_energies = []
+    line = ""
+    while "Excitation energies, hartree" not in line:
+        line = next(inputfile)
+    while "Analysis of SCF Wavefunction" not in line:
+        if "hartree (Ex Ene" in line:
+            sline = line.split()
+            state_energies.append(float(sline[5][4:]))
+        line = next(inputfile)
+    return state_energies
+
+
+def qchem_get_eom_energies_ccman2(inputfile):
+    state_energies = []
+    line = ""
+    while "EOMEE-CCSD transition" not in line:
+        line = next(inputfile)
+    while "Analysis of SCF Wavefunction" not in line:
+        if "Total energy" in line:
+            state_energies.append(float(line.split()[3]))
+        line = next(inputfile)
+    return state_energies
+
+
+class ExcitationEnergiesHandler(Handler):
+    """The ground state energy and the total energies of the excited states
+    (both in hartree), as {'energy_gs': ..., 'energies_es': [...]}.
+
+    With correlated_gs_energy, the ground state energy is the correlated
+    (RI-MP2, MP2, CCSD, ...) one rather than the SCF one.
+    """
+
+    name = "excitation_energies"
+
+    matches_ccman1 = (
+        "DOING EOM-CCSD CALCULATIONS",
+        "GENUINE CIS CODE",
+        "GENUINE CISD CODE",
+        "GENUINE CISDT CODE",
+    )
+
+    matches_correlated_gs_energies_cdman = (
+        # Shows up in RI-CIS(D) calculations.
+        "RIMP2         total energy",
+        # Shows up in SOS-CIS(D) and SOS-CIS(D0) calculations.
+        "Total SOS-MP2 energy",
+        # Shows up in CIS(D) calculations (without RI).
+        "Total ground state energy",
+    )
+
+    def __init__(self, correlated_gs_energy=False):
+        self.correlated_gs_energy = correlated_gs_energy
+        self.markers = (
+            " restricted ",
+            "Total energy in the final basis set",
+            "Doublet and Quartet excitation energies requested",
+            "Excitation Energies",
+            "Solving for EOM-CCSD",
+        ) + self.matches_ccman1
+        if correlated_gs_energy:
+            self.markers += self.matches_correlated_gs_energies_cdman + (
+                re.compile("ccsd total energy", re.IGNORECASE),
+            )
+        self.unrestricted = True
+        self.do_quartet = False
+        self.energy_gs = None
+        self.energies_es = None
+
+    def handle(self, line, lines):
+        # Are we using a ROHF reference?
+        if " restricted " in line:
+            self.unrestricted = False
+        # This is the RHF/ROHF/UHF ground state energy.
+        if "Total energy in the final basis set" in line:
+            self.energy_gs = float(line.split()[-1])
+        # Do we want a correlated ground state energy instead?
+        # (RI-MP2, MP2, CCSD, ...)
+        if self.correlated_gs_energy:
+            # Runs that call cdman will match here.
+            if any(match in line for match in self.matches_correlated_gs_energies_cdman):
+                self.energy_gs = float(line.split()[-2])
+            # Runs that call ccman/ccman2 will match here.
+            if "ccsd total energy" in line.lower():
+                self.energy_gs = float(line.split()[-1])
+        if "Doublet and Quartet excitation energies requested" in line:
+            self.do_quartet = True
+        if "CIS Excitation Energies" in line:
+            self.energies_es = qchem_get_cis_energies(lines, self.do_quartet)
+        if "TDDFT/TDA Excitation Energies" in line:
+            self.energies_es = qchem_get_cis_energies(lines)
+        if line.strip() == "CIS(D) Excitation Energies":
+            self.energies_es = qchem_get_cisd_energies(lines, self.energy_gs)
+        if line.strip() == "RI-CIS(D) Excitation Energies":
+            self.energies_es = qchem_get_ricisd_energies(lines)
+        if line.strip() == "SOS-CIS(D) Excitation Energies":
+            self.energies_es = qchem_get_ricisd_energies(lines)
+        if line.strip() == "SOS-CIS(D0) Excitation Energies":
+            self.energies_es = qchem_get_cis_energies(lines, self.unrestricted)
+        if "Solving for EOM-CCSD" in line:
+            self.energies_es = qchem_get_eom_energies_ccman2(lines)
+        if any(line.strip() == match for match in self.matches_ccman1):
+            self.energies_es = qchem_get_eom_energies_ccman1(lines)
+
+    def result(self):
+        return {"energy_gs": self.energy_gs, "energies_es": self.energies_es}
+
+
+def default_handlers(correlated_gs_energy=False):
+    """Return new instances of all the handlers defined here."""
+    return [
+        total_time(),
+        step_times("scf_time", "SCF time:"),
+        step_times("gradient_time", "Gradient time:"),
+        step_times("dynamics_step_time", "Time for this dynamics step:", 5, 8),
+        integral_threads(),
+        NatomHandler(),
+        VibfreqsHandler(),
+        AnharmonicHandler(),
+        CovpHandler(),
+        ExcitationEnergiesHandler(correlated_gs_energy),
+    ]
+
+
+def _marker_pattern(marker):
+    if isinstance(marker, str):
+        return re.escape(marker)
+    if marker.flags & re.IGNORECASE:
+        return "(?i:{})".format(marker.pattern)
+    return "(?:{})".format(marker.pattern)
+
+
+def _marker_in(marker, line):
+    if isinstance(marker, str):
+        return marker in line
+    return marker.search(line) is not None
+
+
+class _Section:
+    """The lines after a handler's marker, for it to read its section from:
+    first any lines already read ahead by other handlers, then the rest of
+    the file. Each line read is kept, along with the handlers that have
+    now seen it, so it can be passed on to the others afterwards.
+    """
+
+    def __init__(self, handler, pending, lines):
+        self.handler = handler
+        self.pending = pending
+        self.lines = lines
+        self.read = []
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.pending:
+            line, seen = self.pending.popleft()
+        else:
+            line, seen = next(self.lines), frozenset()
+        self.read.append((line, seen | {id(self.handler)}))
+        return line
+
+
+def scan(outputfilename, handlers=None):
+    """Read the output file once, passing each line that contains a marker
+    to the handlers registered for it, and return a dictionary of each
+    handler's result by its name. Without any handlers, all the default
+    ones are used.
+
+    A truncated file (a handler running out of lines in the middle of its
+    section) isn't an error; the results so far are returned.
+    """
+    if handlers is None:
+        handlers = default_handlers()
+    dispatch = [(marker, handler) for handler in handlers for marker in handler.markers]
+    if dispatch:
+        prefilter = re.compile("|".join(_marker_pattern(marker) for marker, _ in dispatch))
+        with make_file_iterator(outputfilename) as lines:
+            # Lines that handlers read ahead, as (line, ids of the handlers
+            # that have seen it), to go through before the rest of the file.
+            pending = deque()
+            while True:
+                if pending:
+                    line, seen = pending.popleft()
+                else:
+                    line, seen = next(lines, None), frozenset()
+                    if line is None:
+                        break
+                if not prefilter.search(line):
+                    continue
+                called = set(seen)
+                for marker, handler in dispatch:
+                    if id(handler) not in called and _marker_in(marker, line):
+                        called.add(id(handler))
+                        section = _Section(handler, pending, lines)
+                        try:
+                            handler.handle(line, section)
+                        except StopIteration:
+                            pass
+                        pending.extendleft(reversed(section.read))
+    return {handler.name: handler.result() for handler in handlers}
+
+
+def tail_total_time(outputfilename):
+    """Return the (wall, CPU) total job time in seconds of the last job
+    that has one, or None, reading the output file backwards from the end.
+
+    This gives the same result as scanning with total_time(), but a
+    finished output is only read as far back as its last few lines.
+    """
+    lines = find_last(outputfilename, ["Total job time"])["Total job time"]
+    if not lines:
+        return None
+    return parse_total_time(lines[-1])
+
+
+def job_finished(outputfilename, max_bytes=TAIL_BYTES):
+    """Did the last job in the output file finish normally?
+
+    Only the last max_bytes of the file are read, backwards, stopping at
+    the first end-of-job or start-of-job marker, so an earlier job in the
+    same file that finished doesn't count.
+    """
+    for line in reverse_lines(outputfilename, max_bytes=max_bytes):
+        if JOB_END_MARKER in line:
+            return True
+        if any(marker in line for marker in JOB_START_MARKERS):
+            return False
+    return False
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("outputfilename", nargs="+")
+    parser.add_argument("--correlated-gs-energy", action="store_true")
+    args = parser.parse_args()
+
+    for outputfilename in args.outputfilename:
+        results = scan(outputfilename, default_handlers(args.correlated_gs_energy))
+        print(json.dumps({outputfilename: results}, indent=2))
@@ -1,38 +1,37 @@
 #!/usr/bin/env python
 
 import numpy as np
+from batch_runner import Batch, add_batch_arguments
+from qchem_scan import tail_total_time
 
 np_formatter = {"float_kind": lambda x: "{:14.8f}".format(x)}
 np.set_printoptions(linewidth=200, formatter=np_formatter)
 
 
 def qchem_get_total_times(outputfilename):
-    time_wall, time_cpu = None, None
-    with open(outputfilename) as fh:
-        for line in fh:
-            if "Total job time" in line:
-                tokens = line.split()
-                time_wall_str, time_cpu_str = tokens[3], tokens[4]
-                time_wall = float(time_wall_str[:-8])
-                time_cpu = float(time_cpu_str[:-6])
-    return time_wall, time_cpu
+    times = tail_total_time(outputfilename)
+    if times is None:
+        return None, None
+    return times
 
 
 if __name__ == "__main__":
 
     import argparse
+    import sys
 
     parser = argparse.ArgumentParser()
 
     parser.add_argument("outputfile", nargs="+")
+    add_batch_arguments(parser)
 
     args = parser.parse_args()
 
     times_wall = []
     times_cpu = []
 
-    for outputfilename in args.outputfile:
-        time_wall, time_cpu = qchem_get_total_times(outputfilename)
+    batch = Batch(qchem_get_total_times, args.outputfile, args.jobs, args.unordered)
+    for outputfilename, (time_wall, time_cpu) in batch:
         if time_wall:
             times_wall.append(time_wall)
         if time_cpu:
@@ -55,3 +54,4 @@ if __name__ == "__main__":
     print(
         "mean +/- stdev: {:f} +/- {:f}".format(np.mean(times_hours_wall), np.std(times_hours_wall))
     )
+    sys.exit(batch.report_failures())
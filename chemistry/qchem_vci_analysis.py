@@ -11,55 +11,26 @@ import argparse
 from collections import OrderedDict
 from itertools import count
 
-from cclib.io import ccread
+from qchem_scan import AnharmonicHandler, VibfreqsHandler, scan
 
 
 def parse_vibrational_anharmonic_analysis(outputfilename):
-    cclib_data = ccread(outputfilename)
+    results = scan(outputfilename, [VibfreqsHandler(), AnharmonicHandler()])
 
     # If we can't even find harmonic frequencies, jump out here.
-    try:
-        nmodes = len(cclib_data.vibfreqs)
-    except:
+    if not results["vibfreqs"]:
         return dict()
+    nmodes = len(results["vibfreqs"])
 
     mode_dict = dict()
     for mode in range(1, nmodes + 1):
         mode_dict[mode] = OrderedDict()
 
-    for mode, harmonic_frequency in zip(count(start=1), cclib_data.vibfreqs):
+    for mode, harmonic_frequency in zip(count(start=1), results["vibfreqs"]):
         mode_dict[mode]["harmonic"] = harmonic_frequency
 
-    with open(outputfilename) as outputfile:
-        line = ""
-        while "VIBRATIONAL ANHARMONIC ANALYSIS" not in line:
-            try:
-                line = next(outputfile)
-            # We only need one try/except, since if we don't match here,
-            # we'll never match.
-            except StopIteration:
-                return mode_dict
-        while "TOSH" not in line:
-            line = next(outputfile)
-
-        while line.strip().split() != []:
-            mode = int(line[6:8])
-            mode_dict[mode]["tosh"] = float(line[9:22])
-            mode_dict[mode]["vpt2"] = float(line[30:])
-            line = next(outputfile)
-
-        line = next(outputfile)
-        while list(set(line.strip())) != ["="]:
-            if line.strip().split() != []:
-                quantum = line[5:7].strip()
-                key = "vci" + quantum
-                mode = int(line[13:15])
-                # quanta = float(line.split()[-4])
-                freq = float(line.split()[-1])
-                mode_dict[mode][key] = freq
-                line = next(outputfile)
-            else:
-                line = next(outputfile)
+    for mode, frequencies in results["anharmonic"].items():
+        mode_dict[mode].update(frequencies)
 
     return mode_dict
 
@@ -3,16 +3,80 @@
 
 import filecmp
 import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor, ThreadPoolExecutor
 from enum import Enum, unique
+from functools import partial
+from itertools import zip_longest
 from pathlib import Path
-from typing import List, Tuple, Union, Sequence
+from typing import (
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Pattern,
+    Tuple,
+    TypeVar,
+    Union,
+    Sequence,
+)
 
 from attr import attrib, attrs
-from attr.validators import instance_of
+from attr.validators import instance_of, optional
 
 from blessings import Terminal
 
 
+# blake2b is truncated so that its digests are the same width as md5's.
+HASH_ALGORITHMS = {
+    "blake2b": partial(hashlib.blake2b, digest_size=16),
+    "md5": hashlib.md5,
+    "sha1": hashlib.sha1,
+}
+CHUNK_SIZE = 1 << 20
+
+# Paths that commonly vary between otherwise identical text outputs
+# produced on different nodes, and what to replace them with. Only whole
+# path components match, so not /usr/local or x/tmpfoo.
+PATH_PATTERNS = (
+    (rb"(?<![\w/])(?:/scratch|/tmp|/var/tmp|/local)(?![\w-])(?:/[^\s'\"]*)?", b"<SCRATCH>"),
+)
+
+# Other things that vary between runs.
+VOLATILE_PATTERNS = (
+    # hostnames
+    (rb"(?i)\b(host(?:name)?\s*[:=]\s*)\S+", rb"\1<HOST>"),
+    # timestamps, both ctime-style and ISO 8601
+    (
+        rb"\b(?:Mon|Tue|Wed|Thu|Fri|Sat|Sun)\s+(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)"
+        rb"\s+\d+\s+\d\d:\d\d:\d\d\s+\d{4}\b",
+        b"<TIMESTAMP>",
+    ),
+    (rb"\b\d{4}-\d\d-\d\d[T ]\d\d:\d\d:\d\d(?:\.\d+)?\b", b"<TIMESTAMP>"),
+    # job timings, such as "1.23s(wall)", "CPU 4.56s wall 7.89s", and "wall
+    # time: 00:01:23", but not counts such as "CPU: 4"
+    (rb"\d+(?:\.\d*)?\s*s\s*\((?:wall|cpu)\)", b"<TIME>"),
+    (
+        rb"(?i)\b(cpu|wall)(\s+time)?([\s:=]+)"
+        rb"(?:\d+(?:\.\d*)?\s*(?:s|secs?|seconds)\b|\d+:\d\d(?::\d\d)?(?:\.\d+)?)",
+        rb"\1\2\3<TIME>",
+    ),
+)
+
+T = TypeVar("T")
+U = TypeVar("U")
+
+
+def default_cache_dir() -> Path:
+    return Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "compare"
+
+
 def getargs():
     import argparse
 
@@ -21,8 +85,35 @@ def getargs():
     arg("dir1", type=Path)
     arg("dir2", type=Path)
     arg("--interleaved", action="store_true")
+    arg(
+        "--normalize",
+        action="store_true",
+        help="mark files that only differ in paths, hostnames, timestamps, or timings",
+    )
+    arg(
+        "--volatile",
+        action="append",
+        default=[],
+        metavar="REGEX",
+        help="with --normalize, also ignore anything matching this (can be repeated)",
+    )
     arg("--write-files", action="store_true")
     arg("--nonrecursive", action="store_true")
+    arg("--algorithm", choices=sorted(HASH_ALGORITHMS), default="md5")
+    arg("-j", "--jobs", type=int, help="number of files to hash at once")
+    arg(
+        "--cache-dir",
+        type=Path,
+        default=default_cache_dir(),
+        help="where to keep the per-tree digest caches",
+    )
+    cache = parser.add_mutually_exclusive_group()
+    cache.add_argument(
+        "--no-cache", action="store_true", help="neither read nor write cached digests"
+    )
+    cache.add_argument(
+        "--rebuild-cache", action="store_true", help="discard cached digests and rehash everything"
+    )
     return parser.parse_args()
 
 
@@ -95,15 +186,175 @@ def get_common_files_recursive(
     return files1, files2, dir1_only, dir2_only
 
 
-def get_digests(filenames: List[Path]) -> List[str]:
-    digests = []
-    for filename in filenames:
-        # TODO what's faster, this or shelling out to md5/md5sum?
-        m = hashlib.md5()
-        with open(filename, "rb") as handle:
-            m.update(handle.read())
-        digests.append(m.hexdigest())
-    return digests
+def digest_width(algorithm: str) -> int:
+    return 2 * HASH_ALGORITHMS[algorithm]().digest_size
+
+
+def hash_file(filename: Path, algorithm: str = "md5", chunk_size: int = CHUNK_SIZE) -> str:
+    """Hash the file a fixed-size chunk at a time, so it never has to fit
+    in memory.
+    """
+    m = HASH_ALGORITHMS[algorithm]()
+    buf = bytearray(chunk_size)
+    view = memoryview(buf)
+    with open(filename, "rb", buffering=0) as handle:
+        while True:
+            nread = handle.readinto(buf)
+            if not nread:
+                break
+            m.update(view[:nread])
+    return m.hexdigest()
+
+
+class DigestCache:
+    """An on-disk (sqlite) cache of the digests of the files in one
+    directory tree.
+
+    Entries are keyed on a file's device and inode, and are only reused if
+    its size and modification time are also unchanged. The same cache is
+    safe to use from multiple hashing threads.
+    """
+
+    # Files modified this recently might still be changing within the
+    # resolution of their mtime, so aren't cached.
+    RACY_NS = 2_000_000_000
+    COMMIT_EVERY = 1000
+
+    def __init__(self, top: Path, cache_dir: Path, rebuild: bool = False) -> None:
+        top = top.resolve(strict=True)
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        tag = hashlib.sha1(str(top).encode()).hexdigest()[:16]
+        self.filename = cache_dir / f"{top.name}-{tag}.sqlite"
+        self._lock = threading.Lock()
+        self._uncommitted = 0
+        self._conn = sqlite3.connect(str(self.filename), check_same_thread=False)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS digests (
+                device INTEGER, inode INTEGER, algorithm TEXT,
+                size INTEGER, mtime_ns INTEGER, digest TEXT,
+                PRIMARY KEY (device, inode, algorithm)
+            )"""
+        )
+        if rebuild:
+            self._conn.execute("DELETE FROM digests")
+        self._conn.commit()
+
+    def __enter__(self) -> "DigestCache":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
+
+    def digest(self, filename: Path, st: os.stat_result, algorithm: str) -> str:
+        """Return the digest of the file with the given stat result, only
+        hashing it if there's no valid cached digest.
+        """
+        key = (st.st_dev, st.st_ino, algorithm)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size, mtime_ns, digest FROM digests"
+                " WHERE device = ? AND inode = ? AND algorithm = ?",
+                key,
+            ).fetchone()
+        if row is not None and row[:2] == (st.st_size, st.st_mtime_ns):
+            return row[2]
+        digest = hash_file(filename, algorithm)
+        if st.st_mtime_ns < time.time_ns() - self.RACY_NS:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO digests VALUES (?, ?, ?, ?, ?, ?)",
+                    key + (st.st_size, st.st_mtime_ns, digest),
+                )
+                self._uncommitted += 1
+                if self._uncommitted >= self.COMMIT_EVERY:
+                    self._conn.commit()
+                    self._uncommitted = 0
+        return digest
+
+
+def digest_file(
+    filename: Path, st: os.stat_result, algorithm: str, cache: Optional[DigestCache]
+) -> str:
+    if cache is None:
+        return hash_file(filename, algorithm)
+    return cache.digest(filename, st, algorithm)
+
+
+@attrs(frozen=True, slots=True)
+class Normalizer:
+    """Rewrites the volatile parts of lines of text to canonical
+    placeholders: paths first, then everything else.
+    """
+
+    paths: Tuple[Tuple[Pattern, bytes], ...] = attrib()
+    others: Tuple[Tuple[Pattern, bytes], ...] = attrib()
+
+    @staticmethod
+    def for_tree(top: Path, extra_patterns: Sequence[str] = ()) -> "Normalizer":
+        # The tree's own root is replaced first, so that the scratch
+        # pattern doesn't get to part of it.
+        roots = sorted({str(top), str(top.resolve())}, key=len, reverse=True)
+        paths = [(re.compile(re.escape(os.fsencode(root))), b"<ROOT>") for root in roots]
+        paths.extend((re.compile(pattern), repl) for pattern, repl in PATH_PATTERNS)
+        others = [(re.compile(pattern), repl) for pattern, repl in VOLATILE_PATTERNS]
+        others.extend((re.compile(os.fsencode(p)), b"<VOLATILE>") for p in extra_patterns)
+        return Normalizer(tuple(paths), tuple(others))
+
+    def normalize_paths(self, line: bytes) -> bytes:
+        for pattern, repl in self.paths:
+            line = pattern.sub(repl, line)
+        return line
+
+    def __call__(self, line: bytes) -> bytes:
+        line = self.normalize_paths(line)
+        for pattern, repl in self.others:
+            line = pattern.sub(repl, line)
+        return line
+
+
+def compare_normalized(f1: Path, f2: Path, norm1: Normalizer, norm2: Normalizer) -> "DiffType":
+    """Stream both files line by line, and return INNER_PATHS_DIFFER if
+    they're the same once paths have been normalized, VOLATILE_DIFFERS if
+    they're the same once everything volatile has been, and otherwise
+    SOMETHING_ELSE_DIFFERS. Stops at the first real difference. Binary
+    files are never considered equal.
+    """
+    diff_type = DiffType.INNER_PATHS_DIFFER
+    with open(f1, "rb", buffering=CHUNK_SIZE) as h1, open(f2, "rb", buffering=CHUNK_SIZE) as h2:
+        for line1, line2 in zip_longest(h1, h2):
+            if line1 is None or line2 is None:
+                return DiffType.SOMETHING_ELSE_DIFFERS
+            if b"\0" in line1 or b"\0" in line2:
+                return DiffType.SOMETHING_ELSE_DIFFERS
+            if line1 == line2:
+                continue
+            line1, line2 = norm1.normalize_paths(line1), norm2.normalize_paths(line2)
+            if line1 == line2:
+                continue
+            if norm1(line1) != norm2(line2):
+                return DiffType.SOMETHING_ELSE_DIFFERS
+            diff_type = DiffType.VOLATILE_DIFFERS
+    return diff_type
+
+
+def bounded_map(
+    executor: Executor, fn: Callable[[T], U], iterable: Iterable[T], window: int
+) -> Iterator[U]:
+    """Like Executor.map, but only submit up to window items ahead of the
+    one being yielded, rather than consuming the whole iterable up front.
+    """
+    pending = deque()
+    for item in iterable:
+        pending.append(executor.submit(fn, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
 
 
 @unique
@@ -111,30 +362,172 @@ class DiffType(Enum):
     SAME = 0
     INNER_PATHS_DIFFER = 1
     SOMETHING_ELSE_DIFFERS = 2
+    # Same apart from hostnames, timestamps, timings, or --volatile.
+    VOLATILE_DIFFERS = 3
 
 
 @attrs(frozen=True, slots=True)
 class Diff:
     f1: Path = attrib(validator=instance_of(Path))
     f2: Path = attrib(validator=instance_of(Path))
-    d1: str = attrib(validator=instance_of(str))
-    d2: str = attrib(validator=instance_of(str))
-    diff_type: DiffType = attrib(validator=instance_of(DiffType), init=False)
+    # The digests are None when they weren't computed because the file
+    # sizes already differ.
+    d1: Optional[str] = attrib(validator=optional(instance_of(str)))
+    d2: Optional[str] = attrib(validator=optional(instance_of(str)))
+    diff_type: DiffType = attrib(validator=instance_of(DiffType))
 
     @diff_type.default
     def init_diff_type(self) -> DiffType:
-        if self.d1 != self.d2:
+        if self.d1 is None or self.d2 is None or self.d1 != self.d2:
             return DiffType.SOMETHING_ELSE_DIFFERS
         else:
             return DiffType.SAME
 
     @staticmethod
-    def from_files(f1: Path, f2: Path) -> "Diff":
-        d1, d2 = get_digests([f1, f2])
-        return Diff(f1, f2, d1, d2)
-
+    def from_files(
+        f1: Path,
+        f2: Path,
+        algorithm: str = "md5",
+        cache1: Optional[DigestCache] = None,
+        cache2: Optional[DigestCache] = None,
+        normalizers: Optional[Tuple[Normalizer, Normalizer]] = None,
+    ) -> "Diff":
+        return Diff.from_stats(
+            f1, os.stat(f1), f2, os.stat(f2), algorithm, cache1, cache2, normalizers
+        )
 
-def main(dir1: Path, dir2: Path, recursive: bool) -> None:
+    @staticmethod
+    def from_stats(
+        f1: Path,
+        st1: os.stat_result,
+        f2: Path,
+        st2: os.stat_result,
+        algorithm: str = "md5",
+        cache1: Optional[DigestCache] = None,
+        cache2: Optional[DigestCache] = None,
+        normalizers: Optional[Tuple[Normalizer, Normalizer]] = None,
+    ) -> "Diff":
+        """If normalizers are given, files that differ are compared again
+        after normalizing them, and are marked as INNER_PATHS_DIFFER or
+        VOLATILE_DIFFERS if they then match (see compare_normalized).
+        """
+        if st1.st_size != st2.st_size:
+            diff = Diff(f1, f2, None, None)
+        else:
+            diff = Diff(
+                f1,
+                f2,
+                digest_file(f1, st1, algorithm, cache1),
+                digest_file(f2, st2, algorithm, cache2),
+            )
+        if diff.diff_type == DiffType.SOMETHING_ELSE_DIFFERS and normalizers is not None:
+            diff_type = compare_normalized(f1, f2, *normalizers)
+            if diff_type != DiffType.SOMETHING_ELSE_DIFFERS:
+                return Diff(f1, f2, diff.d1, diff.d2, diff_type)
+        return diff
+
+
+def get_diffs(
+    pairs: Iterable[Tuple[Path, Path]],
+    algorithm: str = "md5",
+    jobs: Optional[int] = None,
+    cache1: Optional[DigestCache] = None,
+    cache2: Optional[DigestCache] = None,
+    normalizers: Optional[Tuple[Normalizer, Normalizer]] = None,
+) -> Iterator[Diff]:
+    """Compare each pair of files on a thread pool, yielding the results in
+    order as soon as they're available.
+    """
+    window = 4 * (jobs or os.cpu_count() or 1)
+    # hashlib releases the GIL while hashing, so threads are enough to
+    # keep both the disk and multiple cores busy.
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        yield from bounded_map(
+            executor,
+            lambda pair: Diff.from_files(*pair, algorithm, cache1, cache2, normalizers),
+            pairs,
+            window,
+        )
+
+
+def sorted_scandir(top: Path) -> List[os.DirEntry]:
+    with os.scandir(top) as it:
+        return sorted(it, key=lambda entry: entry.name)
+
+
+def walk_files(top: Path) -> Iterator[os.DirEntry]:
+    """Yield every file under top, in sorted order."""
+    for entry in sorted_scandir(top):
+        if entry.is_file():
+            yield entry
+        elif entry.is_dir():
+            yield from walk_files(Path(entry.path))
+
+
+def merge_walk(
+    dir1: Path, dir2: Path, recursive: bool = True
+) -> Iterator[Tuple[Optional[os.DirEntry], Optional[os.DirEntry]]]:
+    """Walk both trees in lockstep, yielding (entry1, entry2) for files in
+    common, (entry1, None) for files only under dir1, and (None, entry2)
+    for files only under dir2, as soon as each is known.
+
+    Only one directory listing per tree per level of depth is held at a
+    time.
+    """
+    entries1, entries2 = sorted_scandir(dir1), sorted_scandir(dir2)
+    i1, i2 = 0, 0
+    while i1 < len(entries1) or i2 < len(entries2):
+        e1 = entries1[i1] if i1 < len(entries1) else None
+        e2 = entries2[i2] if i2 < len(entries2) else None
+        if e2 is None or (e1 is not None and e1.name < e2.name):
+            i1 += 1
+            e2 = None
+        elif e1 is None or e2.name < e1.name:
+            i2 += 1
+            e1 = None
+        else:
+            i1 += 1
+            i2 += 1
+        if e1 is not None and e2 is not None:
+            if e1.is_file() and e2.is_file():
+                yield e1, e2
+                continue
+            if e1.is_dir() and e2.is_dir():
+                if recursive:
+                    yield from merge_walk(Path(e1.path), Path(e2.path))
+                continue
+        # A file or directory with no counterpart (or with a counterpart
+        # of the other kind) has all its files reported as unique.
+        if e1 is not None:
+            if e1.is_file():
+                yield e1, None
+            elif e1.is_dir() and recursive:
+                yield from ((e, None) for e in walk_files(Path(e1.path)))
+        if e2 is not None:
+            if e2.is_file():
+                yield None, e2
+            elif e2.is_dir() and recursive:
+                yield from ((None, e) for e in walk_files(Path(e2.path)))
+
+
+def open_caches(
+    dir1: Path, dir2: Path, cache_dir: Optional[Path], rebuild: bool
+) -> Tuple[Optional[DigestCache], Optional[DigestCache]]:
+    if cache_dir is None:
+        return None, None
+    return DigestCache(dir1, cache_dir, rebuild), DigestCache(dir2, cache_dir, rebuild)
+
+
+def main(
+    dir1: Path,
+    dir2: Path,
+    recursive: bool,
+    algorithm: str,
+    jobs: Optional[int],
+    cache_dir: Optional[Path],
+    rebuild_cache: bool,
+    normalizers: Optional[Tuple[Normalizer, Normalizer]],
+) -> None:
     # For now, only take the common files.
     if recursive:
         files1, files2, dir1_only, dir2_only = get_common_files_recursive(dir1, dir2)
@@ -156,20 +549,33 @@ def main(dir1: Path, dir2: Path, recursive: bool) -> None:
         DiffType.SAME: t.green,
         DiffType.INNER_PATHS_DIFFER: t.cyan,
         DiffType.SOMETHING_ELSE_DIFFERS: t.red,
+        DiffType.VOLATILE_DIFFERS: t.magenta,
     }
 
+    # Digests that were skipped because the file sizes differ are shown as
+    # dashes.
+    dwidth = digest_width(algorithm)
+    no_digest = "-" * dwidth
+
     diffs = []
-    for f1, f2 in zip(files1, files2):
-        diff = Diff.from_files(f1, f2)
-        diffs.append(diff)
-        line = f"{diff.d1} {diff.d2} {str(f1):{width1}s} {str(f2):{width2}s}"
-        print(map_diff_to_color[diff.diff_type](line))
-    # Print the unique files separately. FIXME scope hack using the last diff
+    cache1, cache2 = open_caches(dir1, dir2, cache_dir, rebuild_cache)
+    try:
+        for diff in get_diffs(zip(files1, files2), algorithm, jobs, cache1, cache2, normalizers):
+            diffs.append(diff)
+            d1 = diff.d1 if diff.d1 is not None else no_digest
+            d2 = diff.d2 if diff.d2 is not None else no_digest
+            line = f"{d1} {d2} {str(diff.f1):{width1}s} {str(diff.f2):{width2}s}"
+            print(map_diff_to_color[diff.diff_type](line))
+    finally:
+        for cache in (cache1, cache2):
+            if cache is not None:
+                cache.close()
+    # Print the unique files separately.
     for f1 in dir1_only:
-        line = f"{' ' * len(str(diff.d1))} {' ' * len(str(diff.d2))} {str(f1):{width1}s} {' ' * width2}"
+        line = f"{' ' * dwidth} {' ' * dwidth} {str(f1):{width1}s} {' ' * width2}"
         print(t.yellow(line))
     for f2 in dir2_only:
-        line = f"{' ' * len(str(diff.d1))} {' ' * len(str(diff.d2))} {' ' * width1} {str(f2):{width2}s}"
+        line = f"{' ' * dwidth} {' ' * dwidth} {' ' * width1} {str(f2):{width2}s}"
         print(t.yellow(line))
 
     if args.write_files:
@@ -190,13 +596,114 @@ def main(dir1: Path, dir2: Path, recursive: bool) -> None:
     return
 
 
-def main_interleaved(dir1: Path, dir2: Path) -> None:
+def main_interleaved(
+    dir1: Path,
+    dir2: Path,
+    recursive: bool,
+    algorithm: str,
+    jobs: Optional[int],
+    cache_dir: Optional[Path],
+    rebuild_cache: bool,
+    normalizers: Optional[Tuple[Normalizer, Normalizer]],
+) -> None:
+    dir1, dir2 = dir1.resolve(strict=True), dir2.resolve(strict=True)
+
+    t = Terminal()
+
+    map_diff_to_color = {
+        DiffType.SAME: t.green,
+        DiffType.INNER_PATHS_DIFFER: t.cyan,
+        DiffType.SOMETHING_ELSE_DIFFERS: t.red,
+        DiffType.VOLATILE_DIFFERS: t.magenta,
+    }
+
+    # Column widths can't be known without walking everything first, so
+    # only the digests line up.
+    dwidth = digest_width(algorithm)
+    no_digest = "-" * dwidth
+    blank = " " * dwidth
+
+    cache1, cache2 = open_caches(dir1, dir2, cache_dir, rebuild_cache)
+
+    def compare_entries(
+        pair: Tuple[Optional[os.DirEntry], Optional[os.DirEntry]]
+    ) -> Union[Diff, Tuple[Optional[os.DirEntry], Optional[os.DirEntry]]]:
+        e1, e2 = pair
+        if e1 is None or e2 is None:
+            return pair
+        return Diff.from_stats(
+            Path(e1.path),
+            e1.stat(),
+            Path(e2.path),
+            e2.stat(),
+            algorithm,
+            cache1,
+            cache2,
+            normalizers,
+        )
+
+    handles = []
+    if args.write_files:
+        handles = [
+            open(filename, "w")
+            for filename in ("compare_diff.txt", "compare_dir1_only.txt", "compare_dir2_only.txt")
+        ]
+    window = 4 * (jobs or os.cpu_count() or 1)
+    try:
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            for result in bounded_map(
+                executor, compare_entries, merge_walk(dir1, dir2, recursive), window
+            ):
+                if isinstance(result, Diff):
+                    d1 = result.d1 if result.d1 is not None else no_digest
+                    d2 = result.d2 if result.d2 is not None else no_digest
+                    line = f"{d1} {d2} {str(result.f1)} {str(result.f2)}"
+                    print(map_diff_to_color[result.diff_type](line))
+                    if handles and result.diff_type == DiffType.SOMETHING_ELSE_DIFFERS:
+                        handles[0].write(f"{str(result.f1)} {str(result.f2)}\n")
+                else:
+                    e1, e2 = result
+                    path = e1.path if e1 is not None else e2.path
+                    print(t.yellow(f"{blank} {blank} {path}"))
+                    if handles:
+                        handles[1 if e1 is not None else 2].write(f"{path}\n")
+    finally:
+        for handle in handles:
+            handle.close()
+        for cache in (cache1, cache2):
+            if cache is not None:
+                cache.close()
+
     return
 
 
 if __name__ == "__main__":
     args = getargs()
+    normalizers = None
+    if args.normalize:
+        normalizers = (
+            Normalizer.for_tree(args.dir1, args.volatile),
+            Normalizer.for_tree(args.dir2, args.volatile),
+        )
     if args.interleaved:
-        main_interleaved(args.dir1, args.dir2)
+        main_interleaved(
+            args.dir1,
+            args.dir2,
+            not args.nonrecursive,
+            args.algorithm,
+            args.jobs,
+            None if args.no_cache else args.cache_dir,
+            args.rebuild_cache,
+            normalizers,
+        )
     else:
-        main(args.dir1, args.dir2, not args.nonrecursive)
+        main(
+            args.dir1,
+            args.dir2,
+            not args.nonrecursive,
+            args.algorithm,
+            args.jobs,
+            None if args.no_cache else args.cache_dir,
+            args.rebuild_cache,
+            normalizers,
+        )
@@ -0,0 +1,206 @@
+#!/usr/bin/env python
+
+"""compress.py: Compress a directory or file to `.tar.gz` in a single
+pass, without an intermediate `.tar` on disk.
+
+The tar stream is cut into blocks that are compressed independently on a
+thread pool (zlib releases the GIL) and written out in order as the
+members of a multi-member gzip file, which gunzip, tar, and Python's gzip
+module all read as a single stream.
+"""
+
+import os
+import sys
+import tarfile
+import time
+import zlib
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import BinaryIO, Deque, Dict, Optional, Tuple
+
+BLOCK_SIZE = 1 << 20
+
+
+def getargs():
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    arg = parser.add_argument
+    arg("filename", type=Path, help="the directory or file to compress")
+    arg("-o", "--output", type=Path, help="the archive to write (default: FILENAME.tar.gz)")
+    arg("-j", "--jobs", type=int, help="number of blocks to compress at once")
+    arg("--level", type=int, choices=range(1, 10), default=9, help="gzip compression level")
+    arg(
+        "--block-size",
+        type=int,
+        default=BLOCK_SIZE,
+        help="number of uncompressed bytes in each gzip member",
+    )
+    arg(
+        "--verify",
+        action="store_true",
+        help="read the archive back, checking the gzip CRCs and the tar listing",
+    )
+    args = parser.parse_args()
+    if args.output is None:
+        args.output = Path(f"{os.path.normpath(args.filename)}.tar.gz")
+    return args
+
+
+def compress_block(data: bytes, level: int) -> bytes:
+    """Compress the data as one complete gzip member."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
+class ParallelGzipWriter:
+    """A write-only file object that gzips everything written to it, one
+    block at a time on a thread pool, into the given binary handle.
+
+    At most a few blocks per worker are held in memory at once.
+    """
+
+    def __init__(
+        self,
+        handle: BinaryIO,
+        level: int = 9,
+        block_size: int = BLOCK_SIZE,
+        jobs: Optional[int] = None,
+    ) -> None:
+        self.handle = handle
+        self.level = level
+        self.block_size = block_size
+        self.window = 2 * (jobs or os.cpu_count() or 1)
+        self.executor = ThreadPoolExecutor(max_workers=jobs)
+        self.pending: Deque[Future] = deque()
+        self.buffer = bytearray()
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def write(self, data: bytes) -> int:
+        self.buffer += data
+        self.bytes_in += len(data)
+        while len(self.buffer) >= self.block_size:
+            self._submit(bytes(self.buffer[: self.block_size]))
+            del self.buffer[: self.block_size]
+        return len(data)
+
+    def _submit(self, block: bytes) -> None:
+        self.pending.append(self.executor.submit(compress_block, block, self.level))
+        # Write out whatever is finished, and wait on the oldest block when
+        # too many are in flight.
+        while self.pending and (self.pending[0].done() or len(self.pending) > self.window):
+            self._write_member(self.pending.popleft().result())
+
+    def _write_member(self, member: bytes) -> None:
+        self.handle.write(member)
+        self.bytes_out += len(member)
+
+    def close(self) -> None:
+        if self.buffer or not self.bytes_in:
+            # An empty input still needs one (empty) member to be valid.
+            self._submit(bytes(self.buffer))
+            self.buffer = bytearray()
+        while self.pending:
+            self._write_member(self.pending.popleft().result())
+        self.executor.shutdown()
+
+    def __enter__(self) -> "ParallelGzipWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            for future in self.pending:
+                future.cancel()
+            self.executor.shutdown()
+
+
+def create_archive(
+    filename: Path,
+    output: Path,
+    level: int = 9,
+    block_size: int = BLOCK_SIZE,
+    jobs: Optional[int] = None,
+) -> Tuple[Dict[str, int], Dict[str, int]]:
+    """Write filename (recursively, for a directory) to the output as a
+    gzipped tarball. Return the size of each regular file stored, by its
+    name in the archive, and the number of bytes before and after
+    compression.
+    """
+    sizes = dict()
+
+    def record(tarinfo: tarfile.TarInfo) -> tarfile.TarInfo:
+        if tarinfo.isfile():
+            sizes[tarinfo.name] = tarinfo.size
+        return tarinfo
+
+    with open(output, "wb") as handle:
+        with ParallelGzipWriter(handle, level, block_size, jobs) as writer:
+            with tarfile.open(fileobj=writer, mode="w|") as tar:
+                tar.add(
+                    filename, arcname=os.path.basename(os.path.normpath(filename)), filter=record
+                )
+    return sizes, {"bytes_in": writer.bytes_in, "bytes_out": writer.bytes_out}
+
+
+def verify_archive(output: Path, sizes: Dict[str, int]) -> bool:
+    """Read the archive back in one streaming pass, which checks the CRC of
+    every gzip member, and compare the files in it against those written.
+    Report any problems on stderr, and return whether there were none.
+    """
+    import gzip
+
+    found = dict()
+    ok = True
+    try:
+        with gzip.open(output, "rb") as gz, tarfile.open(fileobj=gz, mode="r|") as tar:
+            for tarinfo in tar:
+                if tarinfo.isfile():
+                    member = tar.extractfile(tarinfo)
+                    nbytes = 0
+                    while True:
+                        chunk = member.read(BLOCK_SIZE)
+                        if not chunk:
+                            break
+                        nbytes += len(chunk)
+                    found[tarinfo.name] = nbytes
+    except (OSError, EOFError, zlib.error, tarfile.TarError) as e:
+        print(f"{output}: {e}", file=sys.stderr)
+        ok = False
+    for name in sorted(sizes.keys() | found.keys()):
+        if name not in found:
+            print(f"{output}: missing {name}", file=sys.stderr)
+            ok = False
+        elif name not in sizes:
+            print(f"{output}: unexpected {name}", file=sys.stderr)
+            ok = False
+        elif found[name] != sizes.get(name):
+            print(f"{output}: {name} has {found[name]} bytes, not {sizes[name]}", file=sys.stderr)
+            ok = False
+    return ok
+
+
+def main(args) -> int:
+    start = time.perf_counter()
+    sizes, stats = create_archive(
+        args.filename, args.output, args.level, args.block_size, args.jobs
+    )
+    elapsed = time.perf_counter() - start
+    print(
+        f"{args.output}: {len(sizes)} files, {stats['bytes_in']} -> {stats['bytes_out']} bytes"
+        f" in {elapsed:.1f} s ({stats['bytes_in'] / max(elapsed, 1e-9) / 1e6:.1f} MB/s)",
+        file=sys.stderr,
+    )
+    if args.verify:
+        if not verify_archive(args.output, sizes):
+            return 1
+        print(f"{args.output}: verified", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    args = getargs()
+    sys.exit(main(args))
@@ -1,5 +1,20 @@
 #!/usr/bin/env python
 
+"""dump_bytes.py: Look at a window of a (possibly huge) binary file,
+either as a hexdump or as a typed NumPy array, without reading the rest
+of the file.
+"""
+
+import mmap
+import os
+import traceback
+from contextlib import contextmanager
+
+# How much of the file to show when no length is given.
+DEFAULT_DISPLAY_LENGTH = 256
+# How much of the window to look at at once when computing statistics.
+STATS_CHUNK_SIZE = 1 << 24
+
 
 def read_binary(binaryfilename):
     """Return the bytes present in the given binary file name."""
@@ -10,6 +25,141 @@ def read_binary(binaryfilename):
     return readbytes
 
 
+@contextmanager
+def mapped_window(binaryfilename, offset=0, length=None, exact=False):
+    """Memory-map only the bytes [offset, offset + length) of the given
+    file, and provide them as a memoryview. A length of None means up to the
+    end of the file. If the file ends sooner, the window is shortened, or
+    with exact, a ValueError is raised.
+
+    Anything created from the view (such as NumPy arrays) must be gone
+    before the context exits. If it exits with an exception, the locals of
+    the functions the exception passed through are cleared first.
+    """
+
+    with open(binaryfilename, "rb") as binaryfile:
+        size = os.fstat(binaryfile.fileno()).st_size
+        if not 0 <= offset <= size:
+            raise ValueError("offset {} is outside of the file (size {})".format(offset, size))
+        if length is not None and offset + length > size:
+            if exact:
+                raise ValueError(
+                    "{} bytes are needed from offset {}, but the file is only {} bytes".format(
+                        length, offset, size
+                    )
+                )
+            length = None
+        if length is None:
+            length = size - offset
+        if length == 0:
+            yield memoryview(b"")
+            return
+        # The mapping itself has to start on an allocation boundary.
+        start = offset - offset % mmap.ALLOCATIONGRANULARITY
+        with mmap.mmap(
+            binaryfile.fileno(), offset - start + length, access=mmap.ACCESS_READ, offset=start
+        ) as mapped:
+            view = memoryview(mapped)[offset - start :]
+            try:
+                yield view
+            except BaseException as e:
+                # Otherwise arrays still referenced from the traceback keep
+                # the view exported, and closing the map raises BufferError
+                # in place of the exception.
+                traceback.clear_frames(e.__traceback__)
+                raise
+            finally:
+                view.release()
+
+
+def hexdump(data, base_offset=0, width=16):
+    """Generate lines in the style of `hexdump -C` for the given bytes, with
+    offsets counted from base_offset.
+    """
+
+    for i in range(0, len(data), width):
+        row = bytes(data[i : i + width])
+        hexes = " ".join("{:02x}".format(b) for b in row)
+        if len(row) > width // 2:
+            # Split the bytes into two groups, like hexdump does.
+            split = 3 * (width // 2)
+            hexes = hexes[:split] + " " + hexes[split:]
+        text = "".join(chr(b) if 0x20 <= b < 0x7F else "." for b in row)
+        yield "{:08x}  {:{}s}  |{}|".format(base_offset + i, hexes, 3 * width, text)
+
+
+def typed_view(data, dtype, shape=None):
+    """Interpret the bytes as a NumPy array of the given dtype (and shape),
+    without copying them.
+    """
+
+    import numpy as np
+
+    dtype = np.dtype(dtype)
+    count = len(data) // dtype.itemsize
+    if shape is not None and -1 not in shape and int(np.prod(shape)) > count:
+        raise ValueError(
+            "shape {} needs {} bytes of {}, but there are only {}".format(
+                shape, int(np.prod(shape)) * dtype.itemsize, dtype, len(data)
+            )
+        )
+    arr = np.frombuffer(data, dtype=dtype, count=count)
+    if shape is not None:
+        arr = arr.reshape(shape)
+    return arr
+
+
+def window_stats(data, dtype, chunk_size=STATS_CHUNK_SIZE):
+    """Return the min, max, mean, and number of NaNs of the bytes
+    interpreted as the given dtype, looking at chunk_size bytes at a time.
+    NaNs are left out of the min, max, and mean.
+    """
+
+    import numpy as np
+
+    dtype = np.dtype(dtype)
+    chunk_size -= chunk_size % dtype.itemsize
+    nitems = len(data) // dtype.itemsize
+    vmin, vmax, total, nvalues, nnan = None, None, 0.0, 0, 0
+    for start in range(0, nitems * dtype.itemsize, chunk_size):
+        chunk = typed_view(data[start : start + chunk_size], dtype)
+        if dtype.kind in "fc":
+            isnan = np.isnan(chunk)
+            chunk_nnan = int(np.count_nonzero(isnan))
+            if chunk_nnan:
+                chunk = chunk[~isnan]
+            nnan += chunk_nnan
+        if chunk.size:
+            cmin, cmax = chunk.min(), chunk.max()
+            vmin = cmin if vmin is None else min(vmin, cmin)
+            vmax = cmax if vmax is None else max(vmax, cmax)
+            total += chunk.sum(dtype=np.complex128 if dtype.kind == "c" else np.float64)
+            nvalues += chunk.size
+        del chunk
+    mean = total / nvalues if nvalues else None
+    return {"count": nitems, "min": vmin, "max": vmax, "mean": mean, "nan": nnan}
+
+
+def parse_shape(shape):
+    return tuple(int(x) for x in shape.replace("x", ",").split(","))
+
+
+def dump(window, offset=0, dtype=None, shape=None, stats=False):
+    """Print the window as statistics, an array, or a hexdump. Arrays made
+    from the window are local here, so they're gone once this returns.
+    """
+
+    if stats:
+        summary = window_stats(window, dtype or "float64")
+        for key in ("count", "min", "max", "mean", "nan"):
+            print("{:5s} {}".format(key, summary[key]))
+    elif dtype or shape:
+        print(typed_view(window, dtype or "float64", shape))
+    else:
+        for line in hexdump(window, offset):
+            print(line)
+
+
 if __name__ == "__main__":
 
     import argparse
@@ -17,8 +167,53 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser()
 
     parser.add_argument("binaryfilename")
+    parser.add_argument(
+        "--offset",
+        type=lambda x: int(x, 0),
+        default=0,
+        help="""Byte offset to start at (decimal or 0x-prefixed hex).""",
+    )
+    parser.add_argument(
+        "--length",
+        type=lambda x: int(x, 0),
+        help="""Number of bytes to look at. Defaults to the size of --shape, to the
+        end of the file for --stats, and otherwise to {} bytes.""".format(
+            DEFAULT_DISPLAY_LENGTH
+        ),
+    )
+    parser.add_argument(
+        "--dtype",
+        help="""Show the bytes as an array of this NumPy dtype (such as float64,
+        int32, or >f8) rather than as a hexdump.""",
+    )
+    parser.add_argument(
+        "--shape",
+        type=parse_shape,
+        help="""Shape of the array for --dtype, such as 10,20 (or 10x20).""",
+    )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="""Print the min, max, mean, and number of NaNs for --dtype (default
+        float64) instead of the values.""",
+    )
 
     args = parser.parse_args()
 
-    binaryfile = read_binary(args.binaryfilename)
-    print(binaryfile)
+    length = args.length
+    exact = False
+    if length is None:
+        if args.shape is not None and -1 not in args.shape:
+            import numpy as np
+
+            length = int(np.prod(args.shape)) * np.dtype(args.dtype or "float64").itemsize
+            # Don't map a short window only to fail on reshaping it.
+            exact = True
+        elif not args.stats:
+            length = DEFAULT_DISPLAY_LENGTH
+
+    try:
+        with mapped_window(args.binaryfilename, args.offset, length, exact) as window:
+            dump(window, args.offset, args.dtype, args.shape, args.stats)
+    except ValueError as e:
+        parser.error(e)
@@ -1,6 +1,9 @@
 #!/usr/bin/env python
 
 
+import heapq
+import os
+import shutil
 from itertools import zip_longest
 
 
@@ -14,6 +17,19 @@ def getargs():
     parser.add_argument("file", nargs="+", help="""""")
     parser.add_argument("--num-per-group", type=int, default=0, help="""""")
     parser.add_argument("--action", choices=("copy", "move"), help="""""")
+    parser.add_argument(
+        "--balance-by",
+        choices=("count", "size"),
+        default="count",
+        help="""Either put --num-per-group files in each group, or split the
+        files into --num-groups groups of roughly equal total size.""",
+    )
+    parser.add_argument(
+        "--num-groups", type=int, default=1, help="""Number of groups for --balance-by size."""
+    )
+    parser.add_argument(
+        "-j", "--jobs", type=int, help="""Number of files to copy or move at once."""
+    )
 
     args = parser.parse_args()
 
@@ -26,26 +42,125 @@ def grouper(n, iterable, fillvalue=None):
     return zip_longest(fillvalue=fillvalue, *args)
 
 
+def balance_by_size(filenames, num_groups):
+    """Split the files into num_groups groups of roughly equal total size,
+    using the longest-processing-time-first heuristic: each file, largest
+    first, goes into the group that is currently the smallest.
+
+    Return a list of (total size, filenames) for each group.
+    """
+    sizes = sorted(((os.path.getsize(f), f) for f in filenames), reverse=True)
+    groups = [[] for _ in range(num_groups)]
+    # (total size, group index), so that ties go to the earliest group.
+    heap = [(0, i) for i in range(num_groups)]
+    for size, filename in sizes:
+        total, i = heapq.heappop(heap)
+        groups[i].append(filename)
+        heapq.heappush(heap, (total + size, i))
+    totals = dict((i, total) for total, i in heap)
+    return [(totals[i], group) for i, group in enumerate(groups)]
+
+
+def _kernel_copy(infd, outfd, size):
+    """Copy up to size bytes between the file descriptors with
+    copy_file_range or sendfile, so the data never passes through user
+    space. Return how many bytes were copied: less than size (possibly 0)
+    if neither works between these files or the kernel stopped early.
+    """
+    for name in ("copy_file_range", "sendfile"):
+        if not hasattr(os, name):
+            continue
+        offset = 0
+        try:
+            while offset < size:
+                count = min(size - offset, 1 << 30)
+                if name == "copy_file_range":
+                    nbytes = os.copy_file_range(infd, outfd, count, offset, offset)
+                else:
+                    nbytes = os.sendfile(outfd, infd, offset, count)
+                if nbytes == 0:
+                    # Like shutil, take a 0 at the start to mean this file
+                    # system doesn't support it; anywhere else the rest is
+                    # left to the caller.
+                    break
+                offset += nbytes
+        except OSError:
+            # Unsupported for this pair of file systems; that's only known
+            # from the first call, so anything later is a real error.
+            if offset > 0:
+                raise
+            continue
+        if offset > 0:
+            return offset
+    return 0
+
+
+def fast_copy(src, dest):
+    """Like shutil.copy2, but use the kernel to copy the data where
+    possible.
+    """
+    if os.path.isdir(dest):
+        dest = os.path.join(dest, os.path.basename(src))
+    with open(src, "rb") as fsrc, open(dest, "wb") as fdest:
+        size = os.fstat(fsrc.fileno()).st_size
+        copied = _kernel_copy(fsrc.fileno(), fdest.fileno(), size)
+        if copied < size:
+            # Copy whatever the kernel didn't in user space. sendfile
+            # moves the output file's position, so set both explicitly.
+            fsrc.seek(copied)
+            fdest.seek(copied)
+            shutil.copyfileobj(fsrc, fdest)
+    shutil.copystat(src, dest)
+    return dest
+
+
 def main(args):
 
-    import os
-    import shutil
+    import time
+    from concurrent.futures import ThreadPoolExecutor
 
     if args.action == "copy":
-        action = shutil.copy2
+        action = fast_copy
     elif args.action == "move":
         action = shutil.move
     else:
         action = print
 
-    for groupnum, group in enumerate(grouper(args.num_per_group, args.file), start=1):
-        try:
-            dest = os.path.join(os.getcwd(), "group_{}".format(groupnum))
-            os.mkdir(dest, mode=0o755)
-        except:
-            pass
-        for f in (i for i in group if i):
-            action(f, dest)
+    if args.balance_by == "size":
+        groups = [group for _, group in balance_by_size(args.file, args.num_groups)]
+    else:
+        groups = grouper(args.num_per_group, args.file)
+
+    start = time.perf_counter()
+    total_bytes = 0
+    futures = []
+    with ThreadPoolExecutor(max_workers=args.jobs) as executor:
+        for groupnum, group in enumerate(groups, start=1):
+            try:
+                dest = os.path.join(os.getcwd(), "group_{}".format(groupnum))
+                os.mkdir(dest, mode=0o755)
+            except:
+                pass
+            for f in (i for i in group if i):
+                if action is print:
+                    action(f, dest)
+                else:
+                    total_bytes += os.path.getsize(f)
+                    futures.append(executor.submit(action, f, dest))
+        for future in futures:
+            future.result()
+    elapsed = time.perf_counter() - start
+
+    if futures:
+        print(
+            "{} {} files, {:.1f} MiB in {:.2f} s ({:.1f} MiB/s)".format(
+                "copied" if args.action == "copy" else "moved",
+                len(futures),
+                total_bytes / 2**20,
+                elapsed,
+                total_bytes / 2**20 / elapsed if elapsed > 0 else float("inf"),
+            )
+        )
 
     return locals()
 
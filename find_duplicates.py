@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+
+"""find_duplicates.py: Find groups of files with identical contents.
+
+Files are narrowed down in stages, so that most of them are never read:
+
+1. Files are bucketed by size; a file with a unique size can't have a
+   duplicate.
+2. Files that share a size are hashed over only their first and last
+   PARTIAL_SIZE bytes.
+3. Only files whose partial hashes also collide are hashed in full.
+"""
+
+import fnmatch
+import json
+import os
+import sys
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from compare import HASH_ALGORITHMS, hash_file
+
+PARTIAL_SIZE = 64 * 1024
+
+
+def getargs():
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    arg = parser.add_argument
+    arg("directory", nargs="+", type=Path)
+    arg(
+        "--include",
+        action="append",
+        default=[],
+        metavar="GLOB",
+        help="only consider files whose names match (can be repeated)",
+    )
+    arg(
+        "--exclude",
+        action="append",
+        default=[],
+        metavar="GLOB",
+        help="skip files and directories whose names match (can be repeated)",
+    )
+    arg("--min-size", type=int, default=1, help="ignore files smaller than this many bytes")
+    arg("--json", action="store_true", help="print the duplicate groups as JSON")
+    arg("--algorithm", choices=sorted(HASH_ALGORITHMS), default="md5")
+    arg("-j", "--jobs", type=int, help="number of files to hash at once")
+    return parser.parse_args()
+
+
+def matches(name: str, patterns: Sequence[str]) -> bool:
+    return any(fnmatch.fnmatch(name, pattern) for pattern in patterns)
+
+
+def walk_sizes(
+    top: Path, include: Sequence[str], exclude: Sequence[str]
+) -> Iterator[Tuple[str, int]]:
+    """Yield (path, size) for every file under top that passes the
+    filters.
+    """
+    with os.scandir(top) as it:
+        entries = sorted(it, key=lambda entry: entry.name)
+    for entry in entries:
+        if matches(entry.name, exclude):
+            continue
+        if entry.is_file():
+            if not include or matches(entry.name, include):
+                yield entry.path, entry.stat().st_size
+        elif entry.is_dir():
+            yield from walk_sizes(Path(entry.path), include, exclude)
+
+
+def hash_ends(filename: str, size: int, algorithm: str) -> str:
+    """Hash the first and last PARTIAL_SIZE bytes of the file, which is all
+    of it for small files.
+    """
+    m = HASH_ALGORITHMS[algorithm]()
+    with open(filename, "rb") as handle:
+        m.update(handle.read(PARTIAL_SIZE))
+        if size > PARTIAL_SIZE:
+            handle.seek(max(PARTIAL_SIZE, size - PARTIAL_SIZE))
+            m.update(handle.read(PARTIAL_SIZE))
+    return m.hexdigest()
+
+
+def regroup(
+    executor: ThreadPoolExecutor,
+    groups: Sequence[Tuple[int, List[str]]],
+    fn,
+) -> List[Tuple[int, str, List[str]]]:
+    """Split each group of same-size files by the key fn(path, size),
+    keeping only the subgroups with more than one member.
+    """
+    futures = [
+        (size, path, executor.submit(fn, path, size)) for size, paths in groups for path in paths
+    ]
+    subgroups: Dict[Tuple[int, str], List[str]] = defaultdict(list)
+    for size, path, future in futures:
+        subgroups[(size, future.result())].append(path)
+    return [(size, key, paths) for (size, key), paths in subgroups.items() if len(paths) > 1]
+
+
+def find_duplicates(
+    directories: Sequence[Path],
+    include: Sequence[str] = (),
+    exclude: Sequence[str] = (),
+    min_size: int = 1,
+    algorithm: str = "md5",
+    jobs: Optional[int] = None,
+    stats: Optional[Dict[str, int]] = None,
+) -> List[Tuple[int, str, List[str]]]:
+    """Return a list of (size, digest, paths) for each group of identical
+    files, largest files first.
+
+    If a dict is given for stats, it's filled in with the number of files
+    and bytes seen and the number of bytes that had to be read.
+    """
+    by_size: Dict[int, List[str]] = defaultdict(list)
+    total_bytes = 0
+    for directory in directories:
+        for path, size in walk_sizes(directory, include, exclude):
+            if size >= min_size:
+                by_size[size].append(path)
+                total_bytes += size
+    candidates = [(size, paths) for size, paths in by_size.items() if len(paths) > 1]
+    bytes_read = sum(min(size, 2 * PARTIAL_SIZE) * len(paths) for size, paths in candidates)
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        partial_groups = regroup(
+            executor, candidates, lambda path, size: hash_ends(path, size, algorithm)
+        )
+        # For small files the partial hash already covered everything.
+        duplicates = [group for group in partial_groups if group[0] <= 2 * PARTIAL_SIZE]
+        large = [(size, paths) for size, _, paths in partial_groups if size > 2 * PARTIAL_SIZE]
+        bytes_read += sum(size * len(paths) for size, paths in large)
+        duplicates.extend(regroup(executor, large, lambda path, size: hash_file(path, algorithm)))
+
+    if stats is not None:
+        stats["files"] = sum(len(paths) for paths in by_size.values())
+        stats["bytes"] = total_bytes
+        stats["bytes_read"] = bytes_read
+    return sorted(duplicates, key=lambda group: (-group[0], group[2]))
+
+
+def main(args) -> None:
+    stats = dict()
+    duplicates = find_duplicates(
+        args.directory,
+        args.include,
+        args.exclude,
+        args.min_size,
+        args.algorithm,
+        args.jobs,
+        stats,
+    )
+    if args.json:
+        groups = [
+            {"size": size, "digest": digest, "paths": paths} for size, digest, paths in duplicates
+        ]
+        json.dump(groups, sys.stdout, indent=2)
+        print()
+    else:
+        for size, digest, paths in duplicates:
+            print(f"{digest} {size}")
+            for path in paths:
+                print(f"  {path}")
+    print(
+        f"{len(duplicates)} duplicate groups among {stats['files']} files;"
+        f" read {stats['bytes_read']} of {stats['bytes']} bytes",
+        file=sys.stderr,
+    )
+    return
+
+
+if __name__ == "__main__":
+    args = getargs()
+    main(args)
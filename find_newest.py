@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+
+"""find_newest.py: List the most recently modified files in a directory
+tree, newest first.
+
+Only the newest k files are kept while walking the tree, and each file is
+stat'ed once, through os.scandir.
+
+No summary is kept between runs to skip unchanged directories: writing
+to an existing file doesn't change its directory's mtime, so the only way
+to be sure no file has become newer is to stat every one again.
+"""
+
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, List, Sequence, Tuple
+
+from utils import largest
+
+
+def getargs():
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    arg = parser.add_argument
+    arg("directory", nargs="?", type=Path, default=Path("."))
+    arg("-n", "--number", type=int, default=20, help="how many files to list")
+    arg(
+        "--exclude",
+        action="append",
+        default=[],
+        metavar="NAME",
+        help="skip files and directories with this name (can be repeated)",
+    )
+    return parser.parse_args()
+
+
+def scan_directory(
+    dirpath: str, k: int, exclude: Sequence[str]
+) -> Tuple[List[Tuple[int, str]], List[str]]:
+    """Return the k newest files directly in the directory, as (mtime_ns,
+    name), and the names of its subdirectories.
+    """
+    files = []
+    subdirs = []
+    try:
+        with os.scandir(dirpath) as it:
+            for entry in it:
+                if entry.name in exclude:
+                    continue
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.name)
+                    elif entry.is_file():
+                        files.append((entry.stat().st_mtime_ns, entry.name))
+                except OSError:
+                    # Vanished or unreadable since it was listed.
+                    continue
+    except OSError as e:
+        print(e, file=sys.stderr)
+    return largest(files, k), sorted(subdirs)
+
+
+def iter_candidates(top: Path, k: int, exclude: Sequence[str] = ()) -> Iterator[Tuple[int, str]]:
+    """Yield (mtime_ns, path) for the k newest files in each directory under
+    top, which includes the k newest files overall.
+    """
+    stack = [str(top)]
+    while stack:
+        dirpath = stack.pop()
+        files, subdirs = scan_directory(dirpath, k, exclude)
+        for mtime_ns, name in files:
+            yield mtime_ns, os.path.join(dirpath, name)
+        stack.extend(os.path.join(dirpath, name) for name in reversed(subdirs))
+
+
+def find_newest(top: Path, k: int, exclude: Sequence[str] = ()) -> List[Tuple[int, str]]:
+    """Return the k newest files under top as (mtime_ns, path), newest
+    first.
+    """
+    return largest(iter_candidates(top, k, exclude), k)
+
+
+def main(args) -> int:
+    newest = find_newest(args.directory, args.number, args.exclude)
+    for mtime_ns, path in newest:
+        timestamp = datetime.fromtimestamp(mtime_ns / 1e9).astimezone()
+        print(f"{timestamp.isoformat(' ')} {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    args = getargs()
+    sys.exit(main(args))
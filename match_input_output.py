@@ -1,37 +1,129 @@
 #!/usr/bin/env python
 
 """match_input_output.py: Given input and output file extensions, determine
-which ones don't have matching partners (in the current directory),
-and print the result.
+which ones don't have matching partners (in the current directory, or in
+whole directory trees), and print the result.
+
+Any number of input/output extension pairs can be checked at once, such
+as in:out, inp:out, and xyz:out; an output only needs a matching input
+for one of the pairs it's part of. Pairs where the output is older than
+its input are reported as stale.
 """
 
 
 import argparse
-import glob
+import json
 import os
+from collections import defaultdict
+
+
+def getargs():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("ext_inp", nargs="?", help="the extension for input files")
+    parser.add_argument("ext_out", nargs="?", help="the extension for output files")
+    parser.add_argument(
+        "--pair",
+        action="append",
+        default=[],
+        metavar="INP:OUT",
+        help="an input and output extension pair (can be repeated)",
+    )
+    parser.add_argument(
+        "--dir",
+        action="append",
+        dest="dirs",
+        metavar="DIR",
+        help="directory to look in (can be repeated; default: the current directory)",
+    )
+    parser.add_argument(
+        "-r", "--recursive", action="store_true", help="look in all subdirectories too"
+    )
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args()
+    if (args.ext_inp is None) != (args.ext_out is None):
+        parser.error("both an input and an output extension are needed")
+    pairs = [tuple(pair.split(":")) for pair in args.pair]
+    if args.ext_inp is not None:
+        pairs.insert(0, (args.ext_inp, args.ext_out))
+    if not pairs or any(len(pair) != 2 for pair in pairs):
+        parser.error("give extensions as 'ext_inp ext_out' and/or --pair INP:OUT")
+    args.pairs = [tuple(ext.lstrip(".") for ext in pair) for pair in pairs]
+    if args.dirs is None:
+        args.dirs = ["."]
+    return args
+
+
+def index_tree(tops, extensions, recursive=False):
+    """Walk the directories once, and return a mapping of each extension to
+    a mapping of stems (the path without the extension) to (path, mtime).
+    """
+    suffixes = [("." + ext, ext) for ext in set(extensions)]
+    index = {ext: dict() for ext in extensions}
+    stack = list(tops)
+    while stack:
+        top = stack.pop()
+        with os.scandir(top) as it:
+            for entry in it:
+                if entry.is_file():
+                    for suffix, ext in suffixes:
+                        if entry.name.endswith(suffix) and len(entry.name) > len(suffix):
+                            path = os.path.normpath(entry.path)
+                            stem = path[: -len(suffix)]
+                            index[ext][stem] = (path, entry.stat().st_mtime)
+                elif recursive and entry.is_dir():
+                    stack.append(entry.path)
+    return index
+
+
+def match_pairs(index, pairs):
+    """Return the sorted unmatched inputs, unmatched outputs, and stale
+    (input, output) pairs.
+    """
+    inputs_for_output = defaultdict(set)
+    for ext_inp, ext_out in pairs:
+        inputs_for_output[ext_out].add(ext_inp)
+
+    unmatched_inputs = []
+    stale = []
+    for ext_inp, ext_out in pairs:
+        outputs = index[ext_out]
+        for stem, (path, mtime) in index[ext_inp].items():
+            output = outputs.get(stem)
+            if output is None:
+                unmatched_inputs.append(path)
+            elif output[1] < mtime:
+                stale.append((path, output[0]))
+
+    unmatched_outputs = []
+    for ext_out, exts_inp in inputs_for_output.items():
+        for stem, (path, _) in index[ext_out].items():
+            if not any(stem in index[ext_inp] for ext_inp in exts_inp):
+                unmatched_outputs.append(path)
+
+    return sorted(set(unmatched_inputs)), sorted(unmatched_outputs), sorted(stale)
+
+
+def main(args):
+    extensions = [ext for pair in args.pairs for ext in pair]
+    index = index_tree(args.dirs, extensions, args.recursive)
+    unmatched_inputs, unmatched_outputs, stale = match_pairs(index, args.pairs)
+
+    if args.json:
+        results = {
+            "unmatched_inputs": unmatched_inputs,
+            "unmatched_outputs": unmatched_outputs,
+            "stale": stale,
+        }
+        print(json.dumps(results, indent=2))
+    else:
+        for path in unmatched_inputs:
+            print(path)
+        for path in unmatched_outputs:
+            print(path)
+        for inp, out in stale:
+            print("stale: {} {}".format(inp, out))
+
 
-# pylint: disable=C0103
-parser = argparse.ArgumentParser()
-parser.add_argument("ext_inp", help="the extension for input files")
-parser.add_argument("ext_out", help="the extension for output files")
-args = parser.parse_args()
-ext_inp = args.ext_inp
-ext_out = args.ext_out
-
-# Get the results from `ls`:
-directory = os.getcwd()
-inputs = [os.path.basename(f) for f in glob.glob(directory + os.path.sep + "*." + ext_inp)]
-outputs = [os.path.basename(f) for f in glob.glob(directory + os.path.sep + "*." + ext_out)]
-
-# How should we compare the elements in each?
-# Turn everything into stubs (no extensions):
-inputs_stubs = [os.path.splitext(f)[0] for f in inputs]
-outputs_stubs = [os.path.splitext(f)[0] for f in outputs]
-
-# Loop through each list of stubs separately.
-for iidx, istub in enumerate(inputs_stubs):
-    if istub not in outputs_stubs:
-        print(inputs[iidx])
-for oidx, ostub in enumerate(outputs_stubs):
-    if ostub not in inputs_stubs:
-        print(outputs[oidx])
+if __name__ == "__main__":
+    args = getargs()
+    main(args)
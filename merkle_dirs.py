@@ -0,0 +1,204 @@
+#!/usr/bin/env python
+
+"""merkle_dirs.py: Fingerprint directory trees with a Merkle hash.
+
+Each file's digest is its content hash, and each directory's digest is
+the hash of the sorted names, kinds, and digests of its entries, so two
+trees have the same fingerprint exactly when they have the same layout
+and contents. With --diff, two copies of a tree are compared from the top
+down, only descending into subtrees whose fingerprints differ.
+
+Leaf digests are computed on a thread pool and cached per tree in the same
+way as compare.py.
+"""
+
+import os
+import sys
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from attr import attrib, attrs
+
+from compare import HASH_ALGORITHMS, DigestCache, default_cache_dir, digest_file
+
+
+def getargs():
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    arg = parser.add_argument
+    arg("directory", nargs="+", type=Path)
+    arg(
+        "--diff",
+        action="store_true",
+        help="compare exactly two directories, printing only what differs",
+    )
+    arg(
+        "--max-depth",
+        type=int,
+        help="only print fingerprints for subdirectories this deep (default: all)",
+    )
+    arg(
+        "--exclude",
+        action="append",
+        metavar="NAME",
+        help="skip files and directories with this name (default: .git)",
+    )
+    arg("--algorithm", choices=sorted(HASH_ALGORITHMS), default="md5")
+    arg("-j", "--jobs", type=int, help="number of files to hash at once")
+    arg(
+        "--cache-dir",
+        type=Path,
+        default=default_cache_dir(),
+        help="where to keep the per-tree digest caches",
+    )
+    cache = parser.add_mutually_exclusive_group()
+    cache.add_argument(
+        "--no-cache", action="store_true", help="neither read nor write cached digests"
+    )
+    cache.add_argument(
+        "--rebuild-cache", action="store_true", help="discard cached digests and rehash everything"
+    )
+    args = parser.parse_args()
+    if args.diff and len(args.directory) != 2:
+        parser.error("--diff needs exactly two directories")
+    if args.exclude is None:
+        args.exclude = [".git"]
+    return args
+
+
+@attrs(slots=True)
+class Node:
+    """A file (with no children) or directory in a fingerprinted tree."""
+
+    digest: str = attrib()
+    children: Optional[Dict[str, "Node"]] = attrib(default=None)
+
+    @property
+    def is_dir(self) -> bool:
+        return self.children is not None
+
+
+def submit_tree(
+    top: Path,
+    executor: Executor,
+    algorithm: str,
+    cache: Optional[DigestCache],
+    exclude: Sequence[str],
+) -> Dict[str, Union[Future, dict]]:
+    """Walk the tree, submitting every file to be hashed, and return the
+    layout of the tree with futures for the file digests.
+    """
+    layout = dict()
+    with os.scandir(top) as it:
+        entries = sorted(it, key=lambda entry: entry.name)
+    for entry in entries:
+        if entry.name in exclude:
+            continue
+        if entry.is_file():
+            layout[entry.name] = executor.submit(
+                digest_file, Path(entry.path), entry.stat(), algorithm, cache
+            )
+        elif entry.is_dir():
+            layout[entry.name] = submit_tree(Path(entry.path), executor, algorithm, cache, exclude)
+    return layout
+
+
+def resolve_tree(layout: Dict[str, Union[Future, dict]], algorithm: str) -> Node:
+    """Wait for the file digests and combine them into directory digests."""
+    m = HASH_ALGORITHMS[algorithm]()
+    children = dict()
+    for name, item in layout.items():
+        if isinstance(item, Future):
+            child = Node(item.result())
+            kind = b"f"
+        else:
+            child = resolve_tree(item, algorithm)
+            kind = b"d"
+        children[name] = child
+        m.update(b"%s %s %s\n" % (kind, child.digest.encode(), os.fsencode(name)))
+    return Node(m.hexdigest(), children)
+
+
+def fingerprint(
+    top: Path,
+    algorithm: str = "md5",
+    jobs: Optional[int] = None,
+    cache: Optional[DigestCache] = None,
+    exclude: Sequence[str] = (".git",),
+) -> Node:
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        layout = submit_tree(top, executor, algorithm, cache, exclude)
+        return resolve_tree(layout, algorithm)
+
+
+def iter_subtrees(
+    node: Node, path: Path, max_depth: Optional[int], depth: int = 0
+) -> Iterator[Tuple[Node, Path]]:
+    """Yield each directory in the tree, parents before children."""
+    yield node, path
+    if max_depth is not None and depth >= max_depth:
+        return
+    for name, child in node.children.items():
+        if child.is_dir:
+            yield from iter_subtrees(child, path / name, max_depth, depth + 1)
+
+
+def diff_trees(node1: Node, node2: Node, path: Path) -> Iterator[Tuple[str, Path]]:
+    """Compare two trees from the top down, yielding (status, relative path)
+    for everything that differs, where status is "M" for a file or directory
+    whose contents differ, "-" for something only in the first tree, and
+    "+" for something only in the second. Subtrees with the same digest
+    are skipped without being looked at.
+    """
+    if node1.digest == node2.digest:
+        return
+    if not (node1.is_dir and node2.is_dir):
+        yield "M", path
+        return
+    for name in sorted(node1.children.keys() | node2.children.keys()):
+        if name not in node2.children:
+            yield "-", path / name
+        elif name not in node1.children:
+            yield "+", path / name
+        elif node1.children[name].is_dir != node2.children[name].is_dir:
+            yield "M", path / name
+        else:
+            yield from diff_trees(node1.children[name], node2.children[name], path / name)
+
+
+def main(args) -> int:
+    # Same ordering as basename_sort.pl.
+    directories = sorted(args.directory, key=lambda p: p.name.lower())
+    if args.diff:
+        directories = args.directory
+
+    trees: List[Node] = []
+    for directory in directories:
+        cache = None
+        if not args.no_cache:
+            cache = DigestCache(directory, args.cache_dir, args.rebuild_cache)
+        try:
+            tree = fingerprint(directory, args.algorithm, args.jobs, cache, args.exclude)
+        finally:
+            if cache is not None:
+                cache.close()
+        trees.append(tree)
+        if not args.diff:
+            for node, path in iter_subtrees(tree, directory, args.max_depth):
+                print(f"{node.digest} {path}")
+
+    if args.diff:
+        differ = False
+        for status, path in diff_trees(trees[0], trees[1], Path()):
+            print(f"{status} {path}")
+            differ = True
+        return 1 if differ else 0
+
+    return 0
+
+
+if __name__ == "__main__":
+    args = getargs()
+    sys.exit(main(args))
@@ -9,33 +9,60 @@ import sys
 
 import numpy as np
 
+# How many bytes of an ASCII file to parse at once when converting it.
+ASCII_CHUNK_SIZE = 1 << 24
 
-def arma_ascii_header_to_dtype(header):
+# The last part of the header (ARMA_MAT_TXT_FN008, ARMA_CUB_BIN_IS004,
+# ...) gives the element type.
+ARMA_DTYPES = {
+    "IU001": np.uint8,
+    "IS001": np.int8,
+    "IU002": np.uint16,
+    "IS002": np.int16,
+    "IU004": np.uint32,
+    "IS004": np.int32,
+    "IU008": np.uint64,
+    "IS008": np.int64,
+    "FN004": np.float32,
+    "FN008": np.float64,
+    "FC008": np.complex64,
+    "FC016": np.complex128,
+}
 
-    if "IS004" in header:
-        return np.int32
-    else:
-        return np.float64
 
+def dtype_to_arma_code(dtype):
 
-def read_arma_mat_ascii(armaasciifilename):
-    """Given a file name, read it in as an ASCII-formatted Armadillo matrix.
+    dtype = np.dtype(dtype)
+    for code, arma_dtype in ARMA_DTYPES.items():
+        # Ignore the byte order.
+        if np.dtype(arma_dtype).str[1:] == dtype.str[1:]:
+            return code
+    raise ValueError("Armadillo has no element type for {}".format(dtype))
 
-    Currently, it supports matrices and cubes.
 
-    The second line of the file contains the dimensions:
-    rows, columns, slices (not sure about fields).
+def arma_header_to_dtype(header):
 
-    Return a NumPy ndarray of shape [nslices, nrows, ncolumns].
+    code = header.strip()[-5:]
+    if code not in ARMA_DTYPES:
+        raise ValueError("unknown Armadillo header: {}".format(header.strip()))
+    return np.dtype(ARMA_DTYPES[code])
+
+
+def read_arma_header(armafilename):
+    """Return the header (type) line, the dimensions, and the byte offset of
+    the start of the data for the given Armadillo file.
     """
 
-    with open(armaasciifilename) as armafile:
-        # The first line contains information about the datatype.
-        header = next(armafile)
-        dims = next(armafile)
-        shape = [int(x) for x in dims.split()]
+    with open(armafilename, "rb") as armafile:
+        header = armafile.readline().decode()
+        dims = armafile.readline().decode()
+        offset = armafile.tell()
+    shape = [int(x) for x in dims.split()]
+    return header, shape, offset
+
 
-    dtype = arma_ascii_header_to_dtype(header)
+def arma_shape_to_rcs(shape):
+    """Turn the dimensions from the header into (rows, columns, slices)."""
 
     if len(shape) == 1:
         rows = shape[0]
@@ -47,10 +74,10 @@ def read_arma_mat_ascii(armaasciifilename):
         rows, columns, slices = shape
     else:
         sys.exit(1)
+    return rows, columns, slices
 
-    arma_mat = np.loadtxt(armaasciifilename, skiprows=2, dtype=dtype)
 
-    arma_mat = arma_mat.ravel().reshape((slices, rows, columns))
+def drop_slice_dimension(arma_mat, shape):
 
     if len(shape) == 1:
         pass
@@ -63,6 +90,211 @@ def read_arma_mat_ascii(armaasciifilename):
     return arma_mat
 
 
+def read_arma_mat_ascii(armaasciifilename):
+    """Given a file name, read it in as an ASCII-formatted Armadillo matrix.
+
+    Currently, it supports matrices and cubes.
+
+    The second line of the file contains the dimensions:
+    rows, columns, slices (not sure about fields).
+
+    The file is only opened and parsed once; the values are parsed in C by
+    `np.fromfile` rather than line by line.
+
+    Return a NumPy ndarray of shape [nslices, nrows, ncolumns].
+    """
+
+    with open(armaasciifilename, "rb") as armafile:
+        # The first line contains information about the datatype.
+        header = armafile.readline().decode()
+        dims = armafile.readline().decode()
+        shape = [int(x) for x in dims.split()]
+        dtype = arma_header_to_dtype(header)
+        rows, columns, slices = arma_shape_to_rcs(shape)
+        count = rows * columns * slices
+        if dtype.kind == "c":
+            arma_mat = parse_ascii_values(armafile.read(), dtype)
+        else:
+            arma_mat = np.fromfile(armafile, dtype=dtype, sep=" ")
+
+    if arma_mat.size != count:
+        raise ValueError(
+            "expected {} values in {}, found {}".format(count, armaasciifilename, arma_mat.size)
+        )
+
+    # Each slice is written out row by row.
+    arma_mat = arma_mat.reshape((slices, rows, columns))
+
+    return drop_slice_dimension(arma_mat, shape)
+
+
+def parse_ascii_values(data, dtype):
+    """Parse whitespace-separated values from the given bytes."""
+
+    if dtype.kind == "c":
+        # Complex numbers are written as (real,imag).
+        return np.array(
+            [complex(*(float(x) for x in token[1:-1].split(b","))) for token in data.split()],
+            dtype=dtype,
+        )
+    return np.fromstring(data, dtype=dtype, sep=" ")
+
+
+def iter_ascii_chunks(armafile, chunk_size=ASCII_CHUNK_SIZE):
+    """Read the rest of the file in blocks of about chunk_size bytes, each
+    ending on whitespace so that no value is split between two blocks.
+    """
+
+    leftover = b""
+    while True:
+        block = armafile.read(chunk_size)
+        if not block:
+            break
+        block = leftover + block
+        cut = max(block.rfind(b" "), block.rfind(b"\n"), block.rfind(b"\t"))
+        if cut < 0:
+            leftover = block
+            continue
+        leftover = block[cut + 1 :]
+        yield block[: cut + 1]
+    if leftover:
+        yield leftover
+
+
+def convert_arma_ascii_to_npy(armaasciifilename, npyfilename, chunk_size=ASCII_CHUNK_SIZE):
+    """Convert an ASCII-formatted Armadillo matrix or cube into a NumPy .npy
+    file, parsing chunk_size bytes at a time straight into a memory-mapped
+    output, so that neither the text nor the array has to fit in memory.
+
+    The array in the .npy file has the same shape as the result of
+    `read_arma_mat_ascii`.
+    """
+
+    with open(armaasciifilename, "rb") as armafile:
+        header = armafile.readline().decode()
+        dims = armafile.readline().decode()
+        shape = [int(x) for x in dims.split()]
+        dtype = arma_header_to_dtype(header)
+        rows, columns, slices = arma_shape_to_rcs(shape)
+        out_shape = (rows, columns) if len(shape) == 2 else (slices, rows, columns)
+        out = np.lib.format.open_memmap(npyfilename, mode="w+", dtype=dtype, shape=out_shape)
+        # Each slice is written out row by row, which is C order.
+        flat = out.reshape(-1)
+        count = 0
+        for block in iter_ascii_chunks(armafile, chunk_size):
+            values = parse_ascii_values(block, dtype)
+            if count + values.size > flat.size:
+                raise ValueError("more than {} values in {}".format(flat.size, armaasciifilename))
+            flat[count : count + values.size] = values
+            count += values.size
+        if count != flat.size:
+            raise ValueError(
+                "expected {} values in {}, found {}".format(flat.size, armaasciifilename, count)
+            )
+        del flat
+        out.flush()
+    return out
+
+
+def write_arma_mat(arr, armafilename, binary=True, block_size=ASCII_CHUNK_SIZE):
+    """Write a NumPy array to a file in Armadillo's ASCII or binary format.
+
+    A 1- or 2-dimensional array is written as a matrix (a 1-dimensional one
+    as a single column), and a 3-dimensional array of shape [nslices, nrows,
+    ncolumns] as a cube, matching what the readers here return. The data is
+    written out about block_size bytes at a time, so the array can be a
+    memory map that's larger than memory.
+    """
+
+    arr = np.asanyarray(arr)
+    if arr.ndim == 1:
+        arr = arr[:, np.newaxis]
+    if arr.ndim == 2:
+        kind = "MAT"
+        rows, columns = arr.shape
+        dims = "{} {}".format(rows, columns)
+        slices = arr[np.newaxis]
+    elif arr.ndim == 3:
+        kind = "CUB"
+        _, rows, columns = arr.shape
+        dims = "{} {} {}".format(rows, columns, arr.shape[0])
+        slices = arr
+    else:
+        raise ValueError("can't write a {}-dimensional array".format(arr.ndim))
+
+    code = dtype_to_arma_code(arr.dtype)
+    header = "ARMA_{}_{}_{}\n{}\n".format(kind, "BIN" if binary else "TXT", code, dims)
+    # Armadillo stores the elements in native byte order.
+    native = arr.dtype.newbyteorder("=")
+    step = max(1, block_size // (max(rows, columns, 1) * arr.dtype.itemsize))
+
+    with open(armafilename, "wb") as armafile:
+        armafile.write(header.encode())
+        for arma_slice in slices:
+            if binary:
+                # Column-major, a block of columns at a time.
+                for start in range(0, columns, step):
+                    armafile.write(
+                        np.ascontiguousarray(arma_slice[:, start : start + step].T, dtype=native)
+                    )
+            else:
+                for start in range(0, rows, step):
+                    armafile.write(format_ascii_rows(arma_slice[start : start + step]))
+
+
+def format_ascii_rows(block):
+    """Format the rows of a 2-dimensional array as Armadillo ASCII lines."""
+
+    if block.dtype.kind == "c":
+        fmt = lambda x: "({:.16e},{:.16e})".format(x.real, x.imag)
+    elif block.dtype.kind == "f":
+        fmt = "{:.16e}".format
+    else:
+        fmt = "{:d}".format
+    lines = (" ".join(fmt(x) for x in row.tolist()) + "\n" for row in block)
+    return "".join(lines).encode()
+
+
+def read_arma_mat_binary(armabinfilename):
+    """Given a file name, memory-map it as a binary Armadillo matrix or
+    cube, without reading or copying the data.
+
+    Armadillo stores the elements of each slice in column-major order, so
+    the result is a (read-only) view with Fortran ordering within each slice.
+
+    Return a NumPy ndarray of shape [nslices, nrows, ncolumns].
+    """
+
+    header, shape, offset = read_arma_header(armabinfilename)
+    dtype = arma_header_to_dtype(header)
+    rows, columns, slices = arma_shape_to_rcs(shape)
+
+    arma_mat = np.memmap(
+        armabinfilename,
+        dtype=dtype,
+        mode="r",
+        offset=offset,
+        shape=(rows, columns, slices),
+        order="F",
+    )
+    arma_mat = arma_mat.transpose((2, 0, 1))
+
+    return drop_slice_dimension(arma_mat, shape)
+
+
+def read_arma_mat(armafilename):
+    """Read an Armadillo matrix or cube in either the ASCII or binary
+    format, based on its header.
+    """
+
+    header, _, _ = read_arma_header(armafilename)
+    if "_BIN_" in header:
+        return read_arma_mat_binary(armafilename)
+    elif "_TXT_" in header:
+        return read_arma_mat_ascii(armafilename)
+    raise ValueError("unknown Armadillo header: {}".format(header.strip()))
+
+
 if __name__ == "__main__":
     import argparse
 
@@ -81,17 +313,41 @@ if __name__ == "__main__":
         action="store_true",
         help="""Should it be re-saved to disk as a NumPy binary file?""",
     )
+    parser.add_argument(
+        "--npy",
+        action="store_true",
+        help="""Re-save it as an uncompressed NumPy .npy file, without ever
+        holding the whole array in memory.""",
+    )
+    parser.add_argument(
+        "--to-arma",
+        metavar="FILENAME",
+        help="""Write it out (or a .npy file given instead of an Armadillo
+        one) as an Armadillo binary file, or ASCII with --ascii.""",
+    )
+    parser.add_argument("--ascii", action="store_true", help="""See --to-arma.""")
 
     args = parser.parse_args()
 
-    arma_mat = read_arma_mat_ascii(args.armaasciifilename)
+    import os.path
+
+    stub = os.path.splitext(args.armaasciifilename)[0]
+
+    if args.armaasciifilename.endswith(".npy"):
+        arma_mat = np.load(args.armaasciifilename, mmap_mode="r")
+    elif args.npy and "_TXT_" in read_arma_header(args.armaasciifilename)[0]:
+        arma_mat = convert_arma_ascii_to_npy(args.armaasciifilename, stub + ".npy")
+    else:
+        arma_mat = read_arma_mat(args.armaasciifilename)
+        if args.npy:
+            np.save(stub + ".npy", arma_mat)
+
+    if args.to_arma:
+        write_arma_mat(arma_mat, args.to_arma, binary=not args.ascii)
 
     if args.print:
         print(arma_mat.shape)
         print(arma_mat)
 
     if args.npz:
-        import os.path
-
-        stub = os.path.splitext(args.armaasciifilename)[0]
         np.savez_compressed(stub + ".npz", arma_mat)
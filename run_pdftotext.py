@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+
+"""run_pdftotext.py: Run `pdftotext` on all PDF files under the given
+directories (by default the current one), several at a time.
+
+A PDF is skipped when its `.txt` is at least as new as it is. Each result
+(converted, skipped, or failed) is appended to a JSON Lines manifest as
+soon as it's known, so an interrupted run can simply be started again.
+"""
+
+import json
+import os
+import subprocess as sp
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Sequence, Tuple
+
+
+def getargs():
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    arg = parser.add_argument
+    arg("directory", nargs="*", type=Path, default=[Path(".")])
+    arg(
+        "-j",
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="number of pdftotext processes to run at once (default: number of cores)",
+    )
+    arg("--force", action="store_true", help="convert PDFs even when the .txt is up to date")
+    arg("--timeout", type=float, help="give up on a PDF after this many seconds")
+    arg(
+        "--manifest",
+        type=Path,
+        default=Path("pdftotext_manifest.jsonl"),
+        help="file to append a JSON line for each PDF to",
+    )
+    return parser.parse_args()
+
+
+def find_pdfs(tops: Sequence[Path], force: bool = False) -> Iterator[Tuple[str, str, bool]]:
+    """Yield (PDF path, text path, whether the text is up to date) for every
+    PDF under the directories. Each directory is listed only once, so the
+    text file's mtime comes from the same listing.
+    """
+    stack = [str(top) for top in reversed(tops)]
+    while stack:
+        dirpath = stack.pop()
+        with os.scandir(dirpath) as it:
+            entries = sorted(it, key=lambda entry: entry.name)
+        files = {entry.name: entry for entry in entries if entry.is_file()}
+        subdirs = []
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry.path)
+                continue
+            stub, ext = os.path.splitext(entry.name)
+            if ext.lower() != ".pdf" or entry.name not in files:
+                continue
+            txt = files.get(stub + ".txt")
+            up_to_date = (
+                not force and txt is not None and txt.stat().st_mtime_ns >= entry.stat().st_mtime_ns
+            )
+            yield entry.path, os.path.join(dirpath, stub + ".txt"), up_to_date
+        stack.extend(reversed(subdirs))
+
+
+def run_pdftotext(pdf: str, txt: str, timeout: Optional[float] = None) -> Dict:
+    """Convert one PDF, writing to a temporary file that's only renamed to
+    txt on success, and return its manifest record.
+    """
+    part = txt + ".part"
+    start = time.perf_counter()
+    record = {"pdf": pdf, "txt": txt}
+    try:
+        proc = sp.run(
+            ["pdftotext", "-eol", "unix", pdf, part],
+            stdout=sp.DEVNULL,
+            stderr=sp.PIPE,
+            timeout=timeout,
+        )
+        returncode, stderr = proc.returncode, proc.stderr.decode(errors="replace").strip()
+    except sp.TimeoutExpired:
+        returncode, stderr = None, f"timed out after {timeout} s"
+    except OSError as e:
+        returncode, stderr = None, str(e)
+    if returncode == 0:
+        os.replace(part, txt)
+        record["status"] = "converted"
+    else:
+        if os.path.exists(part):
+            os.remove(part)
+        record["status"] = "failed"
+        record["returncode"] = returncode
+    if stderr:
+        record["stderr"] = stderr
+    record["seconds"] = round(time.perf_counter() - start, 3)
+    return record
+
+
+def main(args) -> int:
+    pdfs = list(find_pdfs(args.directory, args.force))
+    todo = [(pdf, txt) for pdf, txt, up_to_date in pdfs if not up_to_date]
+    counts = {"skipped": len(pdfs) - len(todo), "converted": 0, "failed": 0}
+    print(f"{len(todo)} of {len(pdfs)} PDFs to convert", file=sys.stderr)
+
+    with open(args.manifest, "a") as manifest:
+
+        def log(record: Dict) -> None:
+            manifest.write(json.dumps(record) + "\n")
+            manifest.flush()
+
+        for pdf, txt, up_to_date in pdfs:
+            if up_to_date:
+                log({"pdf": pdf, "txt": txt, "status": "skipped"})
+
+        with ThreadPoolExecutor(max_workers=args.jobs) as executor:
+            futures = [executor.submit(run_pdftotext, pdf, txt, args.timeout) for pdf, txt in todo]
+            for done, future in enumerate(as_completed(futures), 1):
+                record = future.result()
+                log(record)
+                counts[record["status"]] += 1
+                line = f"[{done}/{len(todo)}] {record['status']} {record['pdf']}"
+                if record["status"] == "failed":
+                    line += f": {record.get('stderr', '')}"
+                print(line, file=sys.stderr)
+
+    print(", ".join(f"{count} {status}" for status, count in counts.items()), file=sys.stderr)
+    return 1 if counts["failed"] else 0
+
+
+if __name__ == "__main__":
+    args = getargs()
+    sys.exit(main(args))
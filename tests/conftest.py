@@ -0,0 +1,8 @@
+import os
+import sys
+
+TOP = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The scripts aren't a package; they import each other from their own
+# directories.
+sys.path[:0] = [TOP, os.path.join(TOP, "chemistry")]
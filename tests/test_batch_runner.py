@@ -0,0 +1,26 @@
+import os
+
+from batch_runner import Batch
+
+
+def crash_on_bad(filename):
+    if filename == "bad":
+        # Like being killed for running out of memory.
+        os._exit(1)
+    return filename.upper()
+
+
+def test_dead_worker_only_fails_its_file():
+    filenames = ["a", "b", "bad", "c", "d", "e", "f", "g"]
+    batch = Batch(crash_on_bad, filenames, jobs=2)
+    results = list(batch)
+    assert results == [(filename, filename.upper()) for filename in filenames if filename != "bad"]
+    assert [filename for filename, _ in batch.failures] == ["bad"]
+    assert "BrokenProcessPool" in batch.failures[0][1]
+
+
+def test_dead_worker_unordered():
+    filenames = ["bad"] + list("abcdefgh")
+    batch = Batch(crash_on_bad, filenames, jobs=3, unordered=True)
+    assert sorted(batch) == [(filename, filename.upper()) for filename in "abcdefgh"]
+    assert [filename for filename, _ in batch.failures] == ["bad"]
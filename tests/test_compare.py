@@ -0,0 +1,25 @@
+from compare import Diff, DiffType, Normalizer
+
+import pytest
+
+
+@pytest.mark.parametrize(
+    "text1, text2, diff_type",
+    [
+        (b"x /tmp/abc y\n", b"x /scratch/q y\n", DiffType.INNER_PATHS_DIFFER),
+        (b"/usr/local/a\n", b"/usr/local/b\n", DiffType.SOMETHING_ELSE_DIFFERS),
+        (b"x/tmpfoo\n", b"x/tmpbar\n", DiffType.SOMETHING_ELSE_DIFFERS),
+        (b"host: n1\n", b"host: n2\n", DiffType.VOLATILE_DIFFERS),
+        (b"CPU time: 4.5s\n", b"CPU time: 8.5s\n", DiffType.VOLATILE_DIFFERS),
+        (b"wall time: 00:01:23\n", b"wall time: 00:02:00\n", DiffType.VOLATILE_DIFFERS),
+        (b"CPU: 4\n", b"CPU: 8\n", DiffType.SOMETHING_ELSE_DIFFERS),
+    ],
+)
+def test_normalized_diff_type(tmp_path, text1, text2, diff_type):
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    f1, f2 = tmp_path / "a" / "f.txt", tmp_path / "b" / "f.txt"
+    f1.write_bytes(text1)
+    f2.write_bytes(text2)
+    normalizers = (Normalizer.for_tree(tmp_path / "a"), Normalizer.for_tree(tmp_path / "b"))
+    assert Diff.from_files(f1, f2, normalizers=normalizers).diff_type == diff_type
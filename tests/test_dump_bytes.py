@@ -0,0 +1,25 @@
+from dump_bytes import mapped_window, typed_view
+
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def binaryfile(tmp_path):
+    path = tmp_path / "a.bin"
+    np.arange(10, dtype="f8").tofile(path)
+    return str(path)
+
+
+def test_exact_window_past_the_end(binaryfile):
+    with pytest.raises(ValueError, match="120 bytes are needed"):
+        with mapped_window(binaryfile, 0, 120, exact=True):
+            pass
+
+
+def test_error_with_a_view_still_referenced(binaryfile):
+    # The array is still referenced from the traceback when the window
+    # closes, which shouldn't turn the ValueError into a BufferError.
+    with pytest.raises(ValueError, match="cannot reshape"):
+        with mapped_window(binaryfile) as window:
+            typed_view(window, "f8", (3, -1))
@@ -0,0 +1,35 @@
+import os
+
+import file_grouper
+
+import pytest
+
+
+@pytest.fixture
+def src(tmp_path):
+    path = tmp_path / "src.bin"
+    path.write_bytes(os.urandom(300_000))
+    return path
+
+
+def test_fast_copy_zero_at_start_falls_back(monkeypatch, src, tmp_path):
+    monkeypatch.setattr(os, "copy_file_range", lambda *args: 0, raising=False)
+    monkeypatch.delattr(os, "sendfile", raising=False)
+    dest = file_grouper.fast_copy(str(src), str(tmp_path / "dest.bin"))
+    assert open(dest, "rb").read() == src.read_bytes()
+
+
+def test_fast_copy_zero_partway_finishes_in_user_space(monkeypatch, src, tmp_path):
+    real = os.copy_file_range
+    calls = []
+
+    def copy_file_range(infd, outfd, count, offset_src, offset_dst):
+        calls.append(offset_src)
+        if len(calls) > 1:
+            return 0
+        return real(infd, outfd, min(count, 1000), offset_src, offset_dst)
+
+    monkeypatch.setattr(os, "copy_file_range", copy_file_range)
+    dest = file_grouper.fast_copy(str(src), str(tmp_path / "dest.bin"))
+    assert calls == [0, 1000]
+    assert open(dest, "rb").read() == src.read_bytes()
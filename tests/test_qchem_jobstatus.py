@@ -0,0 +1,59 @@
+import os
+
+import qchem_jobstatus
+
+START = " Welcome to Q-Chem\n"
+END = " Thank you very much for using Q-Chem.  Have a nice day.\n"
+
+
+def test_job_files_leaves_out_longer_stubs(tmp_path):
+    for name in ("done.out", "done.in", "done.bar.out", "done.bar.in"):
+        (tmp_path / name).touch()
+    files = qchem_jobstatus.job_files(str(tmp_path / "done.out"))
+    assert [os.path.basename(f) for f in files] == ["done.in", "done.out"]
+
+
+def test_classify_failure_before_end_banner(tmp_path):
+    path = tmp_path / "err.out"
+    path.write_text(START + " Q-Chem fatal error occurred in module\n" + END)
+    assert qchem_jobstatus.classify(str(path))[0] == "failed"
+
+
+def test_index_paths_dont_depend_on_cwd(tmp_path, monkeypatch):
+    top = tmp_path / "campaign"
+    top.mkdir()
+    (top / "done.out").write_text(START + END)
+    index_filename = str(top / ".qchem_jobstatus.sqlite")
+
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "moved").mkdir()
+    with qchem_jobstatus.JobIndex(index_filename) as index:
+        qchem_jobstatus.sweep(index, "campaign", jobs=1)
+        qchem_jobstatus.move_job(index, os.path.join("campaign", "done.out"), "moved")
+
+    monkeypatch.chdir(top)
+    with qchem_jobstatus.JobIndex(index_filename) as index:
+        assert list(index.jobs()) == [str(tmp_path / "moved" / "done.out")]
+
+
+def test_sweep_keeps_rows_outside_its_scope(tmp_path, capsys):
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "other").mkdir()
+    for path in ("done.out", "sub/x.out", "other/y.out"):
+        (tmp_path / path).write_text(START + END)
+    index_filename = str(tmp_path / ".qchem_jobstatus.sqlite")
+    with qchem_jobstatus.JobIndex(index_filename) as index:
+        qchem_jobstatus.sweep(index, str(tmp_path / "other"), jobs=1)
+        qchem_jobstatus.sweep(index, str(tmp_path), recursive=True, jobs=1)
+        qchem_jobstatus.sweep(index, str(tmp_path), jobs=1)
+        capsys.readouterr()
+        qchem_jobstatus.sweep(index, str(tmp_path), recursive=True, jobs=1)
+    assert "3 outputs, 0 read" in capsys.readouterr().err
+
+    (tmp_path / "done.out").unlink()
+    with qchem_jobstatus.JobIndex(index_filename) as index:
+        qchem_jobstatus.sweep(index, str(tmp_path), jobs=1)
+        assert sorted(index.jobs()) == [
+            str(tmp_path / "other" / "y.out"),
+            str(tmp_path / "sub" / "x.out"),
+        ]
@@ -0,0 +1,58 @@
+from qchem_scan import Handler, NatomHandler, scan, step_times
+
+
+class BlockHandler(Handler):
+    """Reads every line up to a blank one, as a section that runs into
+    whatever follows it would.
+    """
+
+    name = "block"
+    markers = ("Block:",)
+
+    def __init__(self):
+        self.blocks = []
+
+    def handle(self, line, lines):
+        block = []
+        line = next(lines)
+        while line.strip():
+            block.append(line.strip())
+            line = next(lines)
+        self.blocks.append(block)
+
+    def result(self):
+        return self.blocks
+
+
+OUTPUT = """\
+ Block:
+ a
+ b
+ SCF time:   CPU 1.00s  wall 2.00s
+ Block:
+ c
+
+ Standard Nuclear Orientation (Angstroms)
+    I     Atom           X                Y                Z
+ ----------------------------------------------------------------
+    1      H       0.0000000000     0.0000000000     0.0000000000
+    2      H       0.0000000000     0.0000000000     0.7400000000
+ ----------------------------------------------------------------
+ SCF time:   CPU 3.00s  wall 4.00s
+ Block:
+ d
+ SCF time:   CPU 5.00s  wall 6.00s
+"""
+
+
+def test_adjacent_sections(tmp_path):
+    path = tmp_path / "job.out"
+    path.write_text(OUTPUT)
+    results = scan(str(path), [BlockHandler(), step_times("scf_time", "SCF time:"), NatomHandler()])
+    # The first block reads past the SCF time line and the start of the
+    # second, which the SCF time handler still sees. The last block runs
+    # out of lines, which doesn't stop the SCF time handler seeing its
+    # last line either.
+    assert results["block"] == [["a", "b", "SCF time:   CPU 1.00s  wall 2.00s", "Block:", "c"]]
+    assert results["scf_time"] == [(1.0, 2.0), (3.0, 4.0), (5.0, 6.0)]
+    assert results["natom"] == 2
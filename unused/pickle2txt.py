@@ -57,16 +57,24 @@ Command-line syntax:
 # the popular (faster) modules are available (e.g. simplejson).
 # If so, use them; if not, use this code.
 
+import json
+import math
+import numbers
 import os
 import os.path
 import pickle
+import re
 import sys
 from pprint import pprint
+from xml.sax.saxutils import escape, quoteattr
 
 ENCODING = "utf-8"
 
 PRIMITIVES = (complex, float, int, str, bool, type(None), tuple, list)
 
+# Values that are written out as-is rather than walked into.
+SCALARS = (numbers.Number, str, bytes, bytearray, bool, type(None))
+
 
 def echo(msg):
     """Print a message to standard error."""
@@ -83,14 +91,106 @@ class WriteError(Exception):
 
 
 class Format(object):
-    """Base class for those that output specific formats."""
+    """Base class for those that output specific formats.
+
+    Derived classes either override write() to return the whole output as
+    a string, or chunks() to generate it piece by piece (usually from the
+    events produced by walk()), in which case dump() never holds more than
+    one piece of the output in memory.
+    """
 
-    def __init__(self):
-        pass
+    def __init__(self, max_depth=None, max_items=None):
+        """For a preview of a large object, containers nested deeper than
+        max_depth, and all but the first max_items items of any container,
+        can be left out of the streaming formats.
+        """
+        self.max_depth = max_depth
+        self.max_items = max_items
 
     def write(self, obj):
-        """Override this in the derived class."""
-        pass
+        """Serialize the given object and return it as a string."""
+        return "".join(self.chunks(obj))
+
+    def chunks(self, obj):
+        """Override this (or write) in the derived class."""
+        yield self.write(obj)
+
+    def dump(self, obj, handle):
+        """Serialize the given object to an open file handle."""
+        for chunk in self.chunks(obj):
+            handle.write(chunk)
+
+    @staticmethod
+    def children(val):
+        """Return the kind of container ("map" or "seq") the value is, its
+        size, and an iterator over its (key, value) pairs, or Nones for a
+        value that isn't walked into.
+        """
+        if isinstance(val, SCALARS):
+            return None, None, None
+        if isinstance(val, dict):
+            return "map", len(val), iter(val.items())
+        if isinstance(val, (list, tuple, set, frozenset)):
+            return "seq", len(val), enumerate(val)
+        if hasattr(val, "__dict__") and not isinstance(val, type):
+            attrs = vars(val)
+            return "map", len(attrs), iter(attrs.items())
+        return None, None, None
+
+    def walk(self, obj):
+        """Generate (event, key, value, size) tuples describing the object,
+        depth-first, using an explicit stack rather than recursion so that
+        deeply nested objects don't hit the recursion limit:
+
+            ("start", key, kind, size)  a "map" or "seq" container begins
+            ("end", key, kind, size)    ...and ends
+            ("scalar", key, value, None)
+            ("ref", key, value, size)   a container that was already written
+                                        (a shared or recursive reference)
+            ("elided", key, value, size)  a container deeper than max_depth
+            ("more", None, None, count)   the rest of the current container,
+                                          past max_items, was skipped
+
+        Keys are None at the top level and indices within sequences.
+        """
+        # Containers that have already been written, by id.
+        seen = set()
+        # Each frame is [key, kind, size, iterator over (key, value), count].
+        stack = [[None, None, 1, iter([(None, obj)]), 0]]
+        while stack:
+            frame = stack[-1]
+            try:
+                key, val = next(frame[3])
+            except StopIteration:
+                stack.pop()
+                if frame[1] is not None:
+                    yield ("end", frame[0], frame[1], frame[2])
+                continue
+            frame[4] += 1
+            if self.max_items is not None and frame[4] > self.max_items:
+                frame[3] = iter(())
+                yield ("more", None, None, frame[2] - self.max_items)
+                continue
+            kind, size, items = self.children(val)
+            if kind is None:
+                yield ("scalar", key, val, None)
+            elif size > 0 and id(val) in seen:
+                yield ("ref", key, val, size)
+            elif self.max_depth is not None and len(stack) > self.max_depth:
+                yield ("elided", key, val, size)
+            else:
+                seen.add(id(val))
+                yield ("start", key, kind, size)
+                stack.append([key, kind, size, items, 0])
+
+    @staticmethod
+    def placeholder(event, value, size):
+        """Describe something that walk() didn't write out in full."""
+        if event == "ref":
+            return "<reference to the %s shown earlier>" % type(value).__name__
+        if event == "elided":
+            return "<%s with %d items>" % (type(value).__name__, size)
+        return "<%d more items>" % size
 
 
 # -----------------------------------------------------------------------------
@@ -110,9 +210,9 @@ class Format_datatree(Format):
 
     # ENH: Consider using repr() and replacement tricks as a shortcut
 
-    def __init__(self):
+    def __init__(self, **kwargs):
         """Creates an instance at the top level."""
-        Format.__init__(self)
+        Format.__init__(self, **kwargs)
         self.depth_ = 0
 
     def write(self, obj):
@@ -181,148 +281,56 @@ class Format_datatree(Format):
 # -----------------------------------------------------------------------------
 # JSON
 
-# Using minjson.py from the json-py project
-# Copyright Jim Washington and Patrick D. Logan (LGPL license)
-# http://sourceforge.net/projects/json-py/
-
-##############################################################################
-##
-##    minjson.py implements JSON reading and writing in python.
-##    Copyright (c) 2005 Jim Washington and Contributors.
-##
-##############################################################################
-
 
 class Format_json(Format):
     """JavaScript Object Notation"""
 
-    from re import DOTALL, compile, search, sub
-
-    tfnTuple = (
-        ("True", "true"),
-        ("False", "false"),
-        ("None", "null"),
-    )
-
-    # re for a double-quoted string that has a single-quote in it
-    # but no double-quotes and python punctuation after:
-    redoublequotedstring = compile(r'"[^"]*\'[^"]*"[,\]\}:\)]')
-    escapedSingleQuote = r"\'"
-    escapedDoubleQuote = r"\""
-
-    def __init__(self):
-        Format.__init__(self)
-
-    def write(self, obj):
-        """Represent the object as a string.
-
-        Do any necessary fix-ups with pyexpr2jsexpr.
-        """
-        try:
-            # not really sure encode does anything here
-            a_string = str(obj).encode(ENCODING)
-        except UnicodeEncodeError:
-            a_string = obj.encode(ENCODING)
-        if isinstance(obj, str):
-            if '"' in a_string:
-                a_string = a_string.replace(self.escapedDoubleQuote, '"')
-                result = '"%s"' % a_string.replace('"', self.escapedDoubleQuote)
+    def __init__(self, indent="  ", **kwargs):
+        Format.__init__(self, **kwargs)
+        self.indent = indent
+
+    @staticmethod
+    def scalar(val):
+        if val is None or isinstance(val, (bool, str)):
+            return json.dumps(val)
+        if isinstance(val, numbers.Integral):
+            return json.dumps(int(val))
+        if isinstance(val, numbers.Real):
+            val = float(val)
+            # JSON has no NaN or infinity, so they're written as the
+            # strings JavaScript would give for them.
+            if math.isnan(val):
+                return json.dumps("NaN")
+            if math.isinf(val):
+                return json.dumps("Infinity" if val > 0 else "-Infinity")
+            return json.dumps(val, allow_nan=False)
+        return json.dumps(repr(val))
+
+    def chunks(self, obj):
+        """Generate the JSON text for the object a piece at a time."""
+        # For each open container, its kind and whether it's still empty.
+        frames = []
+        for event, key, value, size in self.walk(obj):
+            if event == "end":
+                kind, empty = frames.pop()
+                close = "}" if kind == "map" else "]"
+                yield close if empty else "\n" + self.indent * len(frames) + close
+                continue
+            if frames:
+                parent = frames[-1]
+                prefix = ("\n" if parent[1] else ",\n") + self.indent * len(frames)
+                parent[1] = False
+                if parent[0] == "map":
+                    prefix += json.dumps("..." if event == "more" else str(key)) + ": "
+                yield prefix
+            if event == "start":
+                yield "{" if value == "map" else "["
+                frames.append([value, True])
+            elif event == "scalar":
+                yield self.scalar(value)
             else:
-                result = '"%s"' % a_string
-        else:
-            result = self.serialize(a_string).encode(ENCODING)
-        return result
-
-    def serialize(self, a_string):
-        """Use python's formatting of string representations of objects.
-
-        Python always uses "'" to delimit strings.  Except it doesn't when
-        there is ' in the string.  Fix that, then, if we split on that
-        delimiter, we have a list that alternates non-string text with string
-        text.  Since string text is already properly escaped, we only need to
-        replace True, False, and None in non-string text and remove any unicode
-        'u's preceding string values.
-        """
-        # inSingleQuote = False
-        # inDoubleQuote = False
-        # python will quote with " when there is a ' in the string,
-        # so fix that first
-        if self.redoublequotedstring.search(a_string):
-            a_string = self.swap_quotes(a_string)
-        marker = None
-        if self.escapedSingleQuote in a_string:
-            # replace escaped single quotes with a marker
-            marker = marker_base = "|"
-            marker_count = 1
-            while marker in a_string:
-                # if the marker is already there, make it different
-                marker_count += 1
-                marker = marker_base * marker_count
-            a_string = a_string.replace(self.escapedSingleQuote, marker)
-
-        # escape double-quotes
-        a_string = a_string.replace('"', self.escapedDoubleQuote)
-        # split the string on the real single-quotes
-        outlist = []
-        alt = True
-        for substr in a_string.split("'"):
-            # if alt is True, non-string; do replacements
-            if alt:
-                substr = self.jsonify(substr)
-            outlist.append(substr)
-            alt = not alt
-        result = '"'.join(outlist)
-        if marker:
-            # put the escaped single-quotes back as "'"
-            result = result.replace(marker, "'")
-        return result
-
-    def swap_quotes(self, a_string):
-        """Rewrite double-quoted strings with single quotes as single-quoted
-        strings with escaped single quotes."""
-        s = []
-        foundlocs = self.redoublequotedstring.finditer(a_string)
-        prevend = 0
-        for loc in foundlocs:
-            start, end = loc.span()
-            s.append(a_string[prevend:start])
-            tempstr = a_string[start:end]
-            endchar = tempstr[-1]
-            ts1 = tempstr[1:-2]
-            ts1 = ts1.replace("'", self.escapedSingleQuote)
-            ts1 = "'%s'%s" % (ts1, endchar)
-            s.append(ts1)
-            prevend = end
-        s.append(a_string[prevend:])
-        return "".join(s)
-
-    def replace_bool_none(self, a_string):
-        """Replace True, False, and None with javascript counterparts"""
-        for k in self.tfnTuple:
-            if k[0] in a_string:
-                a_string = a_string.replace(k[0], k[1])
-        return a_string
-
-    def jsonify(self, substr):
-        """Replace True, False, and None with javascript counterparts if
-        appropriate, remove unicode u's, fix long L's, make tuples lists, and
-        strip white space if requested
-        """
-        if "e" in substr:
-            # True, False, and None have 'e' in them. :)
-            substr = self.replace_bool_none(substr)
-        if substr[-1] in "uU":
-            # remove unicode u's
-            substr = substr[:-1]
-        if "L" in substr:
-            # remove Ls from long ints
-            substr = substr.replace("L", "")
-        # do tuples as lists
-        if "(" in substr:
-            substr = substr.replace("(", "[")
-        if ")" in substr:
-            substr = substr.replace(")", "]")
-        return substr
+                yield json.dumps(self.placeholder(event, value, size))
+        yield "\n"
 
 
 # -----------------------------------------------------------------------------
@@ -332,8 +340,8 @@ class Format_json(Format):
 class Format_py(Format):
     """Python code representation via the pprint module."""
 
-    def __init__(self):
-        Format.__init__(self)
+    def __init__(self, **kwargs):
+        Format.__init__(self, **kwargs)
 
     def write(self, obj):
         """Serialize."""
@@ -412,31 +420,34 @@ class Format_lisp(Format):
 
 
 class Format_text(Format):
-    """Prints all attributes as simple "Attribute: Value" pairs"""
-
-    def __init__(self):
-        Format.__init__(self)
-
-    def flatten(self, node, indent=0):
-        """Generate key-val pairs from a dictionary.
-
-        If val is not a primitive, wing it.
-        """
-        # if '__dict__' in node:
-        # node = node.__dict__
-        # if 'iteritems' in node:
-        # for key, val in node.items():
-        # if type(val) in PRIMITIVES:
-        # yield (indent, key, str(val))
-        # else:
-        # yield (indent, key, str(type(val)))
-        # self.flatten(val, indent+1)
-        # else:
-        yield (indent, repr(node))
+    """Prints all attributes as simple "Attribute: Value" pairs, indented
+    under the attribute they belong to.
+    """
 
-    def write(self, obj):
-        """Serialize."""
-        return "\n".join("%s%s\n" % (i * "  ", k) for i, k in self.flatten(obj))
+    def __init__(self, indent="  ", **kwargs):
+        Format.__init__(self, **kwargs)
+        self.indent = indent
+
+    def chunks(self, obj):
+        """Generate the lines of text for the object."""
+        depth = -1
+        for event, key, value, size in self.walk(obj):
+            if event == "end":
+                depth -= 1
+                continue
+            if key is None and event != "more":
+                label = ""
+            else:
+                label = "%s: " % ("..." if event == "more" else key)
+            indent = self.indent * max(depth, 0)
+            if event == "start":
+                if key is not None:
+                    yield "%s%s\n" % (indent, label.rstrip())
+                depth += 1
+            elif event == "scalar":
+                yield "%s%s%s\n" % (indent, label, repr(value))
+            else:
+                yield "%s%s%s\n" % (indent, label, self.placeholder(event, value, size))
 
 
 # -----------------------------------------------------------------------------
@@ -444,59 +455,74 @@ class Format_text(Format):
 
 
 class Format_xml(Format):
-    """Standard XML 1.0 using Python builtins."""
-
-    def __init__(self):
-        Format.__init__(self)
-
-    def dict2xml(self, dct, root="Root", indent="\t"):
-        """Convert a dictionary to an XML string.
-
-        Rules:
-            string -> escape(string)
-            int, float -> as-is
-            dict -> <key>value</key>
-            tuple, list -> repeat tag for each value
-            bool -> int(bool)
-            None, empty string -> empty node
-            other object -> escape(str(obj))
-
-        """
-        # from xml.sax.saxutils import escape
-
-        def tagset(key, val, level):
-            if val in (None, ""):
-                return "%s<%s />\n" % (indent * level, key)
-
-            if type(val) in (list, tuple):
-                return "".join(tagset(key, v, level) for v in val)
-
-            if type(val) is bool:
-                val = int(val)
-
-            return "%s<%s>%s</%s>\n" % (indent * level, key, format_value(key, val, level), key)
-
-        def format_value(key, val, level):
-            if type(val) in (float, int, str):
-                pass
-
-            elif type(val) is dict:
-                lines = [tagset(k, v, level + 1) for k, v in val.items()]
-                lines.sort()  # NB: Py dicts are unordered
-                val = "\n%s%s" % ("".join(lines), indent * level)
-
-            elif type(val) is not str:
-                val = str(val)
-
-            return val
-
-        return tagset(root, dct, 0)
+    """Standard XML 1.0 using Python builtins.
+
+    Rules:
+        string -> escape(string)
+        int, float -> as-is
+        dict, object -> <key>value</key>
+        tuple, list -> repeat tag for each value
+        bool -> int(bool)
+        None, empty string -> empty node
+        other object -> escape(str(obj))
+    """
 
-    def write(self, obj):
-        """Serialize."""
-        return '<?xml version="1.0" encoding="UTF-8">\n' + self.dict2xml(
-            obj.__dict__, root=__name__
-        )
+    def __init__(self, root="Root", indent="\t", **kwargs):
+        Format.__init__(self, **kwargs)
+        self.root = root
+        self.indent = indent
+
+    @staticmethod
+    def tag_name(key):
+        """Make a valid XML element name out of a key."""
+        name = re.sub(r"[^\w.-]", "_", str(key))
+        if not (name[:1].isalpha() or name[:1] == "_"):
+            name = "_" + name
+        return name
+
+    def chunks(self, obj):
+        """Generate the XML document for the object a piece at a time."""
+        yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+        # For each open container, its kind and tag; only maps get their
+        # own element, so they set the indentation level.
+        frames = []
+        level = 0
+        for event, key, value, size in self.walk(obj):
+            if event == "end":
+                kind, tag = frames.pop()
+                if kind == "map":
+                    level -= 1
+                    yield "%s</%s>\n" % (self.indent * level, tag)
+                continue
+            indent = self.indent * level
+            if not frames:
+                tag = self.root
+            elif frames[-1][0] == "seq":
+                tag = frames[-1][1]
+            else:
+                tag = self.tag_name(key)
+            if event == "start":
+                if value == "map" and size == 0:
+                    # Like a None, nothing goes inside it.
+                    yield "%s<%s />\n" % (indent, tag)
+                    value = "empty"
+                elif value == "map":
+                    yield "%s<%s>\n" % (indent, tag)
+                    level += 1
+                frames.append([value, tag])
+            elif event == "scalar":
+                if value is None or (isinstance(value, str) and value == ""):
+                    yield "%s<%s />\n" % (indent, tag)
+                else:
+                    if type(value) is bool:
+                        value = int(value)
+                    yield "%s<%s>%s</%s>\n" % (indent, tag, escape(str(value)), tag)
+            elif event == "more":
+                comment = self.placeholder(event, value, size).replace("--", "- -")
+                yield "%s<!-- %s -->\n" % (indent, comment)
+            else:
+                description = quoteattr(self.placeholder(event, value, size))
+                yield "%s<%s %s=%s />\n" % (indent, tag, event, description)
 
 
 # -----------------------------------------------------------------------------
@@ -504,13 +530,75 @@ class Format_xml(Format):
 
 
 class Format_yaml(Format):
-    """Yet Another Markup Language."""
-
-    # TODO: Look for a spec or existing code
+    """Yet Another Markup Language, in block style. Each object is written
+    as its own YAML document.
+    """
 
-    def write(self, obj):
-        """Serialize."""
-        pass
+    plain_key = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+    reserved = ("true", "false", "null", "yes", "no", "on", "off", "y", "n")
+
+    def __init__(self, indent="  ", **kwargs):
+        Format.__init__(self, **kwargs)
+        self.indent = indent
+
+    def key(self, key):
+        key = str(key)
+        if self.plain_key.match(key) and key.lower() not in self.reserved:
+            return key
+        return json.dumps(key)
+
+    @staticmethod
+    def scalar(val):
+        if val is None:
+            return "null"
+        if isinstance(val, bool):
+            return "true" if val else "false"
+        if isinstance(val, numbers.Integral):
+            return str(int(val))
+        if isinstance(val, numbers.Real):
+            val = float(val)
+            if math.isnan(val):
+                return ".nan"
+            if math.isinf(val):
+                return ".inf" if val > 0 else "-.inf"
+            return repr(val)
+        if isinstance(val, str):
+            # A JSON string is also a valid double-quoted YAML scalar.
+            return json.dumps(val)
+        return json.dumps(repr(val))
+
+    def chunks(self, obj):
+        """Generate the YAML document for the object a piece at a time."""
+        yield "---\n"
+        # The kind of each open container.
+        frames = []
+        for event, key, value, size in self.walk(obj):
+            if event == "end":
+                frames.pop()
+                continue
+            indent = self.indent * max(len(frames) - 1, 0)
+            if not frames:
+                prefix = ""
+            elif frames[-1] == "seq":
+                prefix = indent + "-"
+            else:
+                prefix = indent + self.key("..." if event == "more" else key) + ":"
+            if event == "start":
+                frames.append(value)
+                if size == 0:
+                    # Nothing will be nested under it, so write it inline.
+                    yield "%s%s\n" % (
+                        prefix + " " if prefix else "",
+                        "{}" if value == "map" else "[]",
+                    )
+                elif prefix:
+                    yield prefix + "\n"
+            else:
+                if event == "scalar":
+                    text = self.scalar(value)
+                else:
+                    text = json.dumps(self.placeholder(event, value, size))
+                yield "%s%s\n" % (prefix + " " if prefix else "", text)
 
 
 # -----------------------------------------------------------------------------
@@ -535,14 +623,16 @@ def process_args(options, filepaths):
 
     for format in ("datatree", "json", "py", "text", "xml", "yaml"):
         if getattr(options, format):
-            fmat = globals()["Format_{}".format(format)]()
+            fmat = globals()["Format_{}".format(format)](
+                max_depth=options.max_depth, max_items=options.max_items
+            )
             for path in filepaths:
                 try:
                     infile = open(path, "rb")
                     outfile = open("%s.%s" % (path, format), "w")
                     while True:
                         obj = pickle.load(infile)
-                        outfile.write(fmat.write(obj))
+                        fmat.dump(obj, outfile)
                 except (IOError, pickle.UnpicklingError) as why:
                     echo("Couldn't load file: %s" % why)
                 except EOFError:
@@ -574,5 +664,17 @@ if __name__ == "__main__":
     )
     OP.add_option("-x", "--xml", dest="xml", action="store_true", help="Output in XML 1.0 format")
     OP.add_option("-y", "--yaml", dest="yaml", action="store_true", help="Output in YAML format")
+    OP.add_option(
+        "--max-depth",
+        dest="max_depth",
+        type="int",
+        help="Preview: leave out containers nested deeper than this (JSON, text, XML, YAML)",
+    )
+    OP.add_option(
+        "--max-items",
+        dest="max_items",
+        type="int",
+        help="Preview: only write this many items of each container (JSON, text, XML, YAML)",
+    )
 
     process_args(*OP.parse_args())
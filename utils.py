@@ -2,6 +2,10 @@
 
 """utils.py: Utility functions and classes shared by other scripts."""
 
+import bisect
+import heapq
+import mmap
+import os
 import re
 
 
@@ -12,12 +16,110 @@ def read_binary(binaryfilename):
     return readbytes
 
 
+class MmapLineIterator:
+    """Iterate over the lines of a file through a read-only memory map.
+
+    Lines are only decoded as they are consumed, so memory use doesn't
+    grow with the size of the file. Like `str.splitlines`, the line
+    terminators are stripped and a trailing newline doesn't produce an
+    empty final line.
+
+    The byte offset of every `checkpoint_interval`-th line is remembered
+    as the file is walked, so that `seek_to_line` only has to rescan at
+    most that many lines.
+    """
+
+    def __init__(self, filename, encoding="utf-8", errors="replace", checkpoint_interval=1024):
+        with open(filename, "rb") as f:
+            # An empty file can't be memory-mapped.
+            if os.fstat(f.fileno()).st_size > 0:
+                self._buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                self._buf = b""
+        self._size = len(self._buf)
+        self.encoding = encoding
+        self.errors = errors
+        self._interval = checkpoint_interval
+        # _checkpoints[k] is the byte offset of line k * _interval.
+        self._checkpoints = [0]
+        self._pos = 0
+        self._lineno = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        start, end = self._advance()
+        if end > start and self._buf[end - 1 : end] == b"\r":
+            end -= 1
+        return self._buf[start:end].decode(self.encoding, self.errors)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _advance(self):
+        """Move past the next line without decoding it, returning the byte
+        range of its contents (without the newline).
+        """
+        start = self._pos
+        if start >= self._size:
+            raise StopIteration
+        end = self._buf.find(b"\n", start)
+        if end < 0:
+            end = self._size
+            self._pos = end
+        else:
+            self._pos = end + 1
+        self._lineno += 1
+        if self._lineno == len(self._checkpoints) * self._interval:
+            self._checkpoints.append(self._pos)
+        return start, end
+
+    @property
+    def offset(self):
+        """The byte offset of the next line to be read."""
+        return self._pos
+
+    def tell(self):
+        """Return the (zero-based) index of the next line to be read."""
+        return self._lineno
+
+    def seek_to_line(self, lineno):
+        """Position the iterator so that the next line read is the one with
+        the given (zero-based) index. Seeking past the end of the file
+        leaves the iterator exhausted.
+        """
+        if lineno < 0:
+            raise ValueError("line number must be non-negative: {}".format(lineno))
+        k = min(lineno // self._interval, len(self._checkpoints) - 1)
+        # Only rewind to a checkpoint if the current position isn't
+        # already a better starting point.
+        if not k * self._interval <= self._lineno <= lineno:
+            self._pos = self._checkpoints[k]
+            self._lineno = k * self._interval
+        try:
+            while self._lineno < lineno:
+                self._advance()
+        except StopIteration:
+            pass
+
+    def close(self):
+        if isinstance(self._buf, mmap.mmap):
+            self._buf.close()
+        self._buf = b""
+        self._size = 0
+
+
 def make_file_iterator(filename):
-    """Return an iterator over the contents of the given file name."""
-    # pylint: disable=C0103
-    with open(filename) as f:
-        contents = f.read()
-    return iter(contents.splitlines())
+    """Return an iterator over the lines of the given file name.
+
+    The file is memory-mapped rather than read in, so this is safe to use
+    on outputs that are larger than the available memory.
+    """
+    return MmapLineIterator(filename)
 
 
 def one_largest(inlist):
@@ -86,14 +188,64 @@ def two_smallest(inlist):
     return (smallest, second_smallest)
 
 
-def largest(inlist, n):
-    """Return the n largest items in the sequence."""
-    pass
+def _top_k_heap(iterable, n, key, return_indices, select):
+    if key is None:
+        pairs = select(n, enumerate(iterable), key=lambda pair: pair[1])
+    else:
+        pairs = select(n, enumerate(iterable), key=lambda pair: key(pair[1]))
+    items = [item for _, item in pairs]
+    if return_indices:
+        return items, [idx for idx, _ in pairs]
+    return items
+
 
+def _top_k_numpy(arr, n, key, return_indices, largest):
+    import numpy as np
 
-def smallest(inlist, n):
-    """Return the n smallest items in the sequence."""
-    pass
+    arr = np.ravel(arr)
+    values = arr if key is None else np.ravel(key(arr))
+    k = max(0, min(n, len(values)))
+    if k == 0:
+        indices = np.empty(0, dtype=np.intp)
+    elif largest:
+        indices = np.argpartition(values, len(values) - k)[len(values) - k :]
+        # Sort by decreasing value, breaking ties by increasing index,
+        # the same as heapq.nlargest.
+        indices = indices[np.lexsort((-indices, values[indices]))[::-1]]
+    else:
+        indices = np.argpartition(values, k - 1)[:k]
+        indices = indices[np.lexsort((indices, values[indices]))]
+    if return_indices:
+        return arr[indices], indices
+    return arr[indices]
+
+
+def largest(inlist, n, key=None, return_indices=False):
+    """Return the n largest items in the sequence, largest first.
+
+    Any iterable (including a generator) is consumed once while keeping
+    only n items in a heap. A NumPy array is instead partitioned with
+    `np.argpartition` (after being flattened) and a new array is
+    returned; for arrays, key must be a vectorized function such as
+    `np.abs`, and which of several equal items straddling the cutoff is
+    kept is unspecified.
+
+    If return_indices is True, return a tuple of the items and their
+    (flat) indices in the input.
+    """
+    if hasattr(inlist, "argpartition"):
+        return _top_k_numpy(inlist, n, key, return_indices, largest=True)
+    return _top_k_heap(inlist, n, key, return_indices, heapq.nlargest)
+
+
+def smallest(inlist, n, key=None, return_indices=False):
+    """Return the n smallest items in the sequence, smallest first.
+
+    See `largest` for how the different kinds of input are handled.
+    """
+    if hasattr(inlist, "argpartition"):
+        return _top_k_numpy(inlist, n, key, return_indices, largest=False)
+    return _top_k_heap(inlist, n, key, return_indices, heapq.nsmallest)
 
 
 def only_numerics(seq):
@@ -103,25 +255,201 @@ def only_numerics(seq):
 
 
 def get_string_index(list_of_strings, string_to_search, start_index=0):
-    """Returns the index for the line containing the given string.
-    (case-sensitive)
+    """Returns the index for the first line at or after start_index
+    containing the given string. (case-sensitive)
     """
-    for idx, line in enumerate(list_of_strings[start_index:]):
-        if line.find(string_to_search) > -1:
+    for idx in range(start_index, len(list_of_strings)):
+        if string_to_search in list_of_strings[idx]:
             return idx
     return -1
 
 
 def get_regex_index(list_of_strings, regex_to_search, start_index=0):
-    """Returns the index for the line matching the given regular
-    expression string. (case-sensitive)
+    """Returns the index for the first line at or after start_index
+    matching the given regular expression string. (case-sensitive)
     """
-    for idx, line in enumerate(list_of_strings[start_index:]):
-        if re.search(regex_to_search, line) is not None:
+    regex = re.compile(regex_to_search)
+    for idx in range(start_index, len(list_of_strings)):
+        if regex.search(list_of_strings[idx]) is not None:
             return idx
     return -1
 
 
+class MarkerIndex:
+    """The line numbers and byte offsets of every line in a file that
+    contains one of a set of markers, found in a single pass over the
+    file.
+
+    `markers` are literal strings and `regexes` are regular expression
+    strings; both are matched (case-sensitive) against one line at a
+    time and are used as the keys for lookups. Line numbers are
+    zero-based, so they can be given directly to
+    `MmapLineIterator.seek_to_line`, and the byte offsets point to the
+    start of the line.
+
+    The file is memory-mapped and searched `chunk_size` bytes at a time
+    with a single combined pattern, so only the lines that contain a
+    marker are ever looked at from Python.
+    """
+
+    def __init__(self, filename, markers=(), regexes=(), encoding="utf-8", chunk_size=1 << 24):
+        self.filename = filename
+        self._patterns = dict()
+        for marker in markers:
+            self._patterns[marker] = re.compile(re.escape(marker.encode(encoding)))
+        for regex in regexes:
+            self._patterns[regex] = re.compile(regex.encode(encoding), re.MULTILINE)
+        self.linenos = {key: [] for key in self._patterns}
+        self.offsets = {key: [] for key in self._patterns}
+        if self._patterns:
+            self._scan(chunk_size)
+
+    def _scan(self, chunk_size):
+        combined = re.compile(
+            b"|".join(b"(?:" + pattern.pattern + b")" for pattern in self._patterns.values()),
+            re.MULTILINE,
+        )
+        with open(self.filename, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        with buf:
+            size = len(buf)
+            chunk_start = 0
+            lineno = 0
+            while chunk_start < size:
+                # Always end a chunk on a line boundary so that no line is
+                # split across two chunks.
+                chunk_end = buf.find(b"\n", min(chunk_start + chunk_size, size) - 1)
+                chunk_end = size if chunk_end < 0 else chunk_end + 1
+                chunk = buf[chunk_start:chunk_end]
+                # Line numbers are only counted up to each matching line.
+                counted_to = 0
+                pos = 0
+                while pos < len(chunk):
+                    match = combined.search(chunk, pos)
+                    if match is None:
+                        break
+                    line_start = chunk.rfind(b"\n", 0, match.start()) + 1
+                    line_end = chunk.find(b"\n", match.start())
+                    if line_end < 0:
+                        line_end = len(chunk)
+                    lineno += chunk.count(b"\n", counted_to, line_start)
+                    counted_to = line_start
+                    line = chunk[line_start:line_end]
+                    for key, pattern in self._patterns.items():
+                        if pattern.search(line) is not None:
+                            self.linenos[key].append(lineno)
+                            self.offsets[key].append(chunk_start + line_start)
+                    pos = line_end + 1
+                lineno += chunk.count(b"\n", counted_to)
+                chunk_start = chunk_end
+
+    def __contains__(self, marker):
+        return bool(self.linenos.get(marker))
+
+    def count(self, marker):
+        """Return the number of lines containing the given marker."""
+        return len(self.linenos[marker])
+
+    def find(self, marker, start_line=0):
+        """Return the (line number, byte offset) of the first line at or
+        after start_line containing the given marker, or None if there
+        isn't one.
+        """
+        linenos = self.linenos[marker]
+        idx = bisect.bisect_left(linenos, start_line)
+        if idx == len(linenos):
+            return None
+        return linenos[idx], self.offsets[marker][idx]
+
+    def rfind(self, marker, end_line=None):
+        """Return the (line number, byte offset) of the last line before
+        end_line (or anywhere in the file, if not given) containing the
+        given marker, or None if there isn't one.
+        """
+        linenos = self.linenos[marker]
+        idx = len(linenos) if end_line is None else bisect.bisect_left(linenos, end_line)
+        if idx == 0:
+            return None
+        return linenos[idx - 1], self.offsets[marker][idx - 1]
+
+
+def _reverse_line_bytes(f, block_size, max_bytes):
+    """Yield the lines of the binary file object from last to first, as
+    bytes without their terminators.
+    """
+    size = f.seek(0, os.SEEK_END)
+    if size == 0:
+        return
+    end = size
+    f.seek(end - 1)
+    if f.read(1) == b"\n":
+        # Like `str.splitlines`, a trailing newline doesn't start another
+        # line.
+        end -= 1
+    limit = 0 if max_bytes is None else max(0, size - max_bytes)
+    pos = end
+    # The (possibly incomplete) first line of the blocks read so far.
+    head = b""
+    while pos > limit:
+        start = max(limit, pos - block_size)
+        f.seek(start)
+        lines = (f.read(pos - start) + head).split(b"\n")
+        pos = start
+        head = lines[0]
+        for line in reversed(lines[1:]):
+            yield line[:-1] if line.endswith(b"\r") else line
+    if limit > 0:
+        # Only give the first line if it wasn't cut off by the limit.
+        if pos != limit:
+            return
+        f.seek(limit - 1)
+        if f.read(1) != b"\n":
+            return
+    yield head[:-1] if head.endswith(b"\r") else head
+
+
+def reverse_lines(filename, block_size=1 << 16, max_bytes=None, encoding="utf-8", errors="replace"):
+    """Iterate over the lines of a file from last to first.
+
+    The file is read backwards from the end, block_size bytes at a time,
+    so only as much of it as is consumed is ever read. With max_bytes,
+    reading stops that many bytes from the end (and a line cut off there
+    is left out). Line terminators are stripped as in `MmapLineIterator`.
+    """
+    with open(filename, "rb") as f:
+        for line in _reverse_line_bytes(f, block_size, max_bytes):
+            yield line.decode(encoding, errors)
+
+
+def find_last(filename, markers, n=1, max_bytes=None, block_size=1 << 16, encoding="utf-8"):
+    """Return the last n lines containing each of the markers, as a dict
+    of lists in file order, reading the file backwards from the end.
+
+    Reading stops as soon as n lines have been found for every marker,
+    so a marker near the end of a large file costs only a few blocks. A
+    marker that isn't there means reading the whole file, or the last
+    max_bytes of it.
+    """
+    found = {marker: [] for marker in markers}
+    needles = [(marker.encode(encoding), found[marker]) for marker in found]
+    remaining = len(needles) if n > 0 else 0
+    if remaining > 0:
+        with open(filename, "rb") as f:
+            for line in _reverse_line_bytes(f, block_size, max_bytes):
+                for needle, lines in needles:
+                    if len(lines) < n and needle in line:
+                        lines.append(line.decode(encoding, "replace"))
+                        if len(lines) == n:
+                            remaining -= 1
+                if remaining == 0:
+                    break
+    for lines in found.values():
+        lines.reverse()
+    return found
+
+
 def find_string_in_file(filename, string):
     """Does the give string occur anywhere within the file with the given
     name?
@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+
+"""zip_inventory.py: List the files inside zip archives, including those
+inside zips nested in other zips, without extracting anything.
+
+Nested archives are opened from memory, one chain at a time. Top-level
+archives are processed in parallel on a process pool. The inventory is
+deduplicated on (name, size, CRC), and each entry records the chain of
+archives it was found in, such as bundle.zip!results/run1.zip!energies.txt.
+"""
+
+import io
+import json
+import os
+import sys
+import zipfile
+import zlib
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Separates the archives in a chain, as in jar: URLs.
+CHAIN_SEPARATOR = "!"
+
+# What reading a damaged, encrypted, or unsupported archive can raise.
+ZIP_ERRORS = (
+    OSError,
+    EOFError,
+    zipfile.BadZipFile,
+    zlib.error,
+    NotImplementedError,
+    RuntimeError,
+)
+
+# (archive chain, name, size, CRC)
+Entry = Tuple[Tuple[str, ...], str, int, int]
+
+
+def getargs():
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    arg = parser.add_argument
+    arg(
+        "paths",
+        nargs="*",
+        type=Path,
+        default=[Path(".")],
+        help="zip files, or directories to search for them (default: .)",
+    )
+    arg("-j", "--jobs", type=int, help="number of archives to read at once")
+    arg(
+        "--max-nested-size",
+        type=int,
+        help="don't open nested zips bigger than this many bytes (uncompressed)",
+    )
+    arg(
+        "--names-only",
+        action="store_true",
+        help="only print the unique file names, like zip_list_inner_files.bash did",
+    )
+    arg("--json", action="store_true", help="print the inventory as JSON")
+    return parser.parse_args()
+
+
+def find_zips(paths: Sequence[Path]) -> Iterator[Path]:
+    for path in paths:
+        if path.is_dir():
+            for dirpath, dirnames, filenames in os.walk(path):
+                dirnames.sort()
+                for filename in sorted(filenames):
+                    if filename.lower().endswith(".zip"):
+                        yield Path(dirpath) / filename
+        else:
+            yield path
+
+
+def is_zip_name(name: str) -> bool:
+    return name.lower().endswith(".zip")
+
+
+def inventory_archive(
+    path: Path, max_nested_size: Optional[int] = None
+) -> Tuple[List[Entry], List[str]]:
+    """Return every file in the archive, and in the archives nested in it,
+    along with descriptions of anything that couldn't be read.
+
+    Nested archives are listed depth first, as soon as they're found, so
+    only those in the chain currently being listed are held in memory.
+    """
+    entries: List[Entry] = []
+    errors: List[str] = []
+    # The chain of open archives, outermost first, each with its members
+    # still to be listed.
+    stack: List[Tuple[Tuple[str, ...], zipfile.ZipFile, Iterator[zipfile.ZipInfo]]] = []
+
+    def push(chain: Tuple[str, ...], source) -> None:
+        try:
+            archive = zipfile.ZipFile(source)
+        except ZIP_ERRORS as e:
+            errors.append("{}: {}".format(CHAIN_SEPARATOR.join(chain), e))
+            return
+        stack.append((chain, archive, iter(archive.infolist())))
+
+    push((str(path),), path)
+    while stack:
+        chain, archive, members = stack[-1]
+        info = next(members, None)
+        if info is None:
+            archive.close()
+            stack.pop()
+            continue
+        if info.is_dir():
+            continue
+        entries.append((chain, info.filename, info.file_size, info.CRC))
+        if not is_zip_name(info.filename):
+            continue
+        nested = chain + (info.filename,)
+        if max_nested_size is not None and info.file_size > max_nested_size:
+            errors.append(
+                "{}: skipped, {} bytes".format(CHAIN_SEPARATOR.join(nested), info.file_size)
+            )
+            continue
+        try:
+            data = archive.read(info)
+        except ZIP_ERRORS as e:
+            errors.append("{}: {}".format(CHAIN_SEPARATOR.join(nested), e))
+            continue
+        push(nested, io.BytesIO(data))
+    return entries, errors
+
+
+def deduplicate(entries: Sequence[Entry]) -> List[Dict]:
+    """Group the entries on (name, size, CRC), sorted by name."""
+    locations = defaultdict(list)
+    for chain, name, size, crc in entries:
+        locations[(name, size, crc)].append(CHAIN_SEPARATOR.join(chain))
+    return [
+        {"name": name, "size": size, "crc": "{:08x}".format(crc), "archives": archives}
+        for (name, size, crc), archives in sorted(locations.items())
+    ]
+
+
+def main(args) -> int:
+    zips = list(find_zips(args.paths))
+    entries: List[Entry] = []
+    status = 0
+    with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+        results = executor.map(
+            inventory_archive, zips, [args.max_nested_size] * len(zips), chunksize=4
+        )
+        for archive_entries, errors in results:
+            entries.extend(archive_entries)
+            for error in errors:
+                print(error, file=sys.stderr)
+                status = 1
+
+    inventory = deduplicate(entries)
+    if args.names_only:
+        for name in sorted({item["name"] for item in inventory}):
+            print(name)
+    elif args.json:
+        json.dump(inventory, sys.stdout, indent=2)
+        print()
+    else:
+        for item in inventory:
+            print(f"{item['crc']} {item['size']:12d} {item['name']}")
+            for archive in item["archives"]:
+                print(f"    {archive}")
+    return status
+
+
+if __name__ == "__main__":
+    args = getargs()
+    sys.exit(main(args))